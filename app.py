@@ -2,18 +2,45 @@
 # app.py (Flask backend)
 # ==============================
 
-from flask import Flask, request, jsonify
-from preprocessing.process_video import process_video
+from flask import Flask, Response, request, jsonify, stream_with_context
+from preprocessing.process_video import analyze_recording
+from backend.jobs import JobManager, JobQueueFull
+from backend.admission import AdmissionController, estimate_cost
+from backend.uploads import StreamingUploadRequest, receive_upload, hash_file, MAX_UPLOAD_BYTES, CHUNK_SIZE
+from backend.results import AnalysisStore
+from backend.live import live_socket
+from backend.events import job_events
+from preprocessing import telemetry
+from preprocessing.warmup import warm_up, warmup_status, WARMING
+from preprocessing.transcribers import model_key
 import os
-from flask import Flask, request, jsonify
 from flask_cors import CORS
-import shutil
+from flask_sock import Sock
 
 app = Flask(__name__)
+app.request_class = StreamingUploadRequest
+# Lets Werkzeug refuse oversize bodies from Content-Length before reading them
+app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_BYTES + CHUNK_SIZE
 CORS(app)
+sock = Sock(app)
 
 from flask import send_from_directory
 
+
+def run_pipeline(input_video, model_size, on_stage=None):
+    """Job runner: process one upload and shape the result for the API."""
+    return analyze_recording(input_video, model_size=model_size, on_stage=on_stage)
+
+
+admission = AdmissionController()
+jobs = JobManager(run_pipeline, result_store=AnalysisStore(), stage_events=True, admission=admission)
+telemetry.registry.gauge("speakeasy_jobs_running", "Jobs being processed.", lambda: jobs.stats()["running"])
+telemetry.registry.gauge("speakeasy_jobs_pending", "Jobs waiting for a worker.", lambda: jobs.stats()["pending"])
+telemetry.registry.gauge("speakeasy_admission_running_cost", "Estimated cost of running jobs.",
+                         lambda: admission.stats()["running_cost"])
+telemetry.registry.gauge("speakeasy_admission_queued_cost", "Estimated cost of accepted jobs not yet running.",
+                         lambda: admission.stats()["queued_cost"])
+
 @app.route("/", defaults={"path": ""})
 @app.route("/<path:path>")
 def serve(path):
@@ -22,72 +49,139 @@ def serve(path):
     else:
         return send_from_directory("frontend/build", "index.html")
 
-@app.route("/process", methods=["POST"])
-def process():
+def submit_request():
     """
-    Accepts a video file (multipart/form-data) or file path (JSON),
-    processes it, and returns metrics + transcript path.
+    Queue the video in the current request: a file upload (multipart/form-data,
+    or a raw audio/*, video/* or application/octet-stream body) or a file path
+    (JSON). Returns (job, upload_metrics, None), or (None, None, error response).
     """
-    # Case 1: file upload
-    if "file" in request.files:
-        video = request.files["file"]
-        save_path = os.path.join("uploads", video.filename)
-        os.makedirs("uploads", exist_ok=True)
-        video.save(save_path)
-        input_video = save_path
+    model_size = model_key("base")  # results differ per backend, so it is part of the dedup key
+    workspace = None
+    upload_metrics = None
+    # Case 1: file upload, streamed in fixed-size chunks into a private
+    # per-request workspace, hashed and size/type-checked on the fly
+    upload = receive_upload(request)
+    if upload is not None:
+        workspace = request.upload_workspace
+        input_video = upload.path
+        digest = upload.sha256
+        upload_metrics = upload.metrics()
     else:
         # Case 2: JSON body with file path
-        data = request.get_json()
+        data = request.get_json(silent=True)
         if not data or "file_path" not in data:
-            return jsonify({"error": "No video file provided"}), 400
+            return None, None, (jsonify({"error": "No video file provided"}), 400)
         input_video = data["file_path"]
+        if not os.path.isfile(input_video):
+            return None, None, (jsonify({"error": f"File not found: {input_video}"}), 400)
+        digest = hash_file(input_video)
+
+    key = f"{digest}-{model_size}"
+    duplicate = jobs.find(key, input_video, model_size)
+    if duplicate is not None:
+        if workspace is not None:
+            workspace.cleanup()
+        return duplicate, upload_metrics, None
+    # Priced from the container header, so an overload is refused before any decoding
+    cost = estimate_cost(input_video, model_size)
+    try:
+        job = jobs.submit(input_video, model_size=model_size, workspace=workspace, key=key, cost=cost)
+    except JobQueueFull as e:
+        if workspace is not None:
+            workspace.cleanup()
+        retry_after = getattr(e, "retry_after", None) or admission.retry_after(cost)
+        return None, None, (jsonify({"error": f"Server busy, try again later ({e})", "retry_after": retry_after}),
+                            503, {"Retry-After": str(retry_after)})
+    return job, upload_metrics, None
+
+
+def event_stream(job, first=None):
+    """text/event-stream response that follows `job` (see backend/events.py)."""
+    return Response(stream_with_context(job_events(job, first)), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
-    # Updated to unpack everything
-    audio_grades, text_grades, context, examples = process_video(save_path, model_size="base")
-
-    # shutil.rmtree("training_data")
-
-    print("Audio Grades:", type(audio_grades))
-    print(type(audio_grades["clarity_score"]))
-    print("Text Grades:", type(text_grades))
-    print("Context:", type(context))
-    print("Examples:", type(examples))
-
-    result = jsonify({
-        "message": "Processing complete ✅",
-        "results": {
-            "audio_grades": audio_grades,
-            "text_grades": text_grades,
-            "context": context,
-            "examples": examples
-        }
-    })
-
-    print("content of text grades", text_grades) # + "/n" + "content of text grades" + text_grades + "/n" + "content of context" + context + "/n" + "content of examples" + examples + "/n")
-    print(type(result))
-    return result
+@app.route("/process", methods=["POST"])
+def process():
+    """
+    Accepts a video file (multipart/form-data, or a raw audio/*, video/* or
+    application/octet-stream body) or file path (JSON) and queues it for
+    processing. Returns 202 with a job ID; poll /jobs/<job_id> for the
+    status and, once done, the results.
+    """
+    job, upload_metrics, error = submit_request()
+    if error is not None:
+        return error
+
+    if job.cached:
+        # Identical upload analysed before: answer immediately
+        return jsonify({
+            "message": "Processing complete ✅",
+            "job_id": job.id,
+            "status": job.status,
+            "cached": True,
+            "upload": upload_metrics,
+            "results": job.result
+        })
+
+    return jsonify({
+        "message": "Processing started",
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events",
+        "upload": upload_metrics
+    }), 202
+
+@app.route("/process/stream", methods=["POST"])
+def process_stream():
+    """
+    Same input as /process, but answers with a server-sent event stream that
+    delivers each stage result (transcript, fillers, wpm, context,
+    text_grades, examples, prosody, body_language, audio_grades) as soon as
+    it exists, then a `done` event with the full job status and results.
+    """
+    job, upload_metrics, error = submit_request()
+    if error is not None:
+        return error
+    return event_stream(job, {"cached": job.cached, "upload": upload_metrics})
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    """Reports a job's status, plus its results once it is done."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    return jsonify(job.to_dict())
+
+@app.route("/jobs/<job_id>/events", methods=["GET"])
+def job_events_stream(job_id):
+    """Server-sent event stream of a queued job's stage results (for EventSource clients)."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    return event_stream(job)
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Span timings, cache lookups, job counts and queue depth in Prometheus text format."""
+    return Response(telemetry.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/ready", methods=["GET"])
+def ready():
+    """Readiness probe: 503 while warm_up() is still loading models, 200 otherwise."""
+    status = warmup_status()
+    return jsonify(status), 503 if status["state"] == WARMING else 200
+
+@sock.route("/live")
+def live(ws):
+    """
+    Live practice: 16 kHz int16 PCM chunks in, partial transcript, running
+    WPM and filler alerts out. See backend/live.py for the protocol.
+    """
+    live_socket(ws)
 
 if __name__ == "__main__":
+    # The debug reloader runs this file twice; only its child process serves requests
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        warm_up()
     app.run(debug=True, port=5000)
-
-
-
-# # ==============================
-# # main.py
-# # ==============================
-
-# import sys
-# from preprocessing.process_video import process_video
-
-# def main():
-#     if len(sys.argv) < 2:
-#         print("Usage: python main.py <video_file>")
-#         sys.exit(1)
-
-#     input_video = sys.argv[1]
-#     transcript_file = process_video(input_video, model_size="base")
-
-#     print(f"\n✅ Done! Transcript available at: {transcript_file}")
-
-# if __name__ == "__main__":
-#     main()
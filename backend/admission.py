@@ -0,0 +1,166 @@
+# ==============================
+# admission.py
+# ==============================
+"""
+Admission control for analysis jobs.
+
+Each job is given a cost before it is queued: the recording's duration, read
+from its container header without decoding (audio_ingest.probe_duration),
+times a relative cost for the Whisper model size. A cost of 1.0 is one second
+of audio on the "base" model. The controller tracks the cost of running jobs
+against `capacity`:
+
+- a job that fits under `capacity` runs as soon as a worker is free;
+- past `capacity`, jobs wait, up to `max_queued` cost in total;
+- past that, new jobs are rejected at once with an estimate of when to retry.
+
+Waiting jobs start in the order they reached a worker, so a long recording
+is not overtaken forever by short ones. A job costing more than `capacity`
+runs on its own, once nothing else is running. Jobs already accepted keep a
+bounded latency, because the work ahead of them is bounded.
+"""
+
+import math
+import os
+import threading
+from collections import deque
+from typing import Optional
+
+from backend.jobs import JobQueueFull
+from preprocessing.audio_ingest import probe_duration
+from preprocessing.telemetry import registry
+from preprocessing.transcribers import split_key
+
+# Cost of one second of audio per Whisper model size, relative to "base"
+MODEL_COST = {"tiny": 0.5, "base": 1.0, "small": 3.0, "medium": 8.0, "large": 16.0, "turbo": 6.0}
+
+DEFAULT_CAPACITY = float(os.environ.get("SPEAKEASY_CAPACITY_SECONDS", 1800))
+DEFAULT_MAX_QUEUED = float(os.environ.get("SPEAKEASY_QUEUE_SECONDS", 3600))
+# Assumed when the header has no duration; generous, so unknown files cannot overload the workers
+UNKNOWN_DURATION_SECONDS = float(os.environ.get("SPEAKEASY_UNKNOWN_DURATION_SECONDS", 600))
+# Wall seconds per unit of cost for one job, until finished jobs have measured it
+SECONDS_PER_COST = float(os.environ.get("SPEAKEASY_SECONDS_PER_COST", 0.5))
+MAX_RETRY_AFTER = 3600
+
+RUN = "run"
+QUEUE = "queue"
+REJECT = "reject"
+
+ADMISSIONS = registry.counter(
+    "speakeasy_admission_total", "Admission decisions for new jobs (run, queue, reject).", ("decision",))
+
+
+class JobRejected(JobQueueFull):
+    """Raised when a job would push the queued cost past the limit; `retry_after` is in seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """A job's reservation: its cost, and whether it is running."""
+
+    def __init__(self, cost: float):
+        self.cost = cost
+        self.running = False
+
+
+def estimate_cost(path: str, model_size: str = "base") -> float:
+    """Cost of analysing `path` with `model_size` ("base", "small:int8", ...), without decoding it."""
+    duration = probe_duration(path)
+    if duration is None:
+        print(f"Admission: no duration in the header of {path}, assuming {UNKNOWN_DURATION_SECONDS:.0f}s")
+        duration = UNKNOWN_DURATION_SECONDS
+    return duration * MODEL_COST.get(split_key(model_size)[0], 1.0)
+
+
+class AdmissionController:
+    """
+    Tracks the cost of running and waiting jobs; see the module docstring.
+
+    `reserve` is called when a job is submitted and either returns a Ticket
+    or raises JobRejected. The job's worker calls `start(ticket)`, which
+    blocks until the job fits under `capacity`, and `finish(ticket, seconds)`
+    when it is done.
+    """
+
+    def __init__(self, capacity: float = DEFAULT_CAPACITY, max_queued: float = DEFAULT_MAX_QUEUED,
+                 seconds_per_cost: float = SECONDS_PER_COST):
+        self.capacity = capacity
+        self.max_queued = max_queued
+        self.seconds_per_cost = seconds_per_cost  # running average over finished jobs
+        self.running_cost = 0.0
+        self.running_jobs = 0
+        self.queued_cost = 0.0
+        self._waiting = deque()  # tickets whose worker is blocked in start(), oldest first
+        self._cond = threading.Condition()
+
+    def _fits(self, cost: float) -> bool:
+        return self.running_jobs == 0 or self.running_cost + cost <= self.capacity
+
+    def reserve(self, cost: float) -> Ticket:
+        """Account for a new job of `cost`, or raise JobRejected if the queue is full."""
+        with self._cond:
+            ahead = self.running_cost + self.queued_cost
+            if ahead == 0 or ahead + cost <= self.capacity:
+                decision = RUN
+            elif self.queued_cost + cost <= self.max_queued:
+                decision = QUEUE
+            else:
+                retry_after = self._retry_after(cost)
+                ADMISSIONS.inc(decision=REJECT)
+                raise JobRejected(f"{self.running_cost + self.queued_cost:.0f} cost units already accepted, "
+                                  f"capacity {self.capacity:.0f} + queue {self.max_queued:.0f}", retry_after)
+            self.queued_cost += cost
+            ADMISSIONS.inc(decision=decision)
+            return Ticket(cost)
+
+    def start(self, ticket: Ticket, timeout: Optional[float] = None) -> bool:
+        """Block until `ticket` fits under capacity and is the oldest waiting one; False on timeout."""
+        with self._cond:
+            self._waiting.append(ticket)
+            try:
+                if not self._cond.wait_for(lambda: self._waiting[0] is ticket and self._fits(ticket.cost),
+                                           timeout):
+                    return False
+            finally:
+                self._waiting.remove(ticket)
+                self._cond.notify_all()
+            self.queued_cost -= ticket.cost
+            self.running_cost += ticket.cost
+            self.running_jobs += 1
+            ticket.running = True
+            return True
+
+    def finish(self, ticket: Ticket, seconds: Optional[float] = None):
+        """Release `ticket`, and learn from how long it ran."""
+        with self._cond:
+            if ticket.running:
+                self.running_cost -= ticket.cost
+                self.running_jobs -= 1
+                ticket.running = False
+                if seconds is not None and ticket.cost > 0:
+                    self.seconds_per_cost = 0.8 * self.seconds_per_cost + 0.2 * seconds / ticket.cost
+            else:
+                self.queued_cost -= ticket.cost  # never started
+            self._cond.notify_all()
+
+    def _retry_after(self, cost: float) -> int:
+        """
+        Seconds until enough queued work has started for `cost` to fit in the
+        queue: that much running work must finish first. Holds the lock.
+        """
+        excess = self.queued_cost + cost - self.max_queued
+        seconds = max(excess, 0.0) * self.seconds_per_cost / max(1, self.running_jobs)
+        return int(min(MAX_RETRY_AFTER, max(1, math.ceil(seconds))))
+
+    def retry_after(self, cost: float = 0.0) -> int:
+        with self._cond:
+            return self._retry_after(cost)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"capacity": self.capacity, "max_queued": self.max_queued, "running_cost": self.running_cost,
+                    "queued_cost": self.queued_cost, "running_jobs": self.running_jobs,
+                    "seconds_per_cost": round(self.seconds_per_cost, 4)}
@@ -0,0 +1,185 @@
+# ==============================
+# batch.py
+# ==============================
+"""
+Batch analysis of many recordings, for coaching cohorts.
+
+Recordings come from a directory (searched recursively for audio/video
+files) or a manifest (one path per line, or JSONL with a "path" field).
+They are analysed on a pool of worker processes. Each worker loads the
+Whisper model once, at start-up, and keeps it warm for every recording it
+handles, so the pool is the only parallelism: long recordings are
+transcribed in-process rather than on a nested pool (see long_audio.py).
+
+Every result is appended to a JSONL file as soon as it finishes, one object
+per line:
+
+    {"path": ..., "model_size": ..., "status": "done", "seconds": ..., "results": {...}}
+    {"path": ..., "model_size": ..., "status": "failed", "seconds": ..., "error": "..."}
+
+Re-running with the same output file skips every recording already marked
+"done" for that model size, so an interrupted batch resumes where it stopped
+and failed recordings are retried.
+"""
+
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+
+from backend.events import _jsonable
+from preprocessing.audio_ingest import AUDIO_EXTENSIONS
+from preprocessing.transcribers import model_key
+
+VIDEO_EXTENSIONS = {".mp4", ".mov", ".m4v", ".mkv", ".webm", ".avi"}
+MEDIA_EXTENSIONS = AUDIO_EXTENSIONS | VIDEO_EXTENSIONS
+# Every worker holds its own Whisper model, so memory grows with the pool
+DEFAULT_WORKERS = int(os.environ.get("SPEAKEASY_BATCH_WORKERS", 0)) or max(1, (os.cpu_count() or 1) // 2)
+
+DONE = "done"
+FAILED = "failed"
+
+# State of a pool worker process
+_runner: Optional[Callable] = None
+
+
+def discover(source: str) -> List[str]:
+    """
+    Recordings to analyse: `source` itself if it is a media file, the media
+    files under it if it is a directory (sorted), or the paths listed in it
+    if it is a manifest. Relative manifest paths are relative to the manifest.
+    """
+    path = Path(source)
+    if path.is_dir():
+        return sorted(str(p) for p in path.rglob("*") if p.is_file() and p.suffix.lower() in MEDIA_EXTENSIONS)
+    if path.suffix.lower() in MEDIA_EXTENSIONS:
+        return [str(path)]
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            entry = json.loads(line)["path"] if line.startswith("{") else line
+            items.append(str(path.parent / entry) if not os.path.isabs(entry) else entry)
+    return items
+
+
+def finished_items(output: str) -> Set[Tuple[str, str]]:
+    """(path, model_size) of every recording already marked done in `output`."""
+    done = set()
+    try:
+        with open(output, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a line cut short by an interrupted run
+                if record.get("status") == DONE:
+                    done.add((record["path"], record["model_size"]))
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def _ends_mid_line(output: str) -> bool:
+    try:
+        with open(output, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+    except (FileNotFoundError, OSError):  # missing or empty
+        return False
+
+
+def _init_worker(model_size: str, runner: Optional[Callable], loader: Optional[Callable], threads: int):
+    global _runner
+    # The batch pool already uses every core; no nested chunk pools for long recordings
+    os.environ["WHISPER_PARALLEL_WORKERS"] = "1"
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    from preprocessing.model_registry import get_registry
+
+    registry = get_registry()
+    if loader is not None:
+        registry.loader = loader
+    try:
+        registry.get(model_size)
+    except Exception as e:
+        print(f"Warning: batch worker {os.getpid()} could not preload '{model_size}': {e}")
+    if runner is None:
+        from preprocessing.process_video import analyze_recording as runner
+    _runner = runner
+
+
+def _analyze(path: str, model_size: str) -> dict:
+    start = time.perf_counter()
+    record = {"path": path, "model_size": model_size}
+    try:
+        results = _runner(path, model_size=model_size)
+        record.update(status=DONE, results=results)
+    except Exception as e:
+        traceback.print_exc()
+        record.update(status=FAILED, error=f"{type(e).__name__}: {e}")
+    record["seconds"] = round(time.perf_counter() - start, 2)
+    record["worker"] = os.getpid()
+    return record
+
+
+def run_batch(items: Iterable[str], output: str, model_size: str = "base", workers: int = DEFAULT_WORKERS,
+              runner: Optional[Callable] = None, loader: Optional[Callable] = None) -> dict:
+    """
+    Analyse `items` on `workers` processes, appending each result to the
+    JSONL file `output` as it finishes and skipping items already done there.
+
+    Args:
+        runner: `runner(path, model_size=...)` returning the result dict;
+            defaults to process_video.analyze_recording. Must be picklable.
+        loader: Whisper loader for the workers' registries (e.g. a stand-in).
+
+    Returns:
+        dict: Counts, wall time and throughput in recordings per minute.
+    """
+    model_size = model_key(model_size)  # "base" and "base:int8" results are kept apart
+    items = list(dict.fromkeys(items))
+    done = finished_items(output)
+    todo = [path for path in items if (path, model_size) not in done]
+    print(f"Batch: {len(items)} recordings, {len(items) - len(todo)} already done, {len(todo)} to analyse "
+          f"on {workers} workers with the '{model_size}' model")
+    summary = {"total": len(items), "skipped": len(items) - len(todo), DONE: 0, FAILED: 0}
+
+    start = time.perf_counter()
+    if todo:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        # spawn, not fork: forking a process that already runs torch threads can deadlock
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo)), mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(model_size, runner, loader, threads)) as pool, \
+                open(output, "a", encoding="utf-8") as out:
+            if _ends_mid_line(output):
+                out.write("\n")  # don't glue the first record onto a line cut short by a crash
+            futures = [pool.submit(_analyze, path, model_size) for path in todo]
+            try:
+                for n, future in enumerate(as_completed(futures), 1):
+                    record = future.result()
+                    out.write(json.dumps(record, default=_jsonable) + "\n")
+                    out.flush()
+                    os.fsync(out.fileno())
+                    summary[record["status"]] += 1
+                    print(f"Batch [{n}/{len(todo)}] {record['status']} {record['path']} in {record['seconds']:.1f}s")
+            except KeyboardInterrupt:
+                print("Batch interrupted; finished recordings are saved, re-run to resume")
+                for future in futures:
+                    future.cancel()
+                raise
+    summary["seconds"] = round(time.perf_counter() - start, 2)
+    analysed = summary[DONE] + summary[FAILED]
+    summary["recordings_per_minute"] = round(analysed / summary["seconds"] * 60, 2) if analysed else 0.0
+    print(f"Batch: {summary[DONE]} done, {summary[FAILED]} failed, {summary['skipped']} skipped in "
+          f"{summary['seconds']:.1f}s ({summary['recordings_per_minute']:.2f} recordings/min)")
+    return summary
@@ -0,0 +1,52 @@
+# ==============================
+# events.py
+# ==============================
+"""
+Server-sent events for job progress.
+
+A stream is a `job` event (job ID and status), one `stage` event per stage
+result as soon as the pipeline has it ({"stage": name, "result": ...}), and
+a final `done` event carrying the same body as GET /jobs/<job_id>. Comment
+lines are sent while nothing happens so that proxies keep the connection open.
+"""
+
+import json
+from typing import Iterator, Optional
+
+import numpy as np
+
+KEEPALIVE_SECONDS = 15.0
+
+
+def _jsonable(value):
+    """json.dumps fallback for the NumPy scalars and arrays that stage results may hold."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def format_event(event: str, data) -> str:
+    """One SSE message; the JSON payload is always a single line."""
+    return f"event: {event}\ndata: {json.dumps(data, default=_jsonable)}\n\n"
+
+
+def job_events(job, first: Optional[dict] = None, keepalive: float = KEEPALIVE_SECONDS) -> Iterator[str]:
+    """
+    SSE messages for `job` until it finishes. Stages that finished before the
+    client connected are replayed first, so joining late loses nothing.
+
+    Args:
+        job: A backend.jobs.Job
+        first: Extra fields for the opening `job` event (e.g. upload metrics)
+        keepalive: Seconds of silence after which a comment line is sent
+    """
+    yield format_event("job", dict({"job_id": job.id, "status": job.status}, **(first or {})))
+    for item in job.stream(timeout=keepalive):
+        if item is None:
+            yield ": keep-alive\n\n"
+        else:
+            stage, result = item
+            yield format_event("stage", {"stage": stage, "result": result})
+    yield format_event("done", job.to_dict())
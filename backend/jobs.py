@@ -0,0 +1,257 @@
+# ==============================
+# jobs.py
+# ==============================
+
+import os
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from preprocessing.telemetry import cache_lookup, registry, request_context
+
+DEFAULT_WORKERS = int(os.environ.get("SPEAKEASY_WORKERS", 2))
+DEFAULT_MAX_PENDING = int(os.environ.get("SPEAKEASY_MAX_PENDING", 16))
+DEFAULT_MAX_FINISHED = int(os.environ.get("SPEAKEASY_MAX_FINISHED_JOBS", 500))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+JOBS_FINISHED = registry.counter(
+    "speakeasy_jobs_total", "Jobs finished, by status (done, failed, deduplicated).", ("status",))
+
+
+class JobQueueFull(Exception):
+    """Raised when the pending-job queue is at capacity."""
+
+
+class Job:
+    def __init__(self, job_id: str, input_path: str, model_size: str, workspace=None, key: str = None):
+        self.id = job_id
+        self.input_path = input_path
+        self.model_size = model_size
+        self.workspace = workspace
+        self.key = key
+        self.ticket = None  # admission reservation, see backend/admission.py
+        self.cached = False
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done_event = threading.Event()
+        self.events: List[Tuple[str, object]] = []  # (stage, result) in the order they finished
+        self.spans: List[dict] = []  # timing spans of the run, see preprocessing/telemetry.py
+        self._changed = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def publish(self, stage: str, result):
+        """Record a stage result as soon as the pipeline has it."""
+        with self._changed:
+            self.events.append((stage, result))
+            self._changed.notify_all()
+
+    def _notify(self):
+        with self._changed:
+            self._changed.notify_all()
+
+    def stream(self, timeout: Optional[float] = None) -> Iterator[Optional[Tuple[str, object]]]:
+        """
+        Yield (stage, result) for every published stage, from the first one,
+        until the job finishes. Yields None whenever `timeout` seconds pass
+        without news, so callers can send keep-alives.
+        """
+        sent = 0
+        while True:
+            with self._changed:
+                if sent >= len(self.events) and not self.finished:
+                    self._changed.wait(timeout)
+                new = self.events[sent:]
+                finished = self.finished
+            sent += len(new)
+            yield from new
+            if finished and sent >= len(self.events):
+                return
+            if not new:
+                yield None
+
+    def to_dict(self) -> dict:
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.cached:
+            data["cached"] = True
+        if self.events:
+            data["stages_done"] = [stage for stage, _ in self.events]
+        if self.spans:
+            data["spans"] = self.spans
+        if self.status == DONE:
+            data["results"] = self.result
+        if self.status == FAILED:
+            data["error"] = self.error
+        return data
+
+
+class JobManager:
+    """
+    Runs pipeline jobs on a bounded worker pool.
+
+    `runner(input_path, model_size)` is called on a worker thread and its return
+    value becomes the job's result. At most `max_workers` jobs run at once and at
+    most `max_pending` wait behind them; further submissions raise JobQueueFull.
+
+    With `stage_events=True`, the runner is also passed `on_stage=job.publish`
+    so it can report intermediate results (see Job.stream). The runner runs in
+    a telemetry request context named after the job, so its spans are tagged
+    with the job id and listed under "spans" in the job's JSON.
+
+    Jobs submitted with a `key` (the upload's content hash plus model size) are
+    de-duplicated: a key already in `result_store` yields a finished job
+    straight away, and a key that is queued or running returns that job.
+
+    With an `admission` controller (backend/admission.py), new jobs also
+    reserve their `cost`: submit raises JobRejected when too much work is
+    already accepted, and a job stays queued until its cost fits.
+    """
+
+    def __init__(self, runner: Callable, max_workers: int = DEFAULT_WORKERS,
+                 max_pending: int = DEFAULT_MAX_PENDING, max_finished: int = DEFAULT_MAX_FINISHED,
+                 result_store=None, stage_events: bool = False, admission=None):
+        self.runner = runner
+        self.admission = admission
+        self.stage_events = stage_events
+        self.result_store = result_store
+        self._active_by_key = {}
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speakeasy-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def submit(self, input_path: str, model_size: str = "base", workspace=None, key: str = None,
+               cost: float = 0.0) -> Job:
+        """
+        Queue `input_path` for processing. If a workspace is given, it is
+        cleaned up once the job finishes (or at once, if the job is a duplicate).
+        `cost` is the job's estimated cost for admission control.
+        """
+        with self._lock:
+            if key is not None:
+                duplicate = self._find_duplicate(key, input_path, model_size)
+                if duplicate is not None:
+                    if workspace is not None:
+                        workspace.cleanup()
+                    return duplicate
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"{self._pending} jobs already waiting")
+            ticket = self.admission.reserve(cost) if self.admission is not None else None
+            job = Job(uuid.uuid4().hex, input_path, model_size, workspace, key)
+            job.ticket = ticket
+            self._jobs[job.id] = job
+            if key is not None:
+                self._active_by_key[key] = job
+            self._pending += 1
+            self._prune()
+        self._executor.submit(self._run, job)
+        print(f"JobManager: queued job {job.id} for {input_path}")
+        return job
+
+    def find(self, key: str, input_path: str, model_size: str = "base") -> Optional[Job]:
+        """
+        In-flight job or stored analysis for `key`, without queueing anything,
+        so callers can skip work (like pricing the job) for duplicates.
+        """
+        with self._lock:
+            return self._find_duplicate(key, input_path, model_size)
+
+    def _find_duplicate(self, key: str, input_path: str, model_size: str) -> Optional[Job]:
+        """In-flight job or stored analysis for `key`. Caller holds the lock."""
+        active = self._active_by_key.get(key)
+        if active is not None:
+            print(f"JobManager: joining in-flight job {active.id} for {input_path}")
+            JOBS_FINISHED.inc(status="deduplicated")
+            return active
+        if self.result_store is None:
+            return None
+        stored = self.result_store.get(key)
+        cache_lookup("analysis", stored is not None)
+        if stored is None:
+            return None
+        JOBS_FINISHED.inc(status="deduplicated")
+        job = Job(uuid.uuid4().hex, input_path, model_size, key=key)
+        job.status, job.result, job.cached = DONE, stored, True
+        job.started_at = job.finished_at = job.created_at
+        job.done_event.set()
+        self._jobs[job.id] = job
+        self._prune()
+        print(f"JobManager: serving stored analysis for {input_path} as job {job.id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            running = sum(1 for j in self._jobs.values() if j.status == RUNNING)
+            return {"workers": self.max_workers, "pending": self._pending, "running": running}
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job: Job):
+        if job.ticket is not None:
+            self.admission.start(job.ticket)  # stays queued until its cost fits
+        with self._lock:
+            self._pending -= 1
+            job.status = RUNNING
+            job.started_at = time.time()
+        try:
+            kwargs = {"on_stage": job.publish} if self.stage_events else {}
+            with request_context(job.id) as ctx:
+                try:
+                    job.result = self.runner(job.input_path, job.model_size, **kwargs)
+                finally:
+                    job.spans = ctx.summary()
+            if job.key is not None and self.result_store is not None:
+                self.result_store.put(job.key, job.result)
+            job.status = DONE
+        except Exception as e:
+            traceback.print_exc()
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            JOBS_FINISHED.inc(status=job.status)
+            if job.ticket is not None:
+                self.admission.finish(job.ticket, time.time() - job.started_at)
+            if job.key is not None:
+                with self._lock:
+                    self._active_by_key.pop(job.key, None)
+            if job.workspace is not None:
+                job.workspace.cleanup()
+            job.finished_at = time.time()
+            job.done_event.set()
+            job._notify()
+            print(f"JobManager: job {job.id} {job.status} in {job.finished_at - job.started_at:.1f}s")
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond `max_finished`. Caller holds the lock."""
+        finished = [jid for jid, j in self._jobs.items() if j.finished]
+        for jid in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[jid]
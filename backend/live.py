@@ -0,0 +1,185 @@
+# ==============================
+# live.py
+# ==============================
+"""
+Live practice over a WebSocket (/live).
+
+Protocol:
+    client -> server  binary messages of 16 kHz mono little-endian int16 PCM,
+                      any chunk size; a text message {"type": "stop"} ends the
+                      session. Other text messages are ignored; ones that are
+                      not JSON objects are answered with {"type": "error"}.
+    server -> client  {"type": "ready"} once the model is warm, then a
+                      {"type": "update"} after each transcription pass and a
+                      {"type": "final"} summary after "stop". Clients should
+                      wait for it before closing the socket.
+"""
+
+import json
+import os
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from models.prosody import RATE_WINDOW_SECONDS, pace_label, words_per_minute
+from preprocessing.audio_ingest import SAMPLE_RATE
+from preprocessing.fillers import FillerStream, count_fillers, words_from_result
+from preprocessing.model_registry import get_model, inference_lock
+from preprocessing.transcribers import model_key
+
+LIVE_MODEL_SIZE = os.environ.get("SPEAKEASY_LIVE_MODEL", "tiny")
+WINDOW_SECONDS = float(os.environ.get("SPEAKEASY_LIVE_WINDOW_SECONDS", 8.0))
+HOP_SECONDS = float(os.environ.get("SPEAKEASY_LIVE_HOP_SECONDS", 1.0))
+# Words ending this close to the live edge may still change in the next window
+STABLE_MARGIN_SECONDS = 1.5
+PROMPT_CHARS = 200
+
+
+def whisper_transcriber(model_size: str = LIVE_MODEL_SIZE) -> Callable[[np.ndarray, str], dict]:
+    """Transcribe function backed by the shared, warm registry model."""
+    model_size = model_key(model_size)
+    model = get_model(model_size)
+
+    def transcribe(audio: np.ndarray, prompt: str = "") -> dict:
+        with inference_lock(model_size):
+            return model.transcribe(audio, word_timestamps=True, condition_on_previous_text=False,
+                                    initial_prompt=prompt or None, fp16=False)
+
+    return transcribe
+
+
+class LiveSession:
+    """
+    Incremental transcription of one live practice session.
+
+    Every `hop_seconds` of new audio, the last `window_seconds` (never reaching
+    back before the committed text) are transcribed. Words that end more than
+    STABLE_MARGIN_SECONDS before the live edge are committed and never
+    re-transcribed; the rest are reported as a tentative partial. Committed
+    words feed the same filler matcher and WPM formula as process_video.
+    """
+
+    def __init__(self, transcribe: Callable[[np.ndarray, str], dict], window_seconds: float = WINDOW_SECONDS,
+                 hop_seconds: float = HOP_SECONDS, sr: int = SAMPLE_RATE):
+        self.transcribe = transcribe
+        self.window_seconds = window_seconds
+        self.hop_seconds = hop_seconds
+        self.sr = sr
+        self.committed: List[dict] = []
+        self.committed_until = 0.0
+        self.fillers = FillerStream()
+        self._audio = np.zeros(0, dtype=np.float32)
+        self._audio_start = 0.0  # session time of self._audio[0]
+        self._received = 0        # samples received in total
+        self._last_update = 0.0   # session time of the last transcription pass
+
+    @property
+    def received_seconds(self) -> float:
+        return self._received / self.sr
+
+    def feed(self, pcm: bytes):
+        """Append a chunk of int16 PCM."""
+        samples = np.frombuffer(pcm[:len(pcm) // 2 * 2], dtype="<i2").astype(np.float32) / 32768.0
+        self._audio = np.concatenate([self._audio, samples])
+        self._received += len(samples)
+        # Only the live window (and what is still uncommitted) is ever transcribed again
+        keep_from = min(self.committed_until, self.received_seconds - self.window_seconds)
+        drop = int((keep_from - self._audio_start) * self.sr)
+        if drop > 0:
+            self._audio = self._audio[drop:]
+            self._audio_start += drop / self.sr
+
+    def due(self) -> bool:
+        return self.received_seconds - self._last_update >= self.hop_seconds
+
+    def update(self, final: bool = False) -> dict:
+        """Transcribe the live window and report partial transcript, pace and new filler alerts."""
+        started = time.perf_counter()
+        now = self.received_seconds
+        start = max(self.committed_until, now - self.window_seconds, self._audio_start)
+        window = self._audio[int((start - self._audio_start) * self.sr):]
+        prompt = "".join(w["word"] for w in self.committed)[-PROMPT_CHARS:]
+        words = []
+        if len(window) >= self.sr * 0.3:
+            for w in words_from_result(self.transcribe(window, prompt)):
+                if w["start"] is not None:
+                    words.append(dict(w, start=float(w["start"] + start), end=float((w["end"] or w["start"]) + start)))
+
+        stable_before = now if final else now - STABLE_MARGIN_SECONDS
+        newly_committed = [w for w in words if w["end"] <= stable_before]
+        partial = words[len(newly_committed):]
+        if newly_committed:
+            self.committed.extend(newly_committed)
+            self.committed_until = newly_committed[-1]["end"]
+        elif not words:
+            # Nothing said in the window: nothing older than it can change any more
+            self.committed_until = max(self.committed_until, now - STABLE_MARGIN_SECONDS)
+        alerts = self.fillers.feed(newly_committed)
+        self._last_update = now
+
+        recent_from = max(now - RATE_WINDOW_SECONDS, 0.0)
+        recent_words = sum(1 for w in self.committed if w["start"] >= recent_from)
+        recent_wpm = words_per_minute(recent_words, now - recent_from)
+        return {
+            "type": "update",
+            "audio_seconds": round(now, 2),
+            "committed": "".join(w["word"] for w in newly_committed).strip(),
+            "partial": "".join(w["word"] for w in partial).strip(),
+            "word_count": len(self.committed),
+            "wpm": round(words_per_minute(len(self.committed), now), 1),
+            "recent_wpm": round(recent_wpm, 1),
+            "pace": pace_label(recent_wpm) if now >= 10 else None,
+            "filler_alerts": alerts,
+            "compute_seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def finish(self) -> dict:
+        """Commit whatever is left and summarise the session."""
+        self.update(final=True)
+        now = self.received_seconds
+        return {
+            "type": "final",
+            "audio_seconds": round(now, 2),
+            "transcript": "".join(w["word"] for w in self.committed).strip(),
+            "word_count": len(self.committed),
+            "wpm": round(words_per_minute(len(self.committed), now), 1),
+            "filler_word_instances": self.fillers.found,
+            "filler_counts": count_fillers(self.fillers.found),
+        }
+
+
+def live_socket(ws, transcriber: Optional[Callable] = None):
+    """
+    WebSocket handler. Chunks that arrive while a pass is running are drained
+    before the next one, so a slow pass makes the next window larger instead
+    of building up a backlog.
+    """
+    from simple_websocket import ConnectionClosed
+
+    session = LiveSession(transcriber or whisper_transcriber())
+    try:
+        ws.send(json.dumps({"type": "ready", "sample_rate": SAMPLE_RATE, "hop_seconds": session.hop_seconds}))
+        stop = False
+        while not stop:
+            message = ws.receive()
+            while message is not None:
+                if isinstance(message, str):
+                    try:
+                        kind = json.loads(message).get("type")
+                    except (ValueError, AttributeError):
+                        ws.send(json.dumps({"type": "error", "error": "control messages must be JSON objects"}))
+                        kind = None
+                    if kind == "stop":
+                        stop = True
+                        break
+                else:
+                    session.feed(message)
+                message = ws.receive(timeout=0)
+            if not stop and session.due():
+                ws.send(json.dumps(session.update()))
+        # The summary costs a full pass over the last window; skip it if nobody is left to read it
+        if getattr(ws, "connected", True):
+            ws.send(json.dumps(session.finish()))
+    except ConnectionClosed:
+        print(f"Live session closed by the client after {session.received_seconds:.1f}s of audio")
@@ -0,0 +1,95 @@
+# ==============================
+# results.py
+# ==============================
+
+import json
+import os
+import tempfile
+import time
+from typing import Optional
+from urllib.parse import quote
+
+RESULTS_DIR = os.environ.get("SPEAKEASY_RESULTS_DIR", os.path.join("cache", "analyses"))
+RESULTS_MAX_BYTES = int(os.environ.get("SPEAKEASY_RESULTS_MAX_BYTES", 256 * 1024 ** 2))
+RESULTS_TTL_SECONDS = int(os.environ.get("SPEAKEASY_RESULTS_TTL", 30 * 24 * 60 * 60))
+RESULT_EXT = ".json"
+
+
+class AnalysisStore:
+    """
+    Completed analyses, stored as one JSON file per key (upload hash + model size).
+
+    Writes go to a temp file that is renamed into place, so a reader in another
+    worker process sees either the whole analysis or none of it. Keys are
+    percent-encoded into file names, so model keys like "base:int8" stay
+    portable.
+
+    An analysis expires `ttl` seconds after it was written (its mtime). Reads
+    set the atime, and the least recently read analyses are evicted once the
+    store grows past `max_bytes`. Eviction runs after each write; a file
+    evicted by another process just reads as missing.
+    """
+
+    def __init__(self, root: str = RESULTS_DIR, max_bytes: int = RESULTS_MAX_BYTES,
+                 ttl: float = RESULTS_TTL_SECONDS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, quote(key, safe="") + RESULT_EXT)
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            written = os.stat(path).st_mtime
+            if written + self.ttl < time.time():
+                os.unlink(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            os.utime(path, (time.time(), written))  # mark as read, keep the write time
+            return result
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: str, result: dict):
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=self.root)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        self.evict(keep=key)
+
+    def evict(self, keep: Optional[str] = None):
+        """Delete expired analyses, then the least recently read until the store fits in max_bytes."""
+        now = time.time()
+        keep_path = self._path(keep) if keep else None
+        entries = []
+        for entry in os.scandir(self.root):
+            if not (entry.is_file() and entry.name.endswith(RESULT_EXT)):
+                continue
+            try:
+                stat = entry.stat()
+                if stat.st_mtime + self.ttl < now:
+                    os.unlink(entry.path)
+                    continue
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep_path:
+                continue
+            try:
+                os.unlink(path)
+                total -= size
+                print(f"AnalysisStore: evicted {os.path.basename(path)}")
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,191 @@
+# ==============================
+# uploads.py
+# ==============================
+
+import hashlib
+import os
+import time
+from typing import Optional
+
+from flask import Request
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge, UnsupportedMediaType
+
+from backend.workspace import Workspace
+
+CHUNK_SIZE = 1024 * 1024
+MAX_UPLOAD_BYTES = int(os.environ.get("SPEAKEASY_MAX_UPLOAD_BYTES", 2 * 1024 ** 3))
+SNIFF_BYTES = 16
+
+RAW_UPLOAD_MIMETYPES = ("application/octet-stream",)
+
+
+def sniff_media(head: bytes) -> Optional[str]:
+    """Container type from a file's first bytes, or None if it is not audio/video."""
+    if head[4:8] == b"ftyp":
+        return "mp4"
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return "webm"
+    if head.startswith(b"RIFF") and head[8:12] in (b"WAVE", b"AVI "):
+        return "wav" if head[8:12] == b"WAVE" else "avi"
+    if head.startswith(b"OggS"):
+        return "ogg"
+    if head.startswith(b"fLaC"):
+        return "flac"
+    if head.startswith(b"ID3") or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "mpeg-audio"
+    if head.startswith(b"\x00\x00\x01\xba"):
+        return "mpeg"
+    return None
+
+
+class IngestFile:
+    """
+    Write-through file for one upload. Every chunk is hashed, counted against
+    `max_bytes` and written straight to `path`. The first bytes are checked
+    against known media containers, so oversize or non-media payloads are
+    refused part-way through the body rather than after it has been stored.
+    """
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None):
+        self.path = path
+        self.max_bytes = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+        self.bytes = 0
+        self.media_type = None
+        self._digest = hashlib.sha256()
+        self._head = b""
+        self._started = None
+        self._finished = None
+        self._file = open(path, "wb+")
+
+    def write(self, data: bytes) -> int:
+        if self._started is None:
+            self._started = time.perf_counter()
+        self.bytes += len(data)
+        if self.bytes > self.max_bytes:
+            raise RequestEntityTooLarge(f"Upload exceeds {self.max_bytes} bytes")
+        if self.media_type is None:
+            self._head += data[:SNIFF_BYTES]
+            if len(self._head) >= SNIFF_BYTES:
+                self._check_media()
+        self._digest.update(data)
+        return self._file.write(data)
+
+    def _check_media(self):
+        self.media_type = sniff_media(self._head[:SNIFF_BYTES])
+        if self.media_type is None:
+            raise UnsupportedMediaType("Upload is not a recognised audio or video file")
+
+    def finish(self):
+        """Called once the whole body is written; validates very short uploads."""
+        if self._finished is None:
+            self._finished = time.perf_counter()
+            if self.media_type is None:
+                self._check_media()
+            self._file.flush()
+
+    # File-like surface used by Werkzeug's FileStorage
+    def seek(self, *args):
+        self.finish()
+        return self._file.seek(*args)
+
+    def read(self, *args):
+        return self._file.read(*args)
+
+    def tell(self):
+        return self._file.tell()
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    @property
+    def seconds(self) -> float:
+        if self._started is None:
+            return 0.0
+        return (self._finished or time.perf_counter()) - self._started
+
+    def metrics(self) -> dict:
+        seconds = self.seconds
+        return {
+            "bytes": self.bytes,
+            "seconds": round(seconds, 3),
+            "bytes_per_second": round(self.bytes / seconds) if seconds > 0 else None,
+            "media_type": self.media_type,
+        }
+
+
+class StreamingUploadRequest(Request):
+    """
+    Flask request class that streams multipart file parts into a private
+    per-request Workspace through IngestFile, instead of Werkzeug's default
+    spooled temporary files.
+    """
+
+    upload_workspace: Optional[Workspace] = None
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.upload_workspace is None:
+            self.upload_workspace = Workspace()
+        if not hasattr(self, "ingested_files"):
+            self.ingested_files = []
+        name = "upload" if not self.ingested_files else f"upload{len(self.ingested_files)}"
+        ingest = IngestFile(self.upload_workspace.file(filename, default_name=name))
+        self.ingested_files.append(ingest)
+        return ingest
+
+
+def receive_upload(request: StreamingUploadRequest, field: str = "file") -> Optional[IngestFile]:
+    """
+    Stream the request's upload to disk and return its IngestFile, or None if
+    the request carries no file. Accepts multipart form uploads (in `field`)
+    and raw bodies sent as audio/*, video/* or application/octet-stream.
+
+    The upload's workspace is `request.upload_workspace`; it is removed again
+    if the upload is rejected.
+    """
+    if request.content_length is not None and request.content_length > MAX_UPLOAD_BYTES + CHUNK_SIZE:
+        raise RequestEntityTooLarge(f"Upload exceeds {MAX_UPLOAD_BYTES} bytes")
+
+    try:
+        mimetype = request.mimetype or ""
+        if mimetype.startswith(("audio/", "video/")) or mimetype in RAW_UPLOAD_MIMETYPES:
+            request.upload_workspace = Workspace()
+            ingest = IngestFile(request.upload_workspace.file(request.args.get("filename", "")))
+            stream = request.stream
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                ingest.write(chunk)
+        elif field in request.files:
+            ingest = request.files[field].stream
+            if not isinstance(ingest, IngestFile):
+                raise BadRequest("Upload was not streamed to disk")
+        else:
+            return None
+        ingest.finish()
+        ingest.close()
+    except Exception:
+        if request.upload_workspace is not None:
+            request.upload_workspace.cleanup()
+        raise
+
+    metrics = ingest.metrics()
+    print(f"Upload ingested: {metrics['bytes'] / 1e6:.1f} MB in {metrics['seconds']:.2f}s "
+          f"({(metrics['bytes_per_second'] or 0) / 1e6:.1f} MB/s, {metrics['media_type']})")
+    return ingest
+
+
+def hash_file(path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,45 @@
+# ==============================
+# workspace.py
+# ==============================
+
+import os
+import shutil
+import tempfile
+import uuid
+
+from werkzeug.utils import secure_filename
+
+UPLOAD_ROOT = os.environ.get("SPEAKEASY_UPLOAD_DIR", "uploads")
+KEEP_WORKSPACES = os.environ.get("SPEAKEASY_KEEP_WORKSPACES", "").lower() in ("1", "true", "yes")
+
+
+class Workspace:
+    """
+    Private scratch directory for one request.
+
+    Uploads are stored under a server-generated directory instead of the
+    client's filename, so simultaneous requests can never overwrite each
+    other's files. The directory is removed by `cleanup()` once the job is
+    finished, unless SPEAKEASY_KEEP_WORKSPACES is set.
+    """
+
+    def __init__(self, root: str = UPLOAD_ROOT):
+        os.makedirs(root, exist_ok=True)
+        self.id = uuid.uuid4().hex
+        self.path = tempfile.mkdtemp(prefix=f"{self.id}-", dir=root)
+
+    def file(self, client_filename: str = "", default_name: str = "upload") -> str:
+        """Path inside the workspace for an upload, keeping only its (sanitised) extension."""
+        ext = os.path.splitext(secure_filename(client_filename or ""))[1].lower()
+        return os.path.join(self.path, default_name + ext)
+
+    def cleanup(self):
+        if KEEP_WORKSPACES:
+            return
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
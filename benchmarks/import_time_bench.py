@@ -0,0 +1,93 @@
+# ==============================
+# import_time_bench.py
+# ==============================
+"""
+Cold-start cost of a server worker: the time to `import app` in a fresh
+interpreter, beyond the interpreter's own start-up, against a budget.
+
+Each run is a new process, so nothing is cached in memory (files stay in the
+OS page cache, as they would for a worker restarted on the same machine).
+It also checks that none of the heavy dependencies (HEAVY_MODULES in
+preprocessing/warmup.py) were imported, and lists the slowest imports.
+Exits 1 if the median is over budget or a heavy module was imported.
+
+Usage:
+    python benchmarks/import_time_bench.py
+    python benchmarks/import_time_bench.py --module app --budget 0.5 --runs 7
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from preprocessing.warmup import HEAVY_MODULES
+
+DEFAULT_BUDGET_SECONDS = float(os.environ.get("SPEAKEASY_IMPORT_BUDGET_SECONDS", 0.75))
+
+
+def _timed(code: str, *flags: str):
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, *flags, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{code!r} failed:\n{proc.stderr[-2000:]}")
+    return elapsed, proc
+
+
+def slowest_imports(module: str, top: int):
+    """(cumulative seconds, name) of the `top` slowest top-level imports, from -X importtime."""
+    _, proc = _timed(f"import {module}", "-X", "importtime")
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)", line)
+        if match and len(match.group(2)) <= 3:  # imported by `module` or one level below
+            rows.append((int(match.group(1)) / 1e6, match.group(3)))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS,
+                        help="allowed seconds for the import, on top of interpreter start-up")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args()
+
+    check = f"import sys, json, {args.module}; print(json.dumps([m for m in {list(HEAVY_MODULES)!r} if m in sys.modules]))"
+    bare = statistics.median(_timed("pass")[0] for _ in range(args.runs))
+    runs, loaded = [], []
+    for _ in range(args.runs):
+        elapsed, proc = _timed(check)
+        runs.append(elapsed - bare)
+        loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    median = statistics.median(runs)
+    print(f"import {args.module}: median {median:.3f}s, max {max(runs):.3f}s over {args.runs} runs "
+          f"(interpreter start-up {bare:.3f}s excluded); budget {args.budget:.2f}s")
+    print("slowest imports:")
+    for seconds, name in slowest_imports(args.module, args.top):
+        print(f"  {seconds:7.3f}s  {name}")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: heavy modules imported at start-up: {loaded}")
+        failed = True
+    if median > args.budget:
+        print(f"FAIL: import took {median:.3f}s, over the {args.budget:.2f}s budget")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# ==============================
+# live_replay.py
+# ==============================
+"""
+Replays a recording against the /live WebSocket as a real-time stream of PCM
+chunks and measures end-to-end lag: for each update, the time between
+sending the last chunk it covers and receiving the update.
+
+Usage:
+    python benchmarks/live_replay.py talk.wav --url ws://localhost:5000/live
+    python benchmarks/live_replay.py talk.wav --local --model tiny --chunk-ms 250
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import simple_websocket
+
+from preprocessing.audio_ingest import SAMPLE_RATE, load_audio
+
+
+def start_local_server(model_size: str) -> str:
+    """Serve /live in this process with a warm model; returns its URL."""
+    from flask import Flask
+    from flask_sock import Sock
+    from werkzeug.serving import make_server
+
+    from backend.live import live_socket, whisper_transcriber
+
+    transcriber = whisper_transcriber(model_size)
+    app = Flask(__name__)
+    Sock(app).route("/live")(lambda ws: live_socket(ws, transcriber=transcriber))
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"ws://127.0.0.1:{server.server_port}/live"
+
+
+def replay(url: str, audio: np.ndarray, chunk_ms: int, speed: float):
+    """Stream `audio` in real time and collect (message, receive time) pairs."""
+    pcm = (np.clip(audio, -1, 1) * 32767).astype("<i2")
+    chunk = SAMPLE_RATE * chunk_ms // 1000
+    ws = simple_websocket.Client(url)
+    ready = json.loads(ws.receive(timeout=120))
+    assert ready["type"] == "ready", ready
+
+    messages = []
+
+    def reader():
+        while True:
+            message = json.loads(ws.receive())
+            messages.append((message, time.perf_counter()))
+            if message["type"] == "final":
+                return
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+
+    sent_at = []  # (audio seconds sent so far, time sent)
+    started = time.perf_counter()
+    for i in range(0, len(pcm), chunk):
+        # Pace the chunks like a microphone would deliver them
+        due = started + i / SAMPLE_RATE / speed
+        time.sleep(max(0.0, due - time.perf_counter()))
+        ws.send(pcm[i:i + chunk].tobytes())
+        sent_at.append((min(i + chunk, len(pcm)) / SAMPLE_RATE, time.perf_counter()))
+    stop_sent = time.perf_counter()
+    ws.send(json.dumps({"type": "stop"}))
+    thread.join()
+    ws.close()
+    return messages, sent_at, stop_sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio", help="recording to replay (any format ffmpeg reads)")
+    parser.add_argument("--url", default="ws://localhost:5000/live")
+    parser.add_argument("--local", action="store_true", help="serve /live in-process instead of using --url")
+    parser.add_argument("--model", default=None, help="model size for --local (default SPEAKEASY_LIVE_MODEL)")
+    parser.add_argument("--chunk-ms", type=int, default=250)
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed relative to real time")
+    args = parser.parse_args()
+
+    audio = load_audio(args.audio)
+    url = args.url
+    if args.local:
+        from backend.live import LIVE_MODEL_SIZE
+        print(f"Loading {args.model or LIVE_MODEL_SIZE} model ...")
+        url = start_local_server(args.model or LIVE_MODEL_SIZE)
+    print(f"audio={args.audio} duration={len(audio) / SAMPLE_RATE:.1f}s url={url} chunk={args.chunk_ms}ms")
+
+    messages, sent_at, stop_sent = replay(url, audio, args.chunk_ms, args.speed)
+    sent_seconds = np.array([s for s, _ in sent_at])
+    sent_times = np.array([t for _, t in sent_at])
+
+    lags, compute = [], []
+    for message, received in messages:
+        if message["type"] != "update":
+            continue
+        covered = np.searchsorted(sent_seconds, message["audio_seconds"] - 1e-6)
+        lags.append(received - sent_times[min(covered, len(sent_times) - 1)])
+        compute.append(message["compute_seconds"])
+        if message["filler_alerts"]:
+            print(f"  {message['audio_seconds']:>7.1f}s fillers: {[a['filler'] for a in message['filler_alerts']]}")
+
+    final, final_received = messages[-1]
+    if lags:
+        lags_ms = np.array(lags) * 1000
+        print(f"updates={len(lags)} lag p50={np.percentile(lags_ms, 50):.0f}ms "
+              f"p95={np.percentile(lags_ms, 95):.0f}ms max={lags_ms.max():.0f}ms "
+              f"compute p50={np.median(compute) * 1000:.0f}ms")
+    print(f"final after stop: {(final_received - stop_sent) * 1000:.0f}ms  wpm={final['wpm']}  "
+          f"fillers={final['filler_counts']}")
+    print(f"transcript: {final['transcript']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# ==============================
+# parallel_transcribe_bench.py
+# ==============================
+"""
+Wall-clock transcription time for a long recording: one model.transcribe call
+versus VAD-chunked parallel transcription with 1, 2, 4 and 8 workers.
+
+The recording is built by repeating a speech clip with short pauses between
+repetitions until it reaches --minutes, so chunk boundaries behave like a real
+rehearsal. Worker start-up and model loading are excluded (the pool is warmed
+first), as they are paid once per server process.
+
+Usage:
+    python benchmarks/parallel_transcribe_bench.py --model-size base --minutes 10
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from preprocessing.audio_ingest import SAMPLE_RATE, load_audio
+from preprocessing.long_audio import ParallelTranscriber
+from preprocessing.model_registry import WhisperModelRegistry
+
+
+def build_recording(clip: np.ndarray, minutes: float, pause_seconds: float = 0.8, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    target = int(minutes * 60 * SAMPLE_RATE)
+    parts, total = [], 0
+    while total < target:
+        pause = (0.001 * rng.standard_normal(int(pause_seconds * SAMPLE_RATE))).astype(np.float32)
+        parts += [clip, pause]
+        total += len(clip) + len(pause)
+    return np.concatenate(parts)[:target]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-size", default="base")
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--clip", default=os.path.join(ROOT, "preprocessing", "test1.wav"))
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--skip-serial", action="store_true", help="skip the single transcribe() baseline")
+    args = parser.parse_args()
+
+    audio = build_recording(load_audio(args.clip), args.minutes)
+    print(f"model={args.model_size} recording={len(audio) / SAMPLE_RATE / 60:.1f} min cpus={os.cpu_count()}")
+
+    rows = []
+    if not args.skip_serial:
+        model = WhisperModelRegistry().get(args.model_size)
+        start = time.perf_counter()
+        model.transcribe(audio, fp16=False)
+        rows.append(("serial", time.perf_counter() - start))
+
+    for workers in args.workers:
+        transcriber = ParallelTranscriber(args.model_size, workers)
+        try:
+            transcriber.warm()
+            start = time.perf_counter()
+            transcriber.transcribe(audio, fp16=False)
+            rows.append((f"{workers} workers", time.perf_counter() - start))
+        finally:
+            transcriber.shutdown()
+
+    baseline = rows[0][1]
+    audio_seconds = len(audio) / SAMPLE_RATE
+    print(f"{'mode':>10} {'wall':>9} {'x realtime':>11} {'speedup':>8}")
+    for name, seconds in rows:
+        print(f"{name:>10} {seconds:>8.1f}s {audio_seconds / seconds:>10.1f}x {baseline / seconds:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
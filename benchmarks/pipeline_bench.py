@@ -0,0 +1,313 @@
+# ==============================
+# pipeline_bench.py
+# ==============================
+"""
+End-to-end benchmark of process_video with Gemini, the YouTube Data API and
+yt_dlp replaced by deterministic local stand-ins (benchmarks/stand_ins.py),
+so runs are repeatable and need no keys or network.
+
+Cases:
+    sample      preprocessing/test1.wav
+    long        a synthetic --long-minutes recording of speech-like tone
+                bursts and pauses (goes through the parallel path when
+                WHISPER_PARALLEL_WORKERS > 1 and it is over WHISPER_LONG_AUDIO_SECONDS)
+
+For every stage (decode, load_model, transcribe, fillers, then each stage of
+the send_to_encoders graph) it records wall time, CPU time and peak resident
+memory, takes the median over --repeat runs (after --warmup unrecorded runs
+of the sample, which pay for one-off imports and model loads) and writes
+them as JSON. Like a server's start-up warm-up (preprocessing/warmup.py),
+the prosody kernels are JIT-compiled before anything is measured, so the
+baseline holds with --warmup 0 too. CPU
+time is the process's (including child processes such as ffmpeg) for the
+sequential stages before the graph, and the stage thread's own for graph
+stages, which overlap. Peak RSS is sampled every 10 ms and attributed to
+every stage running at the time.
+
+Each run is compared with the stored baseline for the same configuration
+(benchmarks/pipeline_baseline.json); any metric worse than baseline by more
+than --tolerance (plus a small absolute slack for tiny values) is reported
+as a REGRESSION and the exit status is 1.
+
+Whisper is real by default. --whisper stand-in swaps it for a stand-in that
+costs --whisper-rtf seconds per audio second, for machines without weights.
+
+Usage:
+    python benchmarks/pipeline_bench.py
+    python benchmarks/pipeline_bench.py --whisper stand-in --repeat 3 --output run.json
+    python benchmarks/pipeline_bench.py --whisper stand-in --update-baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import wave
+from collections import defaultdict
+from contextlib import ExitStack
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Isolate the on-disk caches before the encoders read their settings
+_CACHE_DIR = tempfile.mkdtemp(prefix="pipeline-bench-")
+os.environ["GEMINI_CACHE_DISABLED"] = "1"
+os.environ.setdefault("GEMINI_API_KEY", "stand-in")
+os.environ.setdefault("YOUTUBE_API_KEY", "stand-in")
+
+import numpy as np
+
+from benchmarks.stand_ins import Latency, stand_ins
+import models.audio_encoder as audio_encoder
+from models.prosody import warm_up_pitch
+import models.reference_cache as reference_cache
+import preprocessing.process_video as pv
+from preprocessing.audio_ingest import SAMPLE_RATE
+from preprocessing.long_audio import PARALLEL_WORKERS
+from preprocessing.stage_graph import StageGraph
+
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "pipeline_baseline.json")
+SAMPLE_WAV = os.path.join(ROOT, "preprocessing", "test1.wav")
+# Differences below these are noise whatever the relative change
+ABSOLUTE_SLACK = {"wall_seconds": 0.05, "cpu_seconds": 0.05, "peak_rss_mb": 32.0}
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+
+
+def process_cpu() -> float:
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+class StageProfiler:
+    """Wall time, CPU time and peak RSS per named stage of one pipeline run."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.stages = {}
+        self._open = {}  # name -> peak RSS seen while it runs
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+
+    def __enter__(self):
+        self._sampler.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._sampler.join()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            rss = rss_mb()
+            with self._lock:
+                for name in self._open:
+                    self._open[name] = max(self._open[name], rss)
+
+    def wrap(self, name: str, fn, exclusive: bool):
+        """`fn` timed as stage `name`; `exclusive` stages run alone, so process CPU is theirs."""
+        cpu_clock = process_cpu if exclusive else time.thread_time
+
+        def timed(*args, **kwargs):
+            with self._lock:
+                self._open[name] = rss_mb()
+            wall, cpu = time.perf_counter(), cpu_clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                wall, cpu = time.perf_counter() - wall, cpu_clock() - cpu
+                with self._lock:
+                    peak = max(self._open.pop(name), rss_mb())
+                self.stages[name] = {"wall_seconds": round(wall, 4), "cpu_seconds": round(cpu, 4),
+                                     "peak_rss_mb": round(peak, 1)}
+        return timed
+
+
+def profiled_run(path: str, model_size: str) -> dict:
+    """One process_video run with every stage wrapped by a StageProfiler."""
+    profiler = StageProfiler()
+    original_add, original_get_model = StageGraph.add, pv.get_model
+
+    def add(graph, name, fn, deps=()):
+        return original_add(graph, name, profiler.wrap(name, fn, exclusive=False), deps)
+
+    def get_model(size):
+        model = profiler.wrap("load_model", original_get_model, exclusive=True)(size)
+        return mock.Mock(transcribe=profiler.wrap("transcribe", model.transcribe, exclusive=True))
+
+    with ExitStack() as stack:
+        stack.enter_context(profiler)
+        stack.enter_context(mock.patch.object(StageGraph, "add", add))
+        stack.enter_context(mock.patch.object(pv, "get_model", get_model))
+        for attr, name in (("load_audio", "decode"), ("transcribe_long", "transcribe"), ("find_fillers", "fillers")):
+            stack.enter_context(mock.patch.object(pv, attr, profiler.wrap(name, getattr(pv, attr), exclusive=True)))
+        wall, cpu = time.perf_counter(), process_cpu()
+        pv.process_video(path, model_size=model_size)
+        total = {"wall_seconds": round(time.perf_counter() - wall, 4), "cpu_seconds": round(process_cpu() - cpu, 4),
+                 "peak_rss_mb": round(max([s["peak_rss_mb"] for s in profiler.stages.values()] + [rss_mb()]), 1)}
+    return dict(profiler.stages, total=total)
+
+
+def median_runs(runs) -> dict:
+    merged = defaultdict(lambda: defaultdict(list))
+    for run in runs:
+        for stage, metrics in run.items():
+            for metric, value in metrics.items():
+                merged[stage][metric].append(value)
+    return {stage: {metric: round(statistics.median(values), 4) for metric, values in metrics.items()}
+            for stage, metrics in merged.items()}
+
+
+def write_synthetic_speech(path: str, minutes: float, seed: int = 0):
+    """Speech-like audio: voiced harmonic bursts with a drifting pitch, separated by pauses."""
+    rng = np.random.default_rng(seed)
+    parts, total = [], int(minutes * 60 * SAMPLE_RATE)
+    n = 0
+    while n < total:
+        burst = rng.uniform(0.15, 0.5)
+        t = np.arange(int(burst * SAMPLE_RATE)) / SAMPLE_RATE
+        f0 = rng.uniform(100, 220) * (1 + 0.1 * np.sin(2 * np.pi * rng.uniform(1, 4) * t))
+        phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 6)) * np.hanning(len(t)) * rng.uniform(0.1, 0.3)
+        gap = np.zeros(int(rng.choice([0.08, 0.15, 0.3, 0.9], p=[0.5, 0.3, 0.15, 0.05]) * SAMPLE_RATE))
+        noise = rng.normal(0, 0.002, len(voiced) + len(gap))
+        parts.append(np.concatenate([voiced, gap]) + noise)
+        n += len(noise)
+    audio = np.concatenate(parts)[:total]
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes((np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes())
+
+
+def config_key(args) -> str:
+    """Runs are only comparable with a baseline recorded under the same key."""
+    whisper = f"stand-in@{args.whisper_rtf:g}" if args.whisper == "stand-in" else args.model
+    return (f"whisper={whisper} long={args.long_minutes:g}min gemini={args.gemini_latency:g}s "
+            f"youtube={args.youtube_latency:g}s download={args.download_latency:g}s "
+            f"workers={PARALLEL_WORKERS} cpus={os.cpu_count()}")
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Human-readable regressions of `current` against `baseline` (both case -> stage -> metrics)."""
+    problems = []
+    for case, stages in baseline.items():
+        for stage, metrics in stages.items():
+            now = current.get(case, {}).get(stage)
+            if now is None:
+                problems.append(f"{case}/{stage}: stage missing from this run")
+                continue
+            for metric, before in metrics.items():
+                limit = before * (1 + tolerance) + ABSOLUTE_SLACK[metric]
+                if now[metric] > limit:
+                    problems.append(f"{case}/{stage}: {metric} {now[metric]:.3f} > {before:.3f} "
+                                    f"(+{(now[metric] / before - 1) * 100 if before else float('inf'):.0f}%)")
+    return problems
+
+
+def print_table(results: dict):
+    print(f"{'case':>8} {'stage':>16} {'wall s':>8} {'cpu s':>8} {'peak MB':>8}")
+    for case, stages in results.items():
+        for stage, m in sorted(stages.items(), key=lambda item: (item[0] == "total", item[1]["wall_seconds"])):
+            print(f"{case:>8} {stage:>16} {m['wall_seconds']:>8.3f} {m['cpu_seconds']:>8.3f} {m['peak_rss_mb']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", default=["sample", "long"], choices=["sample", "long"])
+    parser.add_argument("--long-minutes", type=float, default=12.0)
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--whisper", choices=["real", "stand-in"], default="real")
+    parser.add_argument("--whisper-rtf", type=float, default=Latency.whisper_realtime_factor,
+                        help="stand-in Whisper seconds per audio second")
+    parser.add_argument("--gemini-latency", type=float, default=Latency.gemini_base)
+    parser.add_argument("--youtube-latency", type=float, default=Latency.youtube_request)
+    parser.add_argument("--download-latency", type=float, default=Latency.download)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1, help="unrecorded runs of the sample before measuring")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown per metric")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--output", help="also write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    latency = Latency(gemini_base=args.gemini_latency, youtube_request=args.youtube_latency,
+                      download=args.download_latency, whisper_realtime_factor=args.whisper_rtf)
+    key = config_key(args)
+    print(f"config: {key}")
+
+    with tempfile.TemporaryDirectory() as media_dir, stand_ins(latency, whisper=args.whisper == "stand-in") as fakes:
+        paths = {"sample": SAMPLE_WAV}
+        if "long" in args.cases:
+            paths["long"] = os.path.join(media_dir, "long.wav")
+            write_synthetic_speech(paths["long"], args.long_minutes)
+
+        warm_up_pitch()
+        for i in range(args.warmup):
+            with mock.patch.object(reference_cache, "_default_cache", reference_cache.ReferenceAudioCache(
+                    os.path.join(_CACHE_DIR, f"reference_audio-warmup-{i}"))):
+                profiled_run(SAMPLE_WAV, args.model)
+        fakes.gemini.calls, fakes.youtube.calls = 0, 0
+        fakes.downloads.clear()
+
+        results = {}
+        for case in args.cases:
+            runs = []
+            for i in range(args.repeat):
+                # Every run starts cold on the network side, like a new upload
+                audio_encoder._search_cache.clear()
+                cold = reference_cache.ReferenceAudioCache(os.path.join(_CACHE_DIR, f"reference_audio-{case}-{i}"))
+                with mock.patch.object(reference_cache, "_default_cache", cold):
+                    runs.append(profiled_run(paths[case], args.model))
+            results[case] = median_runs(runs)
+        calls = {"gemini_calls": fakes.gemini.calls, "youtube_calls": fakes.youtube.calls,
+                 "downloads": len(fakes.downloads)}
+
+    print_table(results)
+    print(f"stand-in calls over {args.repeat} run(s) per case: {calls}")
+    report = {"config": key, "python": platform.python_version(), "repeat": args.repeat, "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+    if args.update_baseline:
+        baselines[key] = results
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Stored baseline for '{key}' in {args.baseline}")
+        return 0
+    if key not in baselines:
+        print(f"No baseline for '{key}' in {args.baseline}; run with --update-baseline to record one.")
+        return 0
+
+    problems = compare(results, {case: baselines[key][case] for case in args.cases if case in baselines[key]},
+                       args.tolerance)
+    if problems:
+        print(f"\n{'!' * 60}\nREGRESSION against baseline '{key}' (tolerance {args.tolerance:.0%}):")
+        for problem in problems:
+            print(f"  REGRESSION {problem}")
+        print("!" * 60)
+        return 1
+    print(f"OK: within {args.tolerance:.0%} of baseline '{key}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
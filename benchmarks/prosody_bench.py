@@ -0,0 +1,51 @@
+# ==============================
+# prosody_bench.py
+# ==============================
+"""
+Seconds of prosody analysis per minute of audio.
+
+The recording repeats a speech clip until it reaches --minutes, and one
+analyze_prosody call over it is timed. The target is well under 1s per minute.
+
+Usage:
+    python benchmarks/prosody_bench.py --minutes 10
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from models.prosody import analyze_prosody
+from preprocessing.audio_ingest import SAMPLE_RATE, load_audio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--clip", default=os.path.join(ROOT, "preprocessing", "test1.wav"))
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    clip = load_audio(args.clip)
+    target = int(args.minutes * 60 * SAMPLE_RATE)
+    audio = np.tile(clip, -(-target // len(clip)))[:target]
+
+    analyze_prosody(audio[:SAMPLE_RATE])  # import librosa / scipy outside the timing
+    samples = []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        analyze_prosody(audio)
+        samples.append(time.perf_counter() - start)
+
+    best = min(samples)
+    print(f"audio={args.minutes:.1f} min  best={best:.2f}s  per minute={best / args.minutes:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+# ==============================
+# stand_ins.py
+# ==============================
+"""
+Deterministic offline stand-ins for the pipeline's network dependencies, for
+benchmarks: Gemini (google.generativeai), the YouTube Data API, yt_dlp, and
+optionally Whisper for machines without model weights.
+
+Each stand-in sleeps for a configurable latency and returns answers shaped
+like the real service's, so the pipeline runs its normal code paths.
+
+    with stand_ins(Latency(gemini_base=0.4)):
+        process_video("talk.mp4")
+"""
+
+import functools
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import wave
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+
+
+@dataclass
+class Latency:
+    """Simulated service latencies, in seconds unless noted."""
+    gemini_base: float = 0.4            # per call, before any tokens
+    gemini_input_ms: float = 0.05       # per prompt token
+    gemini_output_ms: float = 4.0       # per generated token
+    youtube_request: float = 0.15       # per search.list / videos.list call
+    download: float = 1.0               # per full yt_dlp download
+    download_bytes: int = 1_500_000     # size of each full reference download
+    reference_seconds: float = 600.0    # length of each reference video
+    whisper_realtime_factor: float = 0.05  # stand-in Whisper seconds per audio second
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count (words and punctuation), close enough to compare prompts."""
+    return len(re.findall(r"\w+|[^\w\s]", text))
+
+
+def _rng(text: str) -> random.Random:
+    return random.Random(hashlib.sha256(text.encode("utf-8")).hexdigest())
+
+
+def canned_answers(seed: str = ""):
+    """(context, raw rubric scores, examples) as the Gemini prompts ask for them."""
+    from models.text_encoder import GRADE_SECTIONS
+
+    rng = _rng(seed)
+    context = {"specific_topic": "bioluminescence in squid", "general_topic": "marine biology",
+               "format": "scientific conference presentation"}
+    scores = {section: {key: round(rng.uniform(0.4, 0.9), 2) for key in keys}
+              for section, keys in GRADE_SECTIONS.items()}
+    examples = {"examples": [{
+        "title": f"Example talk {i}",
+        "summary": "A researcher explains how deep sea animals make light, with clear structure and "
+                   "vivid demonstrations that keep a general audience engaged throughout.",
+        "url": f"https://www.youtube.com/watch?v=example{i}",
+        "relevance": ["Same topic and audience", "Strong use of visual examples"],
+    } for i in range(3)]}
+    return context, scores, examples
+
+
+class StandInGemini:
+    """
+    Answers every prompt the encoders send (context, examples, grading, fused
+    analysis, keywords, audio coaching) with canned JSON after a
+    token-proportional delay. Counts calls and tokens.
+
+    Args:
+        broken: Section of the fused answer ("context", "scores" or "examples")
+            to make invalid, to exercise the fallback path.
+    """
+
+    def __init__(self, latency: Latency = None, broken: str = None):
+        self.latency = latency or Latency()
+        self.broken = broken
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._lock = threading.Lock()
+
+    def answer(self, prompt: str) -> str:
+        context, scores, examples = canned_answers(prompt)
+        if "return ONE JSON object with three keys" in prompt:
+            answer = {"context": context, "scores": scores, "examples": examples}
+            if self.broken:
+                answer[self.broken] = "not available"
+        elif "speech-grading assistant" in prompt:
+            answer = scores
+        elif "Find compelling examples" in prompt:
+            answer = examples
+        elif "YouTube content search" in prompt:
+            return ", ".join(["squid bioluminescence talk", "deep sea science lecture", "TED marine biology",
+                              "conference presentation biology", "science storytelling"])
+        elif "public speaking coach" in prompt:
+            rng = _rng(prompt)
+            answer = {key: round(rng.uniform(0.4, 0.9), 2) for key in
+                      ("clarity_score", "pronunciation_score", "tone_score", "pacing_score", "engagement_score")}
+            answer["areas_for_improvement"] = ["Pause after key points.", "Vary your pitch when listing results.",
+                                               "Cut the filler words at the start of sentences."]
+        else:
+            answer = context
+        return json.dumps(answer, indent=2)
+
+    def generate_content(self, prompt: str):
+        text = self.answer(prompt)
+        tokens_in, tokens_out = count_tokens(prompt), count_tokens(text)
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += tokens_in
+            self.output_tokens += tokens_out
+        lat = self.latency
+        time.sleep(lat.gemini_base + tokens_in * lat.gemini_input_ms / 1000 + tokens_out * lat.gemini_output_ms / 1000)
+        return SimpleNamespace(text=text)
+
+    def __call__(self, model_name: str = None):
+        """Stands in for the genai.GenerativeModel class."""
+        return self
+
+
+class _Response:
+    def __init__(self, data: dict):
+        self._data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+
+class StandInYouTube:
+    """requests.Session stand-in answering YouTube Data API search.list and videos.list calls."""
+
+    def __init__(self, latency: Latency = None):
+        self.latency = latency or Latency()
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str, params: dict = None, timeout: float = None):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency.youtube_request)
+        params = params or {}
+        if url.endswith("/search"):
+            rng = _rng(params.get("q", "") + str(params.get("pageToken")))
+            page = int(params.get("pageToken") or 0)
+            ids = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(11))
+                   for _ in range(params.get("maxResults", 10))]
+            return _Response({"items": [{"id": {"videoId": vid}} for vid in ids],
+                              "nextPageToken": str(page + 1) if page < 3 else None})
+        # videos.list: about one video in three is too long to use as a reference
+        items = []
+        for vid in params.get("id", "").split(","):
+            minutes = _rng(vid).randint(2, 30)
+            items.append({"id": vid, "contentDetails": {"duration": f"PT{minutes}M{_rng(vid).randint(0, 59)}S"}})
+        return _Response({"items": items})
+
+
+def youtube_dl_class(latency: Latency = None, counter: list = None):
+    """
+    yt_dlp.YoutubeDL stand-in class. A full download takes latency.download
+    and transfers latency.download_bytes; with `download_ranges`, only the
+    requested share of both. Writes silent WAV audio of the fetched length.
+    """
+    latency = latency or Latency()
+
+    class StandInYoutubeDL:
+        def __init__(self, opts: dict):
+            self.opts = opts
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url: str, download: bool = True):
+            video_id = url.rsplit("=", 1)[-1]
+            seconds = latency.reference_seconds
+            ranges = self.opts.get("download_ranges")
+            if ranges:
+                section = next(iter(ranges({"id": video_id, "duration": seconds}, self)))
+                seconds = min(seconds, section["end_time"] - section["start_time"])
+            share = seconds / latency.reference_seconds
+            time.sleep(latency.download * share)
+            if download:
+                path = self.opts["outtmpl"].replace("%(id)s", video_id).replace("%(ext)s", "wav")
+                with wave.open(path, "wb") as f:
+                    f.setnchannels(1)
+                    f.setsampwidth(2)
+                    f.setframerate(8000)
+                    f.writeframes(bytes(2 * int(8000 * seconds)))
+                for hook in self.opts.get("progress_hooks", []):
+                    hook({"status": "finished", "filename": path,
+                          "downloaded_bytes": int(latency.download_bytes * share)})
+            if counter is not None:
+                counter.append(url)
+            return {"id": video_id, "title": f"Reference talk {video_id}"}
+
+    return StandInYoutubeDL
+
+
+VOCABULARY = ("the squid uses light to hide from predators below and this is called counter illumination "
+              "we measured how bright the photophores are at different depths so you can see um uh like").split()
+
+
+class StandInWhisper:
+    """
+    Whisper model stand-in: one word per 0.4 s of detected speech, with word
+    timestamps, after sleeping `realtime_factor` seconds per audio second.
+    """
+
+    def __init__(self, realtime_factor: float = Latency.whisper_realtime_factor):
+        self.realtime_factor = realtime_factor
+
+    def transcribe(self, audio: np.ndarray, **options) -> dict:
+        from preprocessing.audio_ingest import SAMPLE_RATE
+        from preprocessing.vad import FRAME_MS, silence_runs, speech_frames
+
+        time.sleep(len(audio) / SAMPLE_RATE * self.realtime_factor)
+        rng = random.Random(len(audio))
+        segments = []
+        for start, end in silence_runs(~speech_frames(audio)):  # runs of speech
+            t0, t1 = start * FRAME_MS / 1000, end * FRAME_MS / 1000
+            n = max(1, int((t1 - t0) / 0.4))
+            words = [{"word": " " + rng.choice(VOCABULARY), "start": round(t0 + i * (t1 - t0) / n, 2),
+                      "end": round(t0 + (i + 1) * (t1 - t0) / n, 2), "probability": 0.9} for i in range(n)]
+            segments.append({"id": len(segments), "start": t0, "end": t1, "avg_logprob": -0.3,
+                             "text": "".join(w["word"] for w in words), "words": words})
+        return {"text": "".join(s["text"] for s in segments).strip(), "segments": segments, "language": "en"}
+
+
+def load_stand_in_whisper(model_size: str, realtime_factor: float = Latency.whisper_realtime_factor):
+    """Loader for WhisperModelRegistry / ParallelTranscriber (module-level, so spawn workers can use it)."""
+    return StandInWhisper(realtime_factor)
+
+
+@contextmanager
+def stand_ins(latency: Latency = None, whisper: bool = False):
+    """
+    Route Gemini, YouTube and yt_dlp (and Whisper, if `whisper`) to the
+    stand-ins for the duration of the block. Yields a namespace with the
+    stand-in objects, for their call counters.
+    """
+    import google.generativeai as genai
+    import yt_dlp
+    import models.audio_encoder as audio_encoder
+    from preprocessing.model_registry import get_registry
+
+    latency = latency or Latency()
+    gemini = StandInGemini(latency)
+    youtube = StandInYouTube(latency)
+    downloads = []
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch.object(genai, "GenerativeModel", gemini))
+        stack.enter_context(mock.patch.object(genai, "configure", lambda **kw: None))
+        stack.enter_context(mock.patch.object(audio_encoder, "_get_session", lambda: youtube))
+        stack.enter_context(mock.patch.object(yt_dlp, "YoutubeDL", youtube_dl_class(latency, downloads)))
+        if whisper:
+            registry = get_registry()
+            stack.enter_context(mock.patch.object(
+                registry, "loader", functools.partial(load_stand_in_whisper,
+                                                      realtime_factor=latency.whisper_realtime_factor)))
+        yield SimpleNamespace(gemini=gemini, youtube=youtube, downloads=downloads)
@@ -0,0 +1,97 @@
+# ==============================
+# text_fused_bench.py
+# ==============================
+"""
+Latency and token use of TextEncoder's three-call path (extract_context,
+grade_transcript, retrieve_examples) against the fused single call
+(analyze_transcript), on synthetic transcripts of increasing length.
+
+Runs against a local stand-in model (benchmarks/stand_ins.py), so no API key
+or network is needed: it answers each prompt with canned JSON of realistic
+size and sleeps for
+    --base-latency + input tokens * --input-ms + output tokens * --output-ms
+which is the usual shape of hosted-LLM latency. Tokens are estimated as
+word pieces (words and punctuation), which tracks Gemini's count closely
+enough for a comparison. Three-call latency is reported both run one after
+another (encode_and_contextualize) and as process_video overlaps them
+(context -> examples alongside grading).
+
+Usage:
+    python benchmarks/text_fused_bench.py
+    python benchmarks/text_fused_bench.py --minutes 5 30 --broken examples
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stand_ins import Latency, StandInGemini
+from models.text_encoder import TextEncoder
+
+VOCABULARY = ("the squid uses light to hide from predators below and this is called counter illumination "
+              "we measured how bright the photophores are at different depths so you can see").split()
+
+
+def make_encoder(model: StandInGemini, transcript: str) -> TextEncoder:
+    encoder = TextEncoder(model_name="stand-in")
+    encoder.response_cache = None
+    encoder.model = model
+    encoder.transcript = transcript
+    return encoder
+
+
+def run_sequential(encoder: TextEncoder, word_count: int, wpm: float):
+    encoder.encode_and_contextualize(None, word_count, wpm, "can_take_input_from_user", transcript=encoder.transcript)
+
+
+def run_overlapped(encoder: TextEncoder, word_count: int, wpm: float):
+    grading = threading.Thread(target=encoder.grade_transcript, args=(word_count, wpm))
+    grading.start()
+    encoder.extract_context("can_take_input_from_user")
+    encoder.retrieve_examples()
+    grading.join()
+
+
+def run_fused(encoder: TextEncoder, word_count: int, wpm: float):
+    encoder.analyze_transcript(word_count, wpm, "can_take_input_from_user")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[2, 10, 30, 60], help="speech lengths to try")
+    parser.add_argument("--wpm", type=float, default=140.0)
+    parser.add_argument("--base-latency", type=float, default=0.4, help="seconds per call before any tokens")
+    parser.add_argument("--input-ms", type=float, default=0.05, help="milliseconds per prompt token")
+    parser.add_argument("--output-ms", type=float, default=4.0, help="milliseconds per generated token")
+    parser.add_argument("--broken", choices=["context", "scores", "examples"],
+                        help="make the fused answer's section invalid, to measure the fallback cost")
+    args = parser.parse_args()
+
+    random.seed(0)
+    modes = [("three calls, sequential", run_sequential, False),
+             ("three calls, overlapped", run_overlapped, False),
+             ("fused", run_fused, True)]
+    print(f"{'minutes':>7} {'mode':>24} {'calls':>5} {'in tokens':>10} {'out tokens':>10} {'wall':>7}")
+    for minutes in args.minutes:
+        word_count = int(minutes * args.wpm)
+        transcript = " ".join(random.choice(VOCABULARY) for _ in range(word_count))
+        for name, run, fused in modes:
+            latency = Latency(gemini_base=args.base_latency, gemini_input_ms=args.input_ms,
+                              gemini_output_ms=args.output_ms)
+            model = StandInGemini(latency, broken=args.broken if fused else None)
+            encoder = make_encoder(model, transcript)
+            start = time.perf_counter()
+            run(encoder, word_count, args.wpm)
+            wall = time.perf_counter() - start
+            print(f"{minutes:>7g} {name:>24} {model.calls:>5} {model.input_tokens:>10} {model.output_tokens:>10} "
+                  f"{wall:>6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
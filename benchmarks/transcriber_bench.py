@@ -0,0 +1,164 @@
+# ==============================
+# transcriber_bench.py
+# ==============================
+"""
+Speed, memory and accuracy of the transcription backends
+(preprocessing/transcribers.py) on the bundled sample audio.
+
+Each backend runs in its own process, so its resident memory is measured
+without another model in the same address space. For each backend the
+benchmark reports:
+
+- load time
+- median transcription time over `--repeats` runs, and the real-time factor
+  (audio seconds per second)
+- weight bytes
+- RSS once the model is loaded, and peak RSS
+- word error rate against the reference backend's transcript
+
+Options match process_video (word timestamps, temperature fallback). The
+torch seed is fixed, so fallback sampling is repeatable.
+
+Without model weights, `--random-init` builds the published architecture of
+a size with random weights. Every backend is built from the same seed, so
+int8 quantizes the same model. Speed and memory are representative; WER
+against a random model is not.
+
+Usage:
+    python benchmarks/transcriber_bench.py --model base
+    python benchmarks/transcriber_bench.py --random-init tiny --audio talk.wav --repeats 3
+"""
+
+import argparse
+import json
+import os
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from preprocessing.transcribers import BACKENDS, REFERENCE
+
+SAMPLE_AUDIO = os.path.join(ROOT, "test1.wav")
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # kB on Linux
+
+
+def measure(backend: str, model_size: str, audio_path: str, repeats: int, random_init: bool) -> dict:
+    """Load and run one backend in this process (called in a child process)."""
+    import torch
+
+    from preprocessing.audio_ingest import SAMPLE_RATE, load_audio
+    from preprocessing.model_registry import model_nbytes
+    from preprocessing.transcribers import load_model, model_key
+
+    audio = load_audio(audio_path)
+    baseline_mb = _rss_mb()
+    start = time.perf_counter()
+    if random_init:
+        from whisper_batching_bench import random_model
+        from preprocessing.transcribers import INT8, quantize_int8
+        model = random_model(model_size)
+        if backend == INT8:
+            model = quantize_int8(model)
+    else:
+        model = load_model(model_key(model_size, backend))
+    load_seconds = time.perf_counter() - start
+    loaded_mb = _rss_mb()
+
+    seconds = []
+    for _ in range(repeats):
+        torch.manual_seed(0)
+        start = time.perf_counter()
+        result = model.transcribe(audio, word_timestamps=True, fp16=False)
+        seconds.append(time.perf_counter() - start)
+    return {
+        "backend": backend,
+        "audio_seconds": len(audio) / SAMPLE_RATE,
+        "load_seconds": load_seconds,
+        "transcribe_seconds": statistics.median(seconds),
+        "model_mb": model_nbytes(model) / 1024 ** 2,
+        "loaded_rss_mb": loaded_mb - baseline_mb,
+        "peak_rss_mb": _peak_rss_mb(),
+        "text": result["text"],
+    }
+
+
+def _words(text: str):
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """(substitutions + deletions + insertions) / reference words, ignoring case and punctuation."""
+    ref, hyp = _words(reference), _words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, word in enumerate(ref, 1):
+        current = [i]
+        for j, other in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (word != other)))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def run_child(backend: str, args) -> dict:
+    command = [sys.executable, os.path.abspath(__file__), "--child", backend, "--model", args.model,
+               "--audio", args.audio, "--repeats", str(args.repeats)]
+    if args.random_init:
+        command += ["--random-init", args.random_init]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    # The last line is the result; anything before it is the loaders' logging
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--random-init", choices=["tiny", "base", "small"],
+                        help="use this architecture with random weights instead of loading --model")
+    parser.add_argument("--backends", nargs="+", default=sorted(BACKENDS, key=lambda b: b != REFERENCE),
+                        choices=sorted(BACKENDS))
+    parser.add_argument("--audio", default=SAMPLE_AUDIO, help="recording to transcribe")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.random_init:
+        args.model = args.random_init
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.model, args.audio, args.repeats, bool(args.random_init))))
+        return
+
+    weights = "random weights" if args.random_init else "trained weights"
+    print(f"model={args.model} ({weights}) audio={os.path.basename(args.audio)} repeats={args.repeats} "
+          f"cpus={os.cpu_count()}")
+    backends = [REFERENCE] + [b for b in args.backends if b != REFERENCE]
+    results = [run_child(backend, args) for backend in backends]
+    reference = results[0]
+    print(f"\n{'backend':>10} {'load':>7} {'transcribe':>11} {'x realtime':>11} {'weights':>9} "
+          f"{'RSS loaded':>11} {'peak RSS':>9} {'WER':>7}")
+    for r in results:
+        print(f"{r['backend']:>10} {r['load_seconds']:>6.2f}s {r['transcribe_seconds']:>10.2f}s "
+              f"{r['audio_seconds'] / r['transcribe_seconds']:>11.2f} {r['model_mb']:>7.0f}MB "
+              f"{r['loaded_rss_mb']:>9.0f}MB {r['peak_rss_mb']:>7.0f}MB "
+              f"{word_error_rate(reference['text'], r['text']):>7.1%}")
+    for r in results[1:]:
+        print(f"{r['backend']}: {reference['transcribe_seconds'] / r['transcribe_seconds']:.2f}x faster, "
+              f"{1 - r['model_mb'] / reference['model_mb']:.0%} fewer weight bytes than {REFERENCE}")
+
+
+if __name__ == "__main__":
+    main()
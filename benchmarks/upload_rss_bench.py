@@ -0,0 +1,147 @@
+# ==============================
+# upload_rss_bench.py
+# ==============================
+"""
+Peak server RSS while receiving uploads of growing size.
+
+Each size is uploaded to a fresh server process running StreamingUploadRequest
+and receive_upload, so the reported peak (ru_maxrss) belongs to that upload
+alone. The client streams the multipart body from a generator, so neither side
+holds the whole file in memory. Peak RSS should stay flat as uploads grow.
+
+Usage:
+    python benchmarks/upload_rss_bench.py --sizes-mb 16 64 256 1024
+"""
+
+import argparse
+import http.client
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MP4_HEAD = b"\x00\x00\x00\x20ftypisom\x00\x00\x02\x00"
+BOUNDARY = "speakeasybenchboundary"
+
+
+def serve(port: int):
+    """Child process: minimal app with the production upload path."""
+    from flask import Flask, request, jsonify
+    from werkzeug.serving import make_server
+
+    from backend.uploads import StreamingUploadRequest, receive_upload
+
+    app = Flask(__name__)
+    app.request_class = StreamingUploadRequest
+
+    @app.route("/upload", methods=["POST"])
+    def upload():
+        ingest = receive_upload(request)
+        request.upload_workspace.cleanup()
+        return jsonify(ingest.metrics())
+
+    @app.route("/rss")
+    def rss():
+        return jsonify({"max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss})
+
+    make_server("127.0.0.1", port, app, threaded=False).serve_forever()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _multipart_body(size: int, chunk_size: int = 1024 * 1024):
+    head = (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"talk.mp4\"\r\n"
+            f"Content-Type: video/mp4\r\n\r\n").encode()
+    tail = f"\r\n--{BOUNDARY}--\r\n".encode()
+    chunk = os.urandom(chunk_size)
+
+    def body():
+        yield head
+        yield MP4_HEAD
+        remaining = size - len(MP4_HEAD)
+        while remaining > 0:
+            yield chunk[:remaining]
+            remaining -= chunk_size
+        yield tail
+
+    return body, len(head) + size + len(tail)
+
+
+def _wait_for(url: str, requests):
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            return requests.get(url, timeout=1).json()
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server at {url} did not start")
+
+
+def measure(size: int) -> dict:
+    import requests
+
+    port = _free_port()
+    env = dict(os.environ, SPEAKEASY_UPLOAD_DIR=tempfile.mkdtemp(prefix="upload-bench-"),
+               SPEAKEASY_MAX_UPLOAD_BYTES=str(size + 1024 ** 2))
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", str(port)], env=env)
+    try:
+        base = f"http://127.0.0.1:{port}"
+        idle_kb = _wait_for(f"{base}/rss", requests)["max_rss_kb"]
+        body, length = _multipart_body(size)
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        conn.putrequest("POST", "/upload")
+        conn.putheader("Content-Type", f"multipart/form-data; boundary={BOUNDARY}")
+        conn.putheader("Content-Length", str(length))
+        conn.endheaders()
+        for part in body():
+            conn.send(part)
+        response = conn.getresponse()
+        if response.status != 200:
+            raise RuntimeError(f"upload failed with HTTP {response.status}")
+        metrics = json.loads(response.read())
+        conn.close()
+        peak_kb = requests.get(f"{base}/rss").json()["max_rss_kb"]
+    finally:
+        server.terminate()
+        server.wait()
+    return {"size": size, "idle_kb": idle_kb, "peak_kb": peak_kb, **metrics}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--tolerance-mb", type=float, default=16.0,
+                        help="allowed growth in peak RSS between the smallest and largest upload")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    rows = [measure(mb * 1024 ** 2) for mb in args.sizes_mb]
+    print(f"{'upload':>10} {'idle RSS':>10} {'peak RSS':>10} {'ingest':>12}")
+    for row in rows:
+        print(f"{row['size'] / 1024 ** 2:>8.0f}MB {row['idle_kb'] / 1024:>8.1f}MB {row['peak_kb'] / 1024:>8.1f}MB "
+              f"{(row['bytes_per_second'] or 0) / 1e6:>8.1f}MB/s")
+
+    growth_mb = (rows[-1]["peak_kb"] - rows[0]["peak_kb"]) / 1024
+    print(f"peak RSS growth: {growth_mb:.1f}MB across {args.sizes_mb[0]}MB -> {args.sizes_mb[-1]}MB uploads")
+    if growth_mb > args.tolerance_mb:
+        print("FAIL: peak RSS grows with upload size")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
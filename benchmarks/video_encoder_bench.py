@@ -0,0 +1,92 @@
+# ==============================
+# video_encoder_bench.py
+# ==============================
+"""
+CPU throughput of VideoEncoder, in sampled frames per second and seconds of
+video per wall-clock second, against a naive full decode of every frame at
+full resolution.
+
+Without --video, a synthetic 1080p clip is generated with ffmpeg (keyframe
+every 2 seconds, like most phone recordings). At --fps 1 its keyframes are
+too sparse, so the encoder decodes every frame; --fps 0.5 measures the
+keyframe-only path.
+
+Usage:
+    python benchmarks/video_encoder_bench.py --seconds 120
+    python benchmarks/video_encoder_bench.py --video talk.mp4 --fps 1 2
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from models.video_encoder import VideoEncoder
+
+
+def make_clip(path: str, seconds: float):
+    subprocess.run([
+        "ffmpeg", "-v", "error", "-y", "-f", "lavfi",
+        "-i", f"testsrc2=size=1920x1080:rate=30:duration={seconds}",
+        "-c:v", "libx264", "-preset", "veryfast", "-g", "60", "-pix_fmt", "yuv420p", path,
+    ], check=True)
+
+
+def duration(path: str) -> float:
+    out = subprocess.run(["ffprobe", "-v", "error", "-show_entries", "format=duration",
+                          "-of", "default=nw=1:nk=1", path], capture_output=True, check=True).stdout
+    return float(out)
+
+
+def full_decode(path: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(["ffmpeg", "-nostdin", "-v", "error", "-i", path, "-map", "0:v:0",
+                    "-f", "rawvideo", "-pix_fmt", "rgb24", "-y", os.devnull], check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video", help="video to encode (default: generate a synthetic 1080p clip)")
+    parser.add_argument("--seconds", type=float, default=120.0, help="length of the synthetic clip")
+    parser.add_argument("--fps", type=float, nargs="+", default=[0.5, 1.0, 2.0])
+    parser.add_argument("--width", type=int, default=160)
+    parser.add_argument("--skip-full-decode", action="store_true")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    path = args.video
+    if path is None:
+        tmp_dir = tempfile.mkdtemp(prefix="video-bench-")
+        path = os.path.join(tmp_dir, "clip.mp4")
+        print(f"Generating {args.seconds:.0f}s 1080p clip ...")
+        make_clip(path, args.seconds)
+
+    try:
+        video_seconds = duration(path)
+        print(f"video={path} duration={video_seconds:.1f}s cpus={os.cpu_count()}")
+        print(f"{'mode':>16} {'wall':>8} {'frames':>7} {'frames/s':>9} {'x realtime':>11}")
+        if not args.skip_full_decode:
+            wall = full_decode(path)
+            print(f"{'full decode':>16} {wall:>7.2f}s {'all':>7} {'':>9} {video_seconds / wall:>10.1f}x")
+        for fps in args.fps:
+            encoder = VideoEncoder(fps=fps, width=args.width)
+            start = time.perf_counter()
+            features = encoder.features(path)
+            wall = time.perf_counter() - start
+            frames = features["frames_sampled"]
+            print(f"{f'encoder @{fps:g}fps':>16} {wall:>7.2f}s {frames:>7.0f} {frames / wall:>9.1f} "
+                  f"{video_seconds / wall:>10.1f}x")
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# ==============================
+# whisper_batching_bench.py
+# ==============================
+"""
+Aggregate Whisper throughput under concurrent load, with cross-request
+batching (preprocessing/whisper_batcher.py) off and on.
+
+`--jobs` threads each transcribe their own recording at the same time, as
+concurrent uploads do. "off" is the existing path: every job calls
+model.transcribe on the shared registry model, holding its inference lock.
+"on" sends every job's windows to one WhisperBatcher. Both modes decode
+greedily at temperature 0 without fallback and without conditioning on the
+previous window, so they do the same work. The results are reported as
+audio-seconds transcribed per wall-second.
+
+Without model weights, `--random-init` builds a model with the published
+architecture of a size and random weights. Its compute cost is the same but
+its text is noise, so it always decodes close to the maximum token count.
+
+Usage:
+    python benchmarks/whisper_batching_bench.py --model base --jobs 4
+    python benchmarks/whisper_batching_bench.py --random-init tiny --jobs 1 2 4 8
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from preprocessing.audio_ingest import SAMPLE_RATE
+from preprocessing.model_registry import WhisperModelRegistry, _load_whisper
+from preprocessing.whisper_batcher import MAX_BATCH, MAX_WAIT_SECONDS, WhisperBatcher
+
+# Published architectures: (n_audio_state / n_text_state, heads, layers)
+ARCHITECTURES = {"tiny": (384, 6, 4), "base": (512, 8, 6), "small": (768, 12, 12)}
+OPTIONS = {"temperature": 0.0, "condition_on_previous_text": False, "fp16": False}
+
+
+def random_model(size: str):
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+
+    torch.manual_seed(0)
+    state, heads, layers = ARCHITECTURES[size]
+    dims = ModelDimensions(n_mels=80, n_audio_ctx=1500, n_audio_state=state, n_audio_head=heads,
+                           n_audio_layer=layers, n_vocab=51865, n_text_ctx=448, n_text_state=state,
+                           n_text_head=heads, n_text_layer=layers)
+    model = Whisper(dims).eval()
+    # Checkpoints overwrite it; left as torch.empty it can hold NaNs
+    torch.nn.init.normal_(model.decoder.positional_embedding, std=0.01)
+    return model
+
+
+def run_jobs(transcribe, audios):
+    """Transcribe every recording on its own thread; returns (wall seconds, per-job seconds)."""
+    latencies = [0.0] * len(audios)
+
+    def job(i):
+        start = time.perf_counter()
+        transcribe(audios[i])
+        latencies[i] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=job, args=(i,)) for i in range(len(audios))]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="base", help="Whisper model size to load")
+    parser.add_argument("--random-init", choices=sorted(ARCHITECTURES),
+                        help="use this architecture with random weights instead of loading --model")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4], help="concurrent recordings")
+    parser.add_argument("--seconds", type=float, default=60.0, help="length of each recording")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--wait-ms", type=float, default=MAX_WAIT_SECONDS * 1000)
+    parser.add_argument("--word-timestamps", action="store_true")
+    args = parser.parse_args()
+
+    size = args.random_init or args.model
+    registry = WhisperModelRegistry(loader=random_model if args.random_init else _load_whisper)
+    model = registry.get(size)
+    batcher = WhisperBatcher(size, max_batch=args.max_batch, max_wait=args.wait_ms / 1000, registry=registry,
+                             temperatures=(0.0,))
+
+    def unbatched(audio):
+        with registry.inference_lock(size):
+            return model.transcribe(audio, word_timestamps=args.word_timestamps, **OPTIONS)
+
+    def batched(audio):
+        return batcher.transcribe(audio, word_timestamps=args.word_timestamps)
+
+    rng = np.random.default_rng(0)
+    weights = "random weights" if args.random_init else "trained weights"
+    print(f"model={size} ({weights}) recording={args.seconds:.0f}s max_batch={args.max_batch} "
+          f"wait={args.wait_ms:.0f}ms word_timestamps={args.word_timestamps} cpus={os.cpu_count()}")
+    print(f"{'jobs':>4} {'mode':>4} {'wall':>8} {'audio s/s':>10} {'mean job':>9} {'speedup':>8}")
+    unbatched(np.zeros(SAMPLE_RATE, dtype=np.float32))  # warm-up
+    if args.word_timestamps:
+        from whisper.timing import dtw
+        dtw(__import__("torch").rand(4, 4))  # numba compiles on first use; off the main thread it hangs exit
+    for jobs in args.jobs:
+        audios = [(0.05 * rng.standard_normal(int(args.seconds * SAMPLE_RATE))).astype(np.float32)
+                  for _ in range(jobs)]
+        audio_seconds = jobs * args.seconds
+        rates = {}
+        for mode, transcribe in (("off", unbatched), ("on", batched)):
+            wall, latencies = run_jobs(transcribe, audios)
+            rates[mode] = audio_seconds / wall
+            speedup = f"{rates['on'] / rates['off']:.2f}x" if mode == "on" else ""
+            print(f"{jobs:>4} {mode:>4} {wall:>7.2f}s {rates[mode]:>10.2f} {statistics.mean(latencies):>8.2f}s "
+                  f"{speedup:>8}")
+    print(f"batcher: {batcher.stats()}")
+    batcher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
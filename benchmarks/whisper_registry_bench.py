@@ -0,0 +1,61 @@
+# ==============================
+# whisper_registry_bench.py
+# ==============================
+"""
+Per-request Whisper latency with a cold versus a warm model registry.
+
+A "cold" request builds a fresh registry, so it pays the full load_model cost
+exactly like the old per-request path. A "warm" request reuses one registry.
+
+Usage:
+    python benchmarks/whisper_registry_bench.py --model-size base --requests 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from preprocessing.model_registry import WhisperModelRegistry
+
+SAMPLE_RATE = 16000
+
+
+def _request(registry, model_size, audio):
+    start = time.perf_counter()
+    model = registry.get(model_size)
+    model.transcribe(audio, fp16=False)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-size", default="base")
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=5.0, help="length of the synthetic request audio")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    audio = (0.01 * rng.standard_normal(int(args.seconds * SAMPLE_RATE))).astype(np.float32)
+
+    cold = [_request(WhisperModelRegistry(), args.model_size, audio) for _ in range(args.requests)]
+
+    registry = WhisperModelRegistry()
+    registry.get(args.model_size)  # first load happens once, at startup
+    warm = [_request(registry, args.model_size, audio) for _ in range(args.requests)]
+
+    print(f"model={args.model_size} requests={args.requests} audio={args.seconds:.1f}s")
+    for name, samples in (("cold", cold), ("warm", warm)):
+        print(f"{name:>5}: mean {statistics.mean(samples):.3f}s  "
+              f"median {statistics.median(samples):.3f}s  max {max(samples):.3f}s")
+    print(f"speedup: {statistics.mean(cold) / statistics.mean(warm):.1f}x")
+    print(f"registry: {registry.stats()}")
+
+
+if __name__ == "__main__":
+    main()
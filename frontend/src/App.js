@@ -329,13 +329,133 @@ const formatDuration = (totalSeconds) => {
     return `${minutes}m ${seconds}s`;
 };
 
+const API_BASE = "http://localhost:5000";
+const JOB_POLL_INTERVAL_MS = 2000;
+const LIVE_FINAL_TIMEOUT_MS = 10000; // how long to wait for the live summary after "stop"
+
+// Transform backend results into the shape AnalysisResults renders
+const formatResults = ({ audio_grades, text_grades, context, examples }) => {
+    // Text grades mapping
+    const clarityScore = Number(text_grades.content_quality.clarity_score || 0);
+    const relevanceScore = Number(text_grades.content_quality.relevance_score || 0);
+    const exampleUsage = Number(text_grades.content_quality.example_usage_score || 0);
+
+    const logicalFlow = Number(text_grades.structure.logical_flow_score || 0);
+    const transitions = Number(text_grades.structure.transition_score || 0);
+    const balance = Number(text_grades.structure.balance_score || 0);
+
+    const lexicalRichness = Number(text_grades.vocabulary_style.lexical_richness || 0);
+    const wordAppropriateness = Number(text_grades.vocabulary_style.word_appropriateness || 0);
+    const repetitionControl = Number(text_grades.vocabulary_style.repetition_score || 0);
+
+    const grammarCorrectness = Number(text_grades.grammar_fluency.grammar_correctness || 0);
+    const sentenceFluency = Number(text_grades.grammar_fluency.sentence_fluency || 0);
+    const fillerWordControl = Number(text_grades.grammar_fluency.filler_word_density || 0);
+
+    const formattedData = {
+        contentQuality: {
+            clarityScore: Math.round(clarityScore * 100),
+            relevanceScore: Math.round(relevanceScore * 100),
+            exampleUsage: Math.round(exampleUsage * 100),
+        },
+        structureFlow: {
+            logicalFlow: Math.round(logicalFlow * 100),
+            transitions: Math.round(transitions * 100),
+            balance: Math.round(balance * 100),
+        },
+        vocabularyStyle: {
+            lexicalRichness: Math.round(lexicalRichness * 100),
+            wordAppropriateness: Math.round(wordAppropriateness * 100),
+            repetitionControl: Math.round(repetitionControl * 100),
+        },
+        grammarFluency: {
+            grammarCorrectness: Math.round(grammarCorrectness * 100),
+            sentenceFluency: Math.round(sentenceFluency * 100),
+            fillerWordControl: Math.round(fillerWordControl * 100),
+        },
+        speakingMetrics: {
+            wordCount: text_grades.word_count || 0,
+            wordsPerMinute: text_grades.words_per_minute || 0,
+            duration: formatDuration(text_grades.video_duration_seconds || 0),
+        },
+        aiCoaching: {
+            strengths: audio_grades.areas_for_improvement
+                ? audio_grades.areas_for_improvement.slice(0, 3)
+                : ["Great clarity and confidence!"],
+            areasForImprovement: audio_grades.areas_for_improvement || [],
+            practiceExercises: [
+                "Practice your speech in front of a mirror.",
+                "Record yourself and listen to improve pacing and tone.",
+            ],
+        },
+        context: context,
+        examples: examples,
+    };
+    return formattedData;
+};
+
+// /process queues a job and answers 202 with its ID; poll until it finishes
+const pollJob = (jobId) => new Promise((resolve, reject) => {
+    const poll = async () => {
+        try {
+            const response = await fetch(`${API_BASE}/jobs/${jobId}`);
+            const job = await response.json();
+            if (!response.ok) {
+                reject(new Error(job.error || `Job lookup failed: ${response.statusText}`));
+            } else if (job.status === "done") {
+                resolve(job.results);
+            } else if (job.status === "failed") {
+                reject(new Error(job.error || "Processing failed"));
+            } else {
+                setTimeout(poll, JOB_POLL_INTERVAL_MS);
+            }
+        } catch (err) {
+            reject(new Error("Network error"));
+        }
+    };
+    poll();
+});
+
+const STAGE_MESSAGES = {
+    transcript: () => "Transcript ready. Grading your speech...",
+    fillers: ({ filler_counts }) => `Found ${Object.values(filler_counts).reduce((a, b) => a + b, 0)} filler words. Grading your speech...`,
+    wpm: ({ words_per_minute }) => `You spoke at ${Math.round(words_per_minute)} words per minute. Grading your speech...`,
+    prosody: () => "Delivery measured. Waiting for content grades...",
+    context: () => "Understood the topic. Finding reference speeches...",
+    text_grades: () => "Content graded. Comparing your delivery with reference speeches...",
+    examples: () => "Found example speeches. Finishing delivery grades...",
+    audio_grades: () => "Delivery graded. Putting your report together...",
+};
+
+// Follow a job's stage results as they arrive; fall back to polling if the stream drops
+const streamJob = (jobId, onStage) => new Promise((resolve, reject) => {
+    const events = new EventSource(`${API_BASE}/jobs/${jobId}/events`);
+    events.addEventListener("stage", (event) => {
+        const { stage, result } = JSON.parse(event.data);
+        onStage(stage, result);
+    });
+    events.addEventListener("done", (event) => {
+        events.close();
+        const job = JSON.parse(event.data);
+        if (job.status === "done") {
+            resolve(job.results);
+        } else {
+            reject(new Error(job.error || "Processing failed"));
+        }
+    });
+    events.onerror = () => {
+        events.close();
+        pollJob(jobId).then(resolve, reject);
+    };
+});
+
 const analyzeAPI = async (file, onProgress) => {
   const formData = new FormData();
   formData.append("file", file);
 
   return new Promise((resolve, reject) => {
     const xhr = new XMLHttpRequest();
-    xhr.open("POST", "http://localhost:5000/process");
+    xhr.open("POST", `${API_BASE}/process`);
 
     xhr.upload.onprogress = (event) => {
       if (event.lengthComputable) {
@@ -346,74 +466,22 @@ const analyzeAPI = async (file, onProgress) => {
 
     xhr.onload = () => {
       if (xhr.status === 200) {
-        const data = JSON.parse(xhr.responseText);
-        const { audio_grades, text_grades, context, examples } = data.results;
-
-        // Text grades mapping
-        const clarityScore = Number(text_grades.content_quality.clarity_score || 0);
-        const relevanceScore = Number(text_grades.content_quality.relevance_score || 0);
-        const exampleUsage = Number(text_grades.content_quality.example_usage_score || 0);
-
-        const logicalFlow = Number(text_grades.structure.logical_flow_score || 0);
-        const transitions = Number(text_grades.structure.transition_score || 0);
-        const balance = Number(text_grades.structure.balance_score || 0);
-
-        const lexicalRichness = Number(text_grades.vocabulary_style.lexical_richness || 0);
-        const wordAppropriateness = Number(text_grades.vocabulary_style.word_appropriateness || 0);
-        const repetitionControl = Number(text_grades.vocabulary_style.repetition_score || 0);
-
-        const grammarCorrectness = Number(text_grades.grammar_fluency.grammar_correctness || 0);
-        const sentenceFluency = Number(text_grades.grammar_fluency.sentence_fluency || 0);
-        const fillerWordControl = Number(text_grades.grammar_fluency.filler_word_density || 0);
-
-        const formattedData = {
-            contentQuality: {
-                clarityScore: Math.round(clarityScore * 100),
-                relevanceScore: Math.round(relevanceScore * 100),
-                exampleUsage: Math.round(exampleUsage * 100),
-            },
-            structureFlow: {
-                logicalFlow: Math.round(logicalFlow * 100),
-                transitions: Math.round(transitions * 100),
-                balance: Math.round(balance * 100),
-            },
-            vocabularyStyle: {
-                lexicalRichness: Math.round(lexicalRichness * 100),
-                wordAppropriateness: Math.round(wordAppropriateness * 100),
-                repetitionControl: Math.round(repetitionControl * 100),
-            },
-            grammarFluency: {
-                grammarCorrectness: Math.round(grammarCorrectness * 100),
-                sentenceFluency: Math.round(sentenceFluency * 100),
-                fillerWordControl: Math.round(fillerWordControl * 100),
-            },
-            speakingMetrics: {
-                wordCount: text_grades.word_count || 0,
-                wordsPerMinute: text_grades.words_per_minute || 0,
-                duration: formatDuration(text_grades.video_duration_seconds || 0),
-            },
-            aiCoaching: {
-                strengths: audio_grades.areas_for_improvement
-                    ? audio_grades.areas_for_improvement.slice(0, 3)
-                    : ["Great clarity and confidence!"],
-                areasForImprovement: audio_grades.areas_for_improvement || [],
-                practiceExercises: [
-                    "Practice your speech in front of a mirror.",
-                    "Record yourself and listen to improve pacing and tone.",
-                ],
-            },
-            context: context,
-            examples: examples,
+        // Same file analysed before: results come back immediately
+        resolve(formatResults(JSON.parse(xhr.responseText).results));
+      } else if (xhr.status === 202) {
+        const { job_id } = JSON.parse(xhr.responseText);
+        const onStage = (stage, result) => {
+            if (STAGE_MESSAGES[stage]) onProgress(100, STAGE_MESSAGES[stage](result));
         };
-        resolve(formattedData);
-    } else {
+        streamJob(job_id, onStage).then((results) => resolve(formatResults(results)), reject);
+      } else {
         reject(new Error(`Upload failed: ${xhr.statusText}`));
-    }
-};
+      }
+    };
 
-xhr.onerror = () => reject(new Error("Network error"));
+    xhr.onerror = () => reject(new Error("Network error"));
     xhr.send(formData);
-});
+  });
 };
 
 
@@ -843,8 +911,11 @@ const LivePractice = () => {
     const [practiceStatus, setPracticeStatus] = useState('idle'); // idle, recording, analyzing, success
     const [practiceAnalysisResult, setPracticeAnalysisResult] = useState(null);
     const [mediaError, setMediaError] = useState(null);
+    const [liveFeedback, setLiveFeedback] = useState({ transcript: '', partial: '', wpm: null, pace: null, fillers: [] });
 
     const videoRef = useRef(null);
+    const socketRef = useRef(null);
+    const audioContextRef = useRef(null);
     const mediaRecorderRef = useRef(null);
     const streamRef = useRef(null);
     const recordedChunksRef = useRef([]);
@@ -856,6 +927,63 @@ const LivePractice = () => {
         return `${minutes}:${seconds}`;
     };
 
+    // Stream 16 kHz int16 PCM to /live and show its running transcript, pace and filler alerts
+    const startLiveFeedback = (stream) => {
+        const socket = new WebSocket(`${API_BASE.replace(/^http/, 'ws')}/live`);
+        socket.binaryType = 'arraybuffer';
+        socket.onmessage = (event) => {
+            const message = JSON.parse(event.data);
+            if (message.type === 'final') {
+                setLiveFeedback(prev => ({
+                    ...prev,
+                    transcript: message.transcript,
+                    partial: '',
+                    wpm: message.wpm,
+                }));
+                socket.close();
+                return;
+            }
+            if (message.type !== 'update') return;
+            setLiveFeedback(prev => ({
+                transcript: message.committed ? `${prev.transcript} ${message.committed}`.trim() : prev.transcript,
+                partial: message.partial,
+                wpm: message.recent_wpm,
+                pace: message.pace,
+                fillers: [...prev.fillers, ...message.filler_alerts].slice(-5),
+            }));
+        };
+        socketRef.current = socket;
+
+        const audioContext = new AudioContext({ sampleRate: 16000 });
+        const source = audioContext.createMediaStreamSource(stream);
+        const processor = audioContext.createScriptProcessor(4096, 1, 1);
+        processor.onaudioprocess = (event) => {
+            if (socket.readyState !== WebSocket.OPEN) return;
+            const samples = event.inputBuffer.getChannelData(0);
+            const pcm = new Int16Array(samples.length);
+            for (let i = 0; i < samples.length; i++) {
+                pcm[i] = Math.max(-1, Math.min(1, samples[i])) * 0x7fff;
+            }
+            socket.send(pcm.buffer);
+        };
+        source.connect(processor);
+        processor.connect(audioContext.destination);
+        audioContextRef.current = audioContext;
+    };
+
+    // Ask for the final summary; the socket closes when it arrives (or after LIVE_FINAL_TIMEOUT_MS)
+    const stopLiveFeedback = () => {
+        const socket = socketRef.current;
+        if (socket && socket.readyState === WebSocket.OPEN) {
+            socket.send(JSON.stringify({ type: 'stop' }));
+            const timeout = setTimeout(() => socket.close(), LIVE_FINAL_TIMEOUT_MS);
+            socket.addEventListener('close', () => clearTimeout(timeout));
+        }
+        if (audioContextRef.current) audioContextRef.current.close();
+        socketRef.current = null;
+        audioContextRef.current = null;
+    };
+
     const startPractice = async () => {
         setMediaError(null);
         recordedChunksRef.current = [];
@@ -885,6 +1013,8 @@ const LivePractice = () => {
             };
 
             mediaRecorderRef.current.start();
+            setLiveFeedback({ transcript: '', partial: '', wpm: null, pace: null, fillers: [] });
+            startLiveFeedback(stream);
             setPracticeStatus('recording');
             setElapsedTime(0);
             
@@ -902,6 +1032,7 @@ const LivePractice = () => {
         if (mediaRecorderRef.current && mediaRecorderRef.current.state === 'recording') {
             mediaRecorderRef.current.stop();
         }
+        stopLiveFeedback();
         if (streamRef.current) {
             streamRef.current.getTracks().forEach(track => track.stop());
         }
@@ -917,6 +1048,7 @@ const LivePractice = () => {
     useEffect(() => {
         return () => {
             if(timerIntervalRef.current) clearInterval(timerIntervalRef.current);
+            stopLiveFeedback();
             if (streamRef.current) {
                 streamRef.current.getTracks().forEach(track => track.stop());
             }
@@ -963,6 +1095,24 @@ const LivePractice = () => {
                         </div>
                 )}
 
+                {practiceStatus === 'recording' && (
+                    <div className="w-full bg-gray-900 rounded-lg p-4 space-y-3">
+                        <div className="flex justify-between text-sm text-gray-400">
+                            <span>Pace: <span className="text-white font-semibold">{liveFeedback.wpm !== null ? `${Math.round(liveFeedback.wpm)} WPM` : '--'}</span>
+                                {liveFeedback.pace && <span className={liveFeedback.pace === 'good' ? 'text-green-400 ml-2' : 'text-yellow-400 ml-2'}>({liveFeedback.pace})</span>}
+                            </span>
+                            <span>
+                                {liveFeedback.fillers.map((alert, index) => (
+                                    <span key={index} className="ml-2 px-2 py-0.5 rounded bg-yellow-900 text-yellow-300">"{alert.filler}"</span>
+                                ))}
+                            </span>
+                        </div>
+                        <p className="text-gray-200 text-sm max-h-24 overflow-y-auto">
+                            {liveFeedback.transcript.slice(-400)} <span className="text-gray-500">{liveFeedback.partial}</span>
+                        </p>
+                    </div>
+                )}
+
                 <button
                     onClick={practiceStatus === 'recording' ? stopPractice : startPractice}
                     className={`w-full max-w-xs py-3 px-6 text-lg font-bold rounded-lg transition-all flex items-center justify-center ${practiceStatus === 'recording' ? 'bg-red-600 hover:bg-red-700' : 'bg-green-600 hover:bg-green-700'}`}
@@ -0,0 +1,47 @@
+# ==============================
+# main.py
+# ==============================
+"""
+Command-line analysis of one recording, a directory of recordings, or a
+manifest of paths, without going through the HTTP API. See backend/batch.py.
+
+Usage:
+    python main.py talk.mp4
+    python main.py cohort/ --output cohort.jsonl --workers 4
+    python main.py manifest.txt --model small --backend int8
+"""
+
+import argparse
+import sys
+
+from backend.batch import DEFAULT_WORKERS, discover, run_batch
+from preprocessing.transcribers import BACKENDS, DEFAULT_BACKEND, model_key
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="recording, directory of recordings, or manifest (.txt or .jsonl)")
+    parser.add_argument("--output", "-o", default="results.jsonl",
+                        help="JSONL file to append results to; recordings already done in it are skipped")
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=DEFAULT_BACKEND,
+                        help="transcription backend (see preprocessing/transcribers.py)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="worker processes, each with its own warm Whisper model")
+    args = parser.parse_args()
+
+    items = discover(args.source)
+    if not items:
+        print(f"No recordings found in {args.source}")
+        sys.exit(1)
+    try:
+        summary = run_batch(items, args.output, model_size=model_key(args.model, args.backend),
+                            workers=args.workers)
+    except KeyboardInterrupt:
+        sys.exit(130)
+    print(f"\n✅ Done! Results in {args.output}")
+    sys.exit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
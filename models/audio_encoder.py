@@ -1,17 +1,29 @@
 import os
-import shutil
 import json
 import re
-from typing import Dict, List
-import yt_dlp
+from typing import TYPE_CHECKING, Dict, List, Union
 import logging
 from types import SimpleNamespace
 import isodate 
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from dotenv import load_dotenv
 
-import requests
-from typing import Dict, List
+from models.prosody import analyze_prosody, score_prosody
+from preprocessing.fillers import count_fillers
+from models.reference_cache import ReferenceAudioCache, get_reference_cache, video_id_from_url, CACHE_EXT
+from models.response_cache import cacheable, get_response_cache
+from preprocessing.audio_ingest import SAMPLE_RATE
+from preprocessing.telemetry import cache_lookup, in_context, registry, span
+
+# yt_dlp, requests and google.generativeai are imported on first use, so that
+# importing the pipeline (and starting a server worker) stays fast.
+if TYPE_CHECKING:
+    import requests
 
 
 YOUTUBE_VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
@@ -22,21 +34,85 @@ YOUTUBE_SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
 load_dotenv()
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
-try:
-    from dotenv import load_dotenv  # type: ignore
-except Exception:
-    def load_dotenv(*a, **k):
-        return False
+VIDEOS_BATCH_SIZE = 50  # videos.list accepts at most 50 ids per call
+SEARCH_WORKERS = 8
+HTTP_TIMEOUT_SECONDS = 10
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("YOUTUBE_SEARCH_CACHE_TTL", 6 * 60 * 60))
+SEARCH_CACHE_MAX_ENTRIES = 1024
+
+# Reference talks are only compared against, so a short, small excerpt is enough:
+# the first REFERENCE_EXCERPT_SECONDS (0 = whole video) of the smallest usable
+# audio stream, stored as mono 16 kHz Opus at REFERENCE_BITRATE_KBPS.
+REFERENCE_EXCERPT_SECONDS = float(os.getenv("REFERENCE_EXCERPT_SECONDS", 90))
+REFERENCE_BITRATE_KBPS = int(os.getenv("REFERENCE_BITRATE_KBPS", 24))
+# libopus effort, 0-10; ffmpeg's default of 10 costs several times more CPU for little gain on speech
+REFERENCE_OPUS_COMPLEXITY = int(os.getenv("REFERENCE_OPUS_COMPLEXITY", 5))
+REFERENCE_DOWNLOAD_WORKERS = int(os.getenv("REFERENCE_DOWNLOAD_WORKERS", 4))
+REFERENCE_FORMAT = "bestaudio[abr<=64]/worstaudio/bestaudio/best"
+
+REFERENCE_BYTES = registry.counter(
+    "speakeasy_reference_download_bytes_total", "Bytes downloaded by yt_dlp for reference audio.")
+
+
+class _TTLCache:
+    """Small thread-safe cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return list(value)
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, list(value))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_search_cache = _TTLCache(SEARCH_CACHE_TTL_SECONDS, SEARCH_CACHE_MAX_ENTRIES)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> "requests.Session":
+    """Shared HTTP session so YouTube API calls reuse pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=SEARCH_WORKERS * 2)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+genai = None  # google.generativeai, imported by _configure_genai_from_env
+_configured_key = None
 
-try:
-    import google.generativeai as genai  # type: ignore
-except Exception:
-    genai = None
 
-load_dotenv()
 # Helper function for configuring Gemini
 def _configure_genai_from_env():
-    global genai
+    global genai, _configured_key
     if genai is None:
         import sys as _sys
         if 'google.generativeai' in _sys.modules:
@@ -49,24 +125,81 @@ def _configure_genai_from_env():
                 genai = _genai
             except Exception:
                 return
-    if hasattr(genai, "configure") and os.environ.get("GEMINI_API_KEY"):
+    key = os.environ.get("GEMINI_API_KEY")
+    if hasattr(genai, "configure") and key and key != _configured_key:
         try:
-            genai.configure(api_key=os.environ["GEMINI_API_KEY"])
+            genai.configure(api_key=key)
+            _configured_key = key
         except Exception:
             pass
 
 
+def _convert_reference(source: str, output: str) -> str:
+    """Re-encode downloaded reference audio as mono 16 kHz Opus, trimmed to the excerpt."""
+    cmd = ["ffmpeg", "-nostdin", "-v", "error", "-y", "-i", source, "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE)]
+    if REFERENCE_EXCERPT_SECONDS > 0:
+        cmd += ["-t", f"{REFERENCE_EXCERPT_SECONDS:g}"]  # in case the server ignored the range
+    cmd += ["-c:a", "libopus", "-b:a", f"{REFERENCE_BITRATE_KBPS}k", "-application", "voip",
+            "-compression_level", str(REFERENCE_OPUS_COMPLEXITY), output]
+    try:
+        subprocess.run(cmd, capture_output=True, check=True)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to convert reference audio {source}: "
+                           f"{e.stderr.decode(errors='ignore')[-500:]}") from e
+    return output
+
+
+def _parse_keywords(text: str) -> List[str]:
+    """Comma- or line-separated keywords; raises ValueError if there are none."""
+    keywords = [kw.strip() for kw in text.replace("\n", ",").split(",") if kw.strip()]
+    if not keywords:
+        raise ValueError("no keywords in Gemini response")
+    return keywords
+
+
+def _parse_grades(text: str) -> dict:
+    """Audio grades as a JSON object, fences stripped; raises ValueError otherwise."""
+    data = json.loads(re.sub(r"^```json|```$", "", text.strip(), flags=re.MULTILINE))
+    if not isinstance(data, dict):
+        raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+    return data
+
+
 class AudioEncoder:
-    def __init__(self, text_scores: str, json_config: str, user_audio_path:str, model_name: str = "gemini-2.5-pro", device: str = "cpu"):
+    def __init__(self, text_scores: str, json_config: str, user_audio_path:str, model_name: str = "gemini-2.5-pro", device: str = "cpu", user_audio=None, segments=None, fillers=None):
         self.model_name = model_name
         self.device = device
         self.user_audio_path = user_audio_path
+        self.user_audio = user_audio  # decoded 16 kHz mono float32 samples, when available
+        self.segments = segments  # Whisper segments of the user's audio, when available
+        self.fillers = fillers  # {filler: [timestamps]} from preprocessing/fillers.py, when available
+        self.prosody = None
         self.context = json_config
         self.text_scores = text_scores
         self.scores = {}
         self.audio_urls = []  # will store audio file paths later
+        self.reference_paths = []
+        self.reference_fetch = {}  # bytes and seconds spent fetching reference audio, see download_reference_audio
+        self.response_cache = get_response_cache()
 
-    def _call_generate(self, prompt: str):
+    def _call_generate(self, prompt: str, stage: str = None, validate=None):
+        """
+        Call Gemini through the shared response cache (see models/response_cache.py).
+        Only responses that `validate(text)` accepts are cached.
+        """
+        cache = self.response_cache
+        if cache is not None and cache.should_cache(stage):
+            cached = cache.get(self.model_name, prompt)
+            if cached is not None and cacheable(cached, validate):
+                print(f"AudioEncoder: response cache hit for {stage}")
+                return SimpleNamespace(text=cached)
+        with span("gemini", purpose=stage or "unknown"):
+            response = self._generate_uncached(prompt)
+        if cache is not None and cache.should_cache(stage) and cacheable(response.text, validate):
+            cache.put(self.model_name, prompt, response.text, stage)
+        return response
+
+    def _generate_uncached(self, prompt: str):
         _configure_genai_from_env()
         global genai
         if genai is None or not hasattr(genai, "GenerativeModel"):
@@ -95,9 +228,8 @@ class AudioEncoder:
             f"Context:\n- Specific Topic: {specific_topic}\n- General Topic: {general_topic}\n- Format: {speech_format}\n"
         )
         try:
-            keywords_text = self._call_generate(prompt)
-            keywords = [kw.strip() for kw in keywords_text.text.replace("\n", ",").split(",") if kw.strip()]
-            return keywords
+            keywords_text = self._call_generate(prompt, stage="generate_keywords", validate=_parse_keywords)
+            return _parse_keywords(keywords_text.text)
         except Exception as e:
             print(f"Warning: Gemini keyword generation failed: {e}")
             fallback = []
@@ -112,63 +244,114 @@ class AudioEncoder:
     def _search_youtube(self, keyword: str, max_results: int = 3) -> List[str]:
         """
         Queries the YouTube Data API for videos matching the keyword,
-        filtering out videos longer than 30 minutes.
+        filtering out videos longer than MAX_VIDEO_DURATION_SECONDS.
         """
-        results = []
-        next_page_token = None
-
-        while len(results) < max_results:
-            params = {
-                "part": "snippet",
-                "q": keyword,
-                "type": "video",
-                "maxResults": 10,  # fetch more to allow filtering
-                "key": YOUTUBE_API_KEY
-            }
-            if next_page_token:
-                params["pageToken"] = next_page_token
+        return self._search_many([keyword], max_results)[keyword]
 
-            try:
-                response = requests.get(YOUTUBE_SEARCH_URL, params=params)
+    def _search_many(self, keywords: List[str], max_results: int = 3) -> Dict[str, List[str]]:
+        """
+        Searches YouTube for several keywords at once.
+
+        Cached keywords skip the network. The rest are searched concurrently
+        over the shared session, one result page per keyword per round, and the
+        durations of every candidate from that round are looked up together in
+        as few videos.list calls as possible. Keywords that still lack
+        `max_results` short-enough videos move on to their next page.
+        """
+        found = {}
+        state = {}
+        for kw in dict.fromkeys(keywords):
+            cached = _search_cache.get(kw)
+            cache_lookup("youtube_search", cached is not None)
+            if cached is not None:
+                found[kw] = cached
+            else:
+                state[kw] = {"results": [], "token": None, "failed": False}
+        if found:
+            print(f"YouTube search cache hits: {list(found)}")
+
+        active = list(state)
+        with ThreadPoolExecutor(max_workers=min(SEARCH_WORKERS, max(1, len(active)))) as pool:
+            while active:
+                pages = dict(zip(active, pool.map(
+                    in_context(lambda kw: self._fetch_search_page(kw, state[kw]["token"])), active)))
+
+                candidates = [vid for page in pages.values() if page for vid in page[0]]
+                durations = self._fetch_durations(candidates, pool)
+
+                next_active = []
+                for kw in active:
+                    entry = state[kw]
+                    if pages[kw] is None:
+                        entry["failed"] = True
+                        continue
+                    video_ids, entry["token"] = pages[kw]
+                    for vid in video_ids:
+                        if len(entry["results"]) >= max_results:
+                            break
+                        if durations.get(vid, MAX_VIDEO_DURATION_SECONDS + 1) <= MAX_VIDEO_DURATION_SECONDS:
+                            entry["results"].append(f"https://www.youtube.com/watch?v={vid}")
+                    if len(entry["results"]) < max_results and video_ids and entry["token"]:
+                        next_active.append(kw)
+                active = next_active
+
+        for kw, entry in state.items():
+            found[kw] = entry["results"]
+            if not entry["failed"]:
+                _search_cache.set(kw, entry["results"])
+        return found
+
+    def _fetch_search_page(self, keyword: str, page_token=None):
+        """Returns (video_ids, next_page_token) for one search page, or None on failure."""
+        params = {
+            "part": "snippet",
+            "q": keyword,
+            "type": "video",
+            "maxResults": 10,  # fetch more to allow filtering
+            "key": YOUTUBE_API_KEY
+        }
+        if page_token:
+            params["pageToken"] = page_token
+        try:
+            with span("youtube_search", purpose="search"):
+                response = _get_session().get(YOUTUBE_SEARCH_URL, params=params, timeout=HTTP_TIMEOUT_SECONDS)
                 response.raise_for_status()
                 data = response.json()
-                items = data.get("items", [])
-                next_page_token = data.get("nextPageToken", None)
-
-                video_ids = [item["id"]["videoId"] for item in items]
-
-                # Fetch video details to get durations
-                if not video_ids:
-                    break
-
-                videos_response = requests.get(
-                    YOUTUBE_VIDEOS_URL,
-                    params={
-                        "part": "contentDetails",
-                        "id": ",".join(video_ids),
-                        "key": YOUTUBE_API_KEY
-                    }
-                )
-                videos_response.raise_for_status()
-                videos_data = videos_response.json().get("items", [])
-
-                for video in videos_data:
-                    duration_iso = video["contentDetails"]["duration"]
-                    duration_sec = int(isodate.parse_duration(duration_iso).total_seconds())
-                    if duration_sec <= MAX_VIDEO_DURATION_SECONDS:
-                        results.append(f"https://www.youtube.com/watch?v={video['id']}")
-                    if len(results) >= max_results:
-                        break
-
-                # Stop if no more pages
-                if not next_page_token:
-                    break
+            video_ids = [item["id"]["videoId"] for item in data.get("items", [])]
+            return video_ids, data.get("nextPageToken", None)
+        except Exception as e:
+            print(f"Warning: YouTube search failed for keyword '{keyword}': {e}")
+            return None
 
+    def _fetch_durations(self, video_ids: List[str], pool) -> Dict[str, int]:
+        """Looks up durations (seconds) for all ids, 50 per videos.list call."""
+        unique = list(dict.fromkeys(video_ids))
+        batches = [unique[i:i + VIDEOS_BATCH_SIZE] for i in range(0, len(unique), VIDEOS_BATCH_SIZE)]
+
+        def fetch(batch):
+            try:
+                with span("youtube_search", purpose="videos"):
+                    response = _get_session().get(
+                        YOUTUBE_VIDEOS_URL,
+                        params={
+                            "part": "contentDetails",
+                            "id": ",".join(batch),
+                            "key": YOUTUBE_API_KEY
+                        },
+                        timeout=HTTP_TIMEOUT_SECONDS
+                    )
+                    response.raise_for_status()
+                    return response.json().get("items", [])
             except Exception as e:
-                print(f"Warning: YouTube search failed for keyword '{keyword}': {e}")
-                break
+                print(f"Warning: YouTube duration lookup failed: {e}")
+                return []
 
-        return results
+        durations = {}
+        for items in pool.map(in_context(fetch), batches):
+            for video in items:
+                duration_iso = video["contentDetails"]["duration"]
+                durations[video["id"]] = int(isodate.parse_duration(duration_iso).total_seconds())
+        return durations
 
     def retrieve_audio_examples(self, context: Dict[str, str], limit: int = 3):
         """
@@ -177,87 +360,150 @@ class AudioEncoder:
         """
         keywords = self._generate_keywords(context)
         print(f"Gemini suggested keywords: {keywords}")
+        return self.search_keywords(keywords, limit)
 
-        all_urls = []
-        for kw in keywords:
-            urls = self._search_youtube(kw)
-            all_urls.extend(urls)
+    def search_keywords(self, keywords: List[str], limit: int = 3) -> List[str]:
+        """
+        Fetches top videos for each keyword, deduplicates, and stores them in
+        self.audio_urls.
+        """
+        found = self._search_many(keywords)
+        all_urls = [url for kw in keywords for url in found.get(kw, [])]
 
         # Deduplicate and limit results
         self.audio_urls = list(dict.fromkeys(all_urls))[:limit]
         print(f"Retrieved {len(self.audio_urls)} video URLs.")
+        return self.audio_urls
 
 
-    def download_reference_audio(self, video_urls: List[str], output_dir: str = "training_data"):
+    def download_reference_audio(self, video_urls: List[str], cache: ReferenceAudioCache = None) -> List[str]:
         """
-        Downloads audio from given video URLs using yt_dlp and saves them locally.
+        Fetches reference audio for the given video URLs through the shared
+        reference cache, downloading with yt_dlp only on a cache miss. Misses
+        are downloaded concurrently, each as a short mono 16 kHz excerpt.
+        Bytes downloaded and time spent downloading and converting are kept
+        in `self.reference_fetch` and in the request's "reference_fetch" span.
 
         Args:
             video_urls (List[str]): List of video URLs to download.
-            output_dir (str): Directory to save extracted audios.
+            cache (ReferenceAudioCache): Cache to use; defaults to the process-wide one.
 
         Returns:
-            List[str]: List of file paths to the downloaded audios.
+            List[str]: Cached audio file paths, in the order of video_urls.
         """
-        # if os.path.exists(output_dir):
-        #     try:
-        #         shutil.rmtree(output_dir)
-        #     except OSError as e:
-        #         raise OSError(f"Failed to delete existing directory {output_dir}: {e}")
-        
-        # Create the directory (recursively if needed)
-
-        os.makedirs(output_dir, exist_ok=True)  # ensure folder exists
-
-        # Clear all files inside
-        for filename in os.listdir(output_dir):
-            file_path = os.path.join(output_dir, filename)
+        cache = cache or get_reference_cache()
+        excerpt = f"-{REFERENCE_EXCERPT_SECONDS:g}s" if REFERENCE_EXCERPT_SECONDS > 0 else ""
+
+        def fetch(url):
+            stats = {"url": url, "bytes": 0, "download_seconds": 0.0, "convert_seconds": 0.0}
             try:
-                if os.path.isfile(file_path) or os.path.islink(file_path):
-                    os.unlink(file_path)  # remove file or symlink
-                elif os.path.isdir(file_path):
-                    shutil.rmtree(file_path)  # remove subdirectory
+                path = cache.fetch(video_id_from_url(url) + excerpt,
+                                   lambda tmp_dir: self._download_audio(url, tmp_dir, stats))
+                print(f"Reference audio for {url}: {path}")
+                return path, stats
             except Exception as e:
-                print(f"Failed to delete {file_path}. Reason: {e}")
+                logging.warning(f"Failed to download audio from {url}: {e}")
+                return None, stats
+
+        with span("reference_fetch", videos=len(video_urls)) as tags:
+            if video_urls:
+                with ThreadPoolExecutor(max_workers=min(REFERENCE_DOWNLOAD_WORKERS, len(video_urls))) as pool:
+                    fetched = list(pool.map(in_context(fetch), video_urls))
+            else:
+                fetched = []
+            downloads = [stats for _, stats in fetched if stats["bytes"]]
+            self.reference_fetch = {
+                "videos": len(video_urls),
+                "downloaded": len(downloads),
+                "bytes": sum(stats["bytes"] for stats in downloads),
+                "download_seconds": round(sum(stats["download_seconds"] for stats in downloads), 3),
+                "convert_seconds": round(sum(stats["convert_seconds"] for stats in downloads), 3),
+            }
+            tags.update(self.reference_fetch)
+        print(f"Reference audio: {len(video_urls)} videos, {len(downloads)} downloaded "
+              f"({self.reference_fetch['bytes'] / 1e6:.2f} MB, {self.reference_fetch['download_seconds']:.1f}s "
+              f"downloading, {self.reference_fetch['convert_seconds']:.1f}s converting)")
+        paths = [path for path, _ in fetched if path]
+        self.reference_paths = paths
+        return paths
+
+    def _download_audio(self, url: str, output_dir: str, stats: dict = None) -> str:
+        """
+        Download the opening excerpt of one video's audio into output_dir, in
+        the smallest usable format, and convert it to mono 16 kHz Opus.
+        Adds bytes and seconds spent to `stats`. Returns the converted path.
+        """
+        import yt_dlp
+        from yt_dlp.utils import download_range_func
+
+        stats = stats if stats is not None else {}
+        finished = []
+
+        def progress(d):
+            if d.get("status") == "finished":
+                finished.append(d.get("downloaded_bytes") or d.get("total_bytes") or 0)
 
         ydl_opts = {
-            "format": "bestaudio/best",  # best quality audio
-            "outtmpl": os.path.join(output_dir, "%(title)s.%(ext)s"),  # output file template
-            "postprocessors": [{
-                "key": "FFmpegExtractAudio",  # extract audio only
-                "preferredcodec": "wav",      # change to "mp3" if desired
-                "preferredquality": "192",    # quality for mp3
-            }],
+            "format": REFERENCE_FORMAT,
+            "outtmpl": os.path.join(output_dir, "source.%(ext)s"),  # output file template
+            "progress_hooks": [progress],
             "quiet": True,
             "no_warnings": True,
         }
-
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            for url in video_urls:
-                try:
-                    logging.info(f"Downloading audio from: {url}")
-                    print(f"Downloading audio from: {url}")
-                    info_dict = ydl.extract_info(url, download=True)
-                    print(f"Downloaded: {info_dict.get('title', 'unknown title')}")
-                    filename = ydl.prepare_filename(info_dict)
-                    print(f"Prepared filename: {filename}")
-                    audio_file = os.path.splitext(filename)[0] + ".wav"
-                    print(f"Converted to audio file: {audio_file}")
-                    print(f"Audio saved to: {audio_file}")
-                except Exception as e:
-                    logging.warning(f"Failed to download audio from {url}: {e}")
-
-    def grade_audio(self, reference_audio_path: str) -> Dict[str, float]:
+        if REFERENCE_EXCERPT_SECONDS > 0:
+            # Only this section is fetched from the server, not the whole stream
+            ydl_opts["download_ranges"] = download_range_func(None, [(0, REFERENCE_EXCERPT_SECONDS)])
+        logging.info(f"Downloading audio from: {url}")
+        print(f"Downloading audio from: {url}")
+        start = time.perf_counter()
+        with span("yt_dlp_download", url=url) as tags, yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info_dict = ydl.extract_info(url, download=True)
+            sources = [os.path.join(output_dir, f) for f in os.listdir(output_dir) if f.startswith("source.")]
+            if not sources:
+                raise FileNotFoundError(f"yt_dlp produced no audio file for {url}")
+            tags["bytes"] = sum(finished) or os.path.getsize(sources[0])
+        stats["download_seconds"] = stats.get("download_seconds", 0.0) + time.perf_counter() - start
+        stats["bytes"] = stats.get("bytes", 0) + tags["bytes"]
+        REFERENCE_BYTES.inc(tags["bytes"])
+        print(f"Downloaded: {info_dict.get('title', 'unknown title')} ({tags['bytes'] / 1e6:.2f} MB)")
+
+        start = time.perf_counter()
+        with span("reference_convert", url=url):
+            path = _convert_reference(sources[0], os.path.join(output_dir, "reference" + CACHE_EXT))
+        stats["convert_seconds"] = stats.get("convert_seconds", 0.0) + time.perf_counter() - start
+        return path
+
+    def analyze_delivery(self) -> dict:
+        """
+        Measure the user's delivery locally (pitch, loudness, pauses, speaking
+        rate) from the decoded samples. See models/prosody.py.
         """
-        Grade the user's audio against a reference audio using Gemini Pro's audio capabilities.
+        if self.user_audio is None:
+            from preprocessing.audio_ingest import load_audio
+            self.user_audio = load_audio(self.user_audio_path)
+        start = time.perf_counter()
+        self.prosody = analyze_prosody(self.user_audio, segments=self.segments)
+        print(f"AudioEncoder: prosody analysis took {time.perf_counter() - start:.2f}s "
+              f"for {self.prosody['duration_seconds']:.0f}s of audio")
+        return self.prosody
+
+    def grade_audio(self, reference_audio_path: Union[str, List[str]]) -> Dict[str, float]:
+        """
+        Grade the user's audio. The rubric scores come from the local prosody
+        metrics; Gemini turns those metrics into coaching notes, and only
+        fills in a score the metrics cannot measure.
 
         Args:
-            user_audio_path (str): Path to the user's audio file.
-            reference_audio_path (str): Path to the reference audio file.
+            reference_audio_path (str | List[str]): Path(s) to the reference audio files.
 
         Returns:
-            Dict[str, float]: Rubric scores for the audio evaluation.
+            Dict[str, float]: Rubric scores for the audio evaluation, plus the
+            measured metrics under "prosody".
         """
+        if self.prosody is None:
+            self.analyze_delivery()
+        measured = score_prosody(self.prosody)
+        metrics_for_prompt = dict(self.prosody, rate={k: v for k, v in self.prosody["rate"].items() if k != "curve"})
 
         # Step 1 — Define rubric schema
         rubric_schema = {
@@ -277,7 +523,7 @@ class AudioEncoder:
             "Analyze and give feedback on:\n"
             "1. Clarity & Understanding: Pronunciation, diction, and message clarity.\n"
             "2. Pacing: Speaking speed; identify moments too fast or too slow.\n"
-            "3. Filler Words: Detect filler words (e.g., 'um', 'uh', 'like') and note their timestamps.\n"
+            "3. Filler Words: Comment on the detected filler words (e.g., 'um', 'uh', 'like') and where they cluster.\n"
             "4. Engagement: Vocal variety (pitch, pace, volume), enthusiasm.\n"
             "5. Message Delivery: Are key points getting across clearly?\n"
             "6. Emotional Tone: Confidence, persuasiveness, engagement.\n"
@@ -286,7 +532,10 @@ class AudioEncoder:
             f"Text Scores (script evaluation):\n\"\"\"{self.text_scores}\"\"\"\n\n"
             "Note: These text scores represent the grading of the user's script. "
             "You can use them as additional context to make more accurate and fair grading decisions.\n\n"
-            f"User Audio Path:\n\"\"\"{self.user_audio_path}\"\"\"\n"
+            f"Measured delivery metrics of the user's audio:\n\"\"\"{json.dumps(metrics_for_prompt)}\"\"\"\n"
+            f"Scores computed from these metrics:\n\"\"\"{json.dumps(measured)}\"\"\"\n"
+            f"Detected filler words (seconds into the recording):\n\"\"\"{json.dumps(self.fillers or {})}\"\"\"\n"
+            "Base your feedback on these measurements.\n\n"
             f"Reference Audio Files:\n\"\"\"{reference_audio_path}\"\"\"\n\n"
             "Note: The reference audio path may contain multiple audio files. Compare the user's audio "
             "against all provided reference audios to generate more reliable and well-rounded feedback.\n\n"
@@ -297,7 +546,6 @@ class AudioEncoder:
             "  \"tone_score\": float,\n"
             "  \"pacing_score\": float,\n"
             "  \"engagement_score\": float,\n"
-            "  \"filler_word_instances\": [{\"word\": str, \"timestamp\": float}],\n"
             "  \"areas_for_improvement\": [str]\n"
             "}\n"
             "Be concise, precise, and encouraging."
@@ -305,20 +553,29 @@ class AudioEncoder:
 
         # Step 3 — Call Gemini Pro's audio grading (via helper method)
         print("AudioEncoder: Calling Gemini for audio grading...")
-        response = self._call_generate(prompt)
+        response = self._call_generate(prompt, stage="grade_audio", validate=_parse_grades)
 
         # Step 4 — Extract JSON safely
         raw = response.text or ""
-        raw = re.sub(r"^```json|```$", "", raw.strip(), flags=re.MULTILINE)
 
         try:
-            self.scores = json.loads(raw)
+            self.scores = _parse_grades(raw)
             # Ensure rubric keys are present
             for key in rubric_schema.keys():
                 rubric_schema[key] = self.scores.get(key, 0.0)
         except Exception as e:
             print(f"Warning: Failed to parse Gemini output as JSON. Raw output:\n{raw}\nError: {e}")
-            self.scores = rubric_schema
+            self.scores = dict(rubric_schema)
+
+        # Measured scores replace Gemini's wherever the metrics support one
+        for key, value in measured.items():
+            if value is not None:
+                self.scores[key] = value
+        self.scores["prosody"] = self.prosody
+        if self.fillers is not None:
+            self.scores["filler_word_instances"] = self.fillers
+            self.scores["filler_counts"] = count_fillers(self.fillers)
+        return self.scores
 
     
     def encode_and_contextualize(self) -> tuple[dict, dict, str]:
@@ -326,10 +583,7 @@ class AudioEncoder:
         Wrapper
         """
         self.retrieve_audio_examples(self.context)
-        self.download_reference_audio(self.audio_urls,"training_data")
-        self.grade_audio("training_data")
-
-        if os.path.exists("training_data"):
-            shutil.rmtree("training_data")
+        reference_paths = self.download_reference_audio(self.audio_urls)
+        self.grade_audio(reference_paths)
 
         return self.scores
\ No newline at end of file
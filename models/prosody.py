@@ -0,0 +1,230 @@
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from preprocessing.audio_ingest import SAMPLE_RATE
+from preprocessing.vad import FRAME_MS, frame_energy_db, silence_runs, speech_frames
+
+PITCH_FMIN = 65.0    # Hz, below a low male voice
+PITCH_FMAX = 400.0   # Hz, above a high female voice
+PITCH_HOP_MS = 20
+PITCH_SR = 8000
+OCTAVE_ERROR_SEMITONES = 9.0
+MIN_PAUSE_SECONDS = 0.25
+LONG_SILENCE_SECONDS = float(os.getenv("PROSODY_LONG_SILENCE_SECONDS", 2.0))
+RATE_WINDOW_SECONDS = 30.0
+RATE_HOP_SECONDS = 10.0
+PAUSE_BUCKETS = [(0.25, 0.5), (0.5, 1.0), (1.0, 2.0), (2.0, float("inf"))]
+
+# Conversational presentation pace, in words per minute
+TARGET_WPM = (130.0, 160.0)
+
+
+def words_per_minute(word_count: int, seconds: float) -> float:
+    return word_count / (seconds / 60) if seconds > 0 else 0.0
+
+
+def pace_label(wpm: Optional[float]) -> Optional[str]:
+    """"too slow", "good" or "too fast" relative to TARGET_WPM."""
+    if wpm is None:
+        return None
+    if wpm < TARGET_WPM[0]:
+        return "too slow"
+    if wpm > TARGET_WPM[1]:
+        return "too fast"
+    return "good"
+
+
+def _pitch_contour(audio: np.ndarray, sr: int, voiced: np.ndarray, frame_ms: int) -> np.ndarray:
+    """YIN f0 per PITCH_HOP_MS hop, NaN where the VAD found no speech or YIN found no period."""
+    import librosa
+    from scipy.signal import resample_poly
+
+    # Voice pitch sits far below 4 kHz; YIN at 8 kHz costs about a quarter as much
+    if sr != PITCH_SR:
+        audio = resample_poly(audio, PITCH_SR, sr).astype(np.float32)
+    hop = int(PITCH_SR * PITCH_HOP_MS / 1000)
+    f0 = librosa.yin(audio, fmin=PITCH_FMIN, fmax=PITCH_FMAX, sr=PITCH_SR,
+                     frame_length=512, hop_length=hop, center=True)
+    # Map each pitch hop onto the VAD frame it falls in
+    frame_of_hop = np.minimum((np.arange(len(f0)) * PITCH_HOP_MS) // frame_ms, len(voiced) - 1)
+    f0 = f0.astype(np.float32)
+    f0[~voiced[frame_of_hop]] = np.nan
+    f0[(f0 <= PITCH_FMIN * 1.01) | (f0 >= PITCH_FMAX * 0.99)] = np.nan  # YIN clamps failures to the bounds
+    return f0
+
+
+def warm_up_pitch():
+    """
+    Run the pitch tracker once on a second of tone. librosa compiles its YIN
+    kernels with numba on first use, which costs over a second; a server pays
+    it at start-up (preprocessing/warmup.py) instead of on its first request.
+    """
+    t = np.arange(PITCH_SR) / PITCH_SR
+    tone = (0.1 * np.sin(2 * np.pi * 150.0 * t)).astype(np.float32)
+    _pitch_contour(tone, PITCH_SR, np.ones(1000 // FRAME_MS, dtype=bool), FRAME_MS)
+
+
+def _rate_curve(segments: List[dict], duration: float) -> List[Dict[str, float]]:
+    """Words per minute over sliding windows, spreading each segment's words evenly over it."""
+    if not segments or duration <= 0:
+        return []
+    starts = np.array([s["start"] for s in segments], dtype=np.float64)
+    ends = np.maximum(np.array([s["end"] for s in segments], dtype=np.float64), starts + 1e-3)
+    words = np.array([len(s.get("text", "").split()) for s in segments], dtype=np.float64)
+    density = words / (ends - starts)
+
+    window = min(RATE_WINDOW_SECONDS, duration)
+    win_starts = np.arange(0.0, max(duration - window, 0.0) + 1e-9, RATE_HOP_SECONDS)
+    win_ends = win_starts + window
+    # Overlap of every window with every segment, (windows x segments)
+    overlap = np.clip(np.minimum(win_ends[:, None], ends) - np.maximum(win_starts[:, None], starts), 0.0, None)
+    wpm = (overlap * density).sum(axis=1) / window * 60.0
+    return [{"start": round(float(s), 2), "wpm": round(float(w), 1)} for s, w in zip(win_starts, wpm)]
+
+
+def analyze_prosody(audio: np.ndarray, sr: int = SAMPLE_RATE, segments: Optional[List[dict]] = None) -> dict:
+    """
+    Measure delivery from the decoded samples: pitch contour and variability,
+    loudness dynamics, pauses and long silences, and (with Whisper
+    `segments`) the speaking rate over sliding windows.
+
+    Args:
+        audio (np.ndarray): Mono float32 samples.
+        sr (int): Sample rate of `audio`.
+        segments (list): Whisper segments ({"start", "end", "text", "avg_logprob"}).
+
+    Returns:
+        dict: Prosody metrics; see `score_prosody` for how they become rubric scores.
+    """
+    duration = len(audio) / sr
+    energy = frame_energy_db(audio, sr, FRAME_MS)
+    voiced = speech_frames(audio, sr, FRAME_MS)
+    frame_seconds = FRAME_MS / 1000
+
+    # --- Loudness ---
+    speech_db = energy[voiced]
+    noise_db = energy[~voiced]
+    loudness = {
+        "mean_db": round(float(speech_db.mean()), 1) if speech_db.size else None,
+        "std_db": round(float(speech_db.std()), 1) if speech_db.size else None,
+        "dynamic_range_db": round(float(np.percentile(speech_db, 95) - np.percentile(speech_db, 10)), 1)
+        if speech_db.size else None,
+        "snr_db": round(float(np.median(speech_db) - np.median(noise_db)), 1)
+        if speech_db.size and noise_db.size else None,
+    }
+
+    # --- Pitch ---
+    pitch = {"median_hz": None, "std_semitones": None, "range_semitones": None, "voiced_fraction": 0.0}
+    if voiced.any():
+        f0 = _pitch_contour(audio, sr, voiced, FRAME_MS)
+        f0 = f0[~np.isnan(f0)]
+        if f0.size:
+            median = float(np.median(f0))
+            semitones = 12.0 * np.log2(f0 / median)
+            # Anything close to an octave off the median is a YIN octave error, not intonation
+            semitones = semitones[np.abs(semitones) < OCTAVE_ERROR_SEMITONES]
+            pitch = {
+                "median_hz": round(median, 1),
+                "std_semitones": round(float(semitones.std()), 2),
+                "range_semitones": round(float(np.percentile(semitones, 95) - np.percentile(semitones, 5)), 2),
+                "voiced_fraction": round(semitones.size * PITCH_HOP_MS / 1000 / duration, 3),
+            }
+
+    # --- Pauses (silences between the first and last speech frame) ---
+    runs = silence_runs(voiced, max(1, int(MIN_PAUSE_SECONDS / frame_seconds)))
+    if voiced.any():
+        first, last = np.flatnonzero(voiced)[[0, -1]]
+        runs = runs[(runs[:, 0] > first) & (runs[:, 1] <= last)]
+    else:
+        runs = runs[:0]
+    lengths = (runs[:, 1] - runs[:, 0]) * frame_seconds
+    long_runs = runs[lengths >= LONG_SILENCE_SECONDS]
+    pauses = {
+        "count": int(lengths.size),
+        "per_minute": round(lengths.size / (duration / 60), 2) if duration else 0.0,
+        "mean_seconds": round(float(lengths.mean()), 2) if lengths.size else 0.0,
+        "p90_seconds": round(float(np.percentile(lengths, 90)), 2) if lengths.size else 0.0,
+        "total_seconds": round(float(lengths.sum()), 2),
+        "histogram": {
+            (f"{lo:g}-{hi:g}s" if hi != float("inf") else f">{lo:g}s"): int(((lengths >= lo) & (lengths < hi)).sum())
+            for lo, hi in PAUSE_BUCKETS
+        },
+    }
+    long_silences = [[round(s * frame_seconds, 2), round(e * frame_seconds, 2)] for s, e in long_runs]
+
+    # --- Speaking rate ---
+    rate_curve = _rate_curve(segments or [], duration)
+    rates = np.array([point["wpm"] for point in rate_curve])
+    rate = {
+        "curve": rate_curve,
+        "mean_wpm": round(float(rates.mean()), 1) if rates.size else None,
+        "std_wpm": round(float(rates.std()), 1) if rates.size else None,
+    }
+
+    # --- Recognition confidence, a proxy for how intelligible the words were ---
+    confidence = None
+    if segments:
+        spans = np.array([max(s["end"] - s["start"], 0.0) for s in segments])
+        logprobs = np.array([s.get("avg_logprob", np.nan) for s in segments], dtype=np.float64)
+        known = ~np.isnan(logprobs)
+        if known.any() and spans[known].sum() > 0:
+            confidence = round(float(np.average(np.exp(logprobs[known]), weights=spans[known])), 3)
+
+    return {
+        "duration_seconds": round(duration, 2),
+        "speech_fraction": round(float(voiced.mean()), 3) if voiced.size else 0.0,
+        "pitch": pitch,
+        "loudness": loudness,
+        "pauses": pauses,
+        "long_silences": long_silences,
+        "rate": rate,
+        "recognition_confidence": confidence,
+    }
+
+
+def _band(value: Optional[float], low: float, high: float, falloff: float) -> Optional[float]:
+    """1.0 inside [low, high], falling linearly to 0 at `falloff` outside it."""
+    if value is None:
+        return None
+    if value < low:
+        return float(np.clip(1 - (low - value) / falloff, 0.0, 1.0))
+    if value > high:
+        return float(np.clip(1 - (value - high) / falloff, 0.0, 1.0))
+    return 1.0
+
+
+def _mean(*scores) -> Optional[float]:
+    known = [s for s in scores if s is not None]
+    return round(sum(known) / len(known), 2) if known else None
+
+
+def score_prosody(metrics: dict) -> Dict[str, Optional[float]]:
+    """
+    Rubric scores (0.0 to 1.0) derived from `analyze_prosody` metrics. A score
+    is None when the recording does not carry enough signal to measure it.
+    """
+    pitch, loudness, pauses, rate = metrics["pitch"], metrics["loudness"], metrics["pauses"], metrics["rate"]
+    duration_minutes = max(metrics["duration_seconds"] / 60, 1e-6)
+
+    # Steady rate near conversational pace, few dead-air gaps
+    rate_score = _band(rate["mean_wpm"], *TARGET_WPM, falloff=60.0)
+    steadiness = None
+    if rate["mean_wpm"]:
+        steadiness = _band(rate["std_wpm"] / rate["mean_wpm"], 0.0, 0.2, falloff=0.4)
+    silence_score = _band(len(metrics["long_silences"]) / duration_minutes, 0.0, 0.5, falloff=2.0)
+
+    # Expressive but not erratic pitch, varied loudness
+    pitch_score = _band(pitch["std_semitones"], 2.0, 5.0, falloff=2.0)
+    loudness_score = _band(loudness["dynamic_range_db"], 6.0, 20.0, falloff=6.0)
+
+    return {
+        "clarity_score": _mean(_band(loudness["snr_db"], 25.0, float("inf"), falloff=20.0),
+                               _band(pauses["per_minute"], 4.0, 20.0, falloff=15.0)),
+        "pronunciation_score": _band(metrics["recognition_confidence"], 0.75, 1.0, falloff=0.5),
+        "tone_score": _mean(pitch_score, _band(loudness["std_db"], 3.0, 9.0, falloff=6.0)),
+        "pacing_score": _mean(rate_score, steadiness, silence_score),
+        "engagement_score": _mean(pitch_score, loudness_score,
+                                  _band(pitch["range_semitones"], 5.0, 14.0, falloff=5.0)),
+    }
@@ -0,0 +1,149 @@
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+from urllib.parse import urlparse, parse_qs
+import hashlib
+
+from preprocessing.telemetry import cache_lookup
+
+try:
+    import fcntl  # POSIX only; used to coordinate worker processes
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+DEFAULT_CACHE_DIR = os.getenv("REFERENCE_CACHE_DIR", os.path.join("cache", "reference_audio"))
+DEFAULT_MAX_BYTES = int(os.getenv("REFERENCE_CACHE_MAX_BYTES", 1024 ** 3))
+CACHE_EXT = ".opus"
+
+
+def video_id_from_url(url: str) -> str:
+    """YouTube video id for watch/short URLs; a stable hash for anything else."""
+    parsed = urlparse(url)
+    if "v" in parse_qs(parsed.query):
+        return parse_qs(parsed.query)["v"][0]
+    if parsed.netloc.endswith("youtu.be") and parsed.path.strip("/"):
+        return parsed.path.strip("/")
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+class ReferenceAudioCache:
+    """
+    Content cache of reference audio, one compact file per video id.
+
+    Files are written to a private temp dir and moved into place with
+    os.replace, so readers never see partial audio. Recency is tracked with
+    the file mtime, and the least recently used files are evicted once the
+    cache grows past `max_bytes`. On POSIX, file locks stop worker processes
+    from downloading the same video twice or evicting concurrently. A file
+    deleted while another worker has it open stays readable until closed.
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._thread_locks = {}
+        self._guard = threading.Lock()
+        os.makedirs(os.path.join(self.root, ".locks"), exist_ok=True)
+
+    def path_for(self, video_id: str) -> str:
+        return os.path.join(self.root, video_id + CACHE_EXT)
+
+    def get(self, video_id: str) -> Optional[str]:
+        """Cached path for `video_id` (marking it recently used), or None."""
+        path = self.path_for(video_id)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def fetch(self, video_id: str, produce: Callable[[str], str]) -> str:
+        """
+        Return the cached audio for `video_id`, calling `produce(tmp_dir)` to
+        create it on a miss. `produce` must write one audio file inside tmp_dir
+        and return its path.
+        """
+        path = self.get(video_id)
+        if path:
+            self.hits += 1
+            cache_lookup("reference_audio", True)
+            return path
+
+        with self._lock(video_id):
+            path = self.get(video_id)  # another worker may have fetched it meanwhile
+            if path:
+                self.hits += 1
+                cache_lookup("reference_audio", True)
+                return path
+            self.misses += 1
+            cache_lookup("reference_audio", False)
+            tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=self.root)
+            try:
+                produced = produce(tmp_dir)
+                path = self.path_for(video_id)
+                os.replace(produced, path)
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        self.evict(keep=video_id)
+        return path
+
+    def evict(self, keep: Optional[str] = None):
+        """Delete least recently used files until the cache fits in max_bytes."""
+        with self._lock(".evict"):
+            entries = []
+            for entry in os.scandir(self.root):
+                if entry.is_file() and entry.name.endswith(CACHE_EXT):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            keep_path = self.path_for(keep) if keep else None
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep_path:
+                    continue
+                try:
+                    os.unlink(path)
+                    total -= size
+                    print(f"ReferenceAudioCache: evicted {os.path.basename(path)}")
+                except FileNotFoundError:
+                    pass
+
+    def size_bytes(self) -> int:
+        return sum(e.stat().st_size for e in os.scandir(self.root) if e.is_file() and e.name.endswith(CACHE_EXT))
+
+    @contextmanager
+    def _lock(self, name: str):
+        with self._guard:
+            thread_lock = self._thread_locks.setdefault(name, threading.Lock())
+        with thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.root, ".locks", name + ".lock"), "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_reference_cache() -> ReferenceAudioCache:
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ReferenceAudioCache()
+        return _default_cache
@@ -0,0 +1,153 @@
+import os
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from preprocessing.telemetry import cache_lookup
+
+DEFAULT_CACHE_PATH = os.getenv("GEMINI_CACHE_PATH", os.path.join("cache", "gemini_responses.sqlite3"))
+DEFAULT_TTL_SECONDS = int(os.getenv("GEMINI_CACHE_TTL", 7 * 24 * 60 * 60))
+DEFAULT_MAX_BYTES = int(os.getenv("GEMINI_CACHE_MAX_BYTES", 64 * 1024 ** 2))
+DETERMINISTIC_ONLY = os.getenv("GEMINI_CACHE_DETERMINISTIC_ONLY", "").lower() in ("1", "true", "yes")
+CACHE_DISABLED = os.getenv("GEMINI_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+# Stages whose answer is a pure lookup of the prompt (topic, search keywords).
+# Grading stages are judgement calls that users may want re-rolled.
+DETERMINISTIC_STAGES = {"extract_context", "generate_keywords"}
+# Stages whose answer changes over time: example talks come from a web search
+STAGE_TTL_SECONDS = {"retrieve_examples": int(os.getenv("GEMINI_CACHE_EXAMPLES_TTL", 6 * 60 * 60))}
+
+
+class ResponseCache:
+    """
+    On-disk cache of Gemini responses shared by TextEncoder and AudioEncoder.
+
+    Entries are keyed by model name plus a SHA-256 of the prompt, expire after
+    `ttl` seconds (or the stage's entry in `stage_ttl`), and the least recently
+    used ones are evicted once the stored responses exceed `max_bytes`. With `deterministic_only`, only the stages in
+    DETERMINISTIC_STAGES are cached. Safe to share across threads and worker
+    processes (one SQLite connection per thread, WAL journal).
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES, deterministic_only: bool = DETERMINISTIC_ONLY,
+                 stage_ttl: Optional[dict] = None):
+        self.path = path
+        self.ttl = ttl
+        self.stage_ttl = dict(STAGE_TTL_SECONDS if stage_ttl is None else stage_ttl)
+        self.max_bytes = max_bytes
+        self.deterministic_only = deterministic_only
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._counter_lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, model TEXT, stage TEXT, response TEXT,"
+                " size INTEGER, created_at REAL, last_used REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def key(model_name: str, prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return f"{model_name}:{digest}"
+
+    def should_cache(self, stage: Optional[str]) -> bool:
+        return not self.deterministic_only or stage in DETERMINISTIC_STAGES
+
+    def get(self, model_name: str, prompt: str) -> Optional[str]:
+        key = self.key(model_name, prompt)
+        now = time.time()
+        with self._conn() as conn:
+            row = conn.execute("SELECT response, created_at, stage FROM responses WHERE key = ?",
+                               (key,)).fetchone()
+            if row is not None and row[1] + self.stage_ttl.get(row[2], self.ttl) < now:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        with self._counter_lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        cache_lookup("gemini_response", row is not None)
+        return None if row is None else row[0]
+
+    def put(self, model_name: str, prompt: str, response: str, stage: Optional[str] = None):
+        if not response:
+            return
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, stage, response, size, created_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.key(model_name, prompt), model_name, stage, response, len(response.encode("utf-8")), now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        for stage, ttl in self.stage_ttl.items():
+            conn.execute("DELETE FROM responses WHERE stage = ? AND created_at < ?", (stage, now - ttl))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def clear(self):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        with self._conn() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        with self._counter_lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+
+def cacheable(response: str, validate: Optional[Callable[[str], object]] = None) -> bool:
+    """
+    Whether `response` may be cached or served from the cache: `validate`
+    (usually the caller's parser) must accept it without raising.
+    """
+    if validate is None:
+        return True
+    try:
+        validate(response)
+        return True
+    except Exception:
+        return False
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide cache, or None when GEMINI_CACHE_DISABLED is set."""
+    global _default_cache
+    if CACHE_DISABLED:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
@@ -1,33 +1,145 @@
 import os
 import json
 from datetime import datetime
-from typing import List, Union, Dict, Any
+from typing import TYPE_CHECKING, List, Union, Dict, Any
 import re
-import torch
 try:
     from dotenv import load_dotenv  # type: ignore
 except Exception:
     def load_dotenv(*a, **k):
         return False
 
-# Try to import the optional Google Generative AI client. During unit tests
-# the test harness injects a mock into sys.modules['google.generativeai']
-# before importing this module. Guard the import so tests can run without
-# the real package installed.
-try:
-    import google.generativeai as genai  # type: ignore
-except Exception:
-    raise ImportError("google.generativeai package not found. Install it before continuing.")
+if TYPE_CHECKING:
+    import torch
+
+# The Google Generative AI client takes about a second to import, so it is
+# imported on the first Gemini call (see _configure_genai_from_env). Tests may
+# inject a mock into sys.modules['google.generativeai'] before that.
+genai = None
+_configured_key = None
+
+from models.response_cache import cacheable, get_response_cache
+from preprocessing.telemetry import span
 
 load_dotenv()  # Load .env variables
 
+# One structured Gemini call for context, grades and examples instead of three
+FUSED_ANALYSIS = os.getenv("TEXT_ENCODER_FUSED", "").lower() in ("1", "true", "yes")
+
+CONTEXT_KEYS = ("specific_topic", "general_topic", "format")
+
+EXAMPLES_SCHEMA = {
+    "examples": [
+        {
+            "title": "string",
+            "summary": "string",
+            "url": "string",
+            "relevance": ["string", "string"]
+        }
+    ]
+}
+
+GRADE_SECTIONS = {
+    "content_quality": ("clarity_score", "relevance_score", "example_usage_score"),
+    "structure": ("logical_flow_score", "transition_score", "balance_score"),
+    "vocabulary_style": ("lexical_richness", "word_appropriateness", "repetition_score"),
+    "grammar_fluency": ("grammar_correctness", "sentence_fluency", "filler_word_density"),
+    "rhetoric_persuasion": ("rhetorical_device_score", "call_to_action_score", "emotional_valence"),
+}
+
+
+def grade_schema(word_count, words_per_minute) -> Dict[str, Any]:
+    """Rubric schema sent to Gemini: every score at 0.0, plus the measured speaking metrics."""
+    schema: Dict[str, Any] = {section: {key: 0.0 for key in keys} for section, keys in GRADE_SECTIONS.items()}
+    schema["video_duration_seconds"] = round((word_count / words_per_minute) * 60, 2)
+    schema["word_count"] = word_count
+    schema["words_per_minute"] = round(words_per_minute, 2)
+    return schema
+
+
+def _strip_fences(raw: str) -> str:
+    return re.sub(r"^```json|```$", "", raw.strip(), flags=re.MULTILINE)
+
+
+def _invert_lower_is_better(scores: Dict[str, Any]) -> Dict[str, Any]:
+    """Gemini reports repetition and filler density as raw amounts; turn them into 'goodness' scores."""
+    if 'grammar_fluency' in scores and 'filler_word_density' in scores['grammar_fluency']:
+        scores['grammar_fluency']['filler_word_density'] = round(1.0 - min(1.0, max(0.0, scores['grammar_fluency']['filler_word_density'])), 2)
+    if 'vocabulary_style' in scores and 'repetition_score' in scores['vocabulary_style']:
+        scores['vocabulary_style']['repetition_score'] = round(1.0 - min(1.0, max(0.0, scores['vocabulary_style']['repetition_score'])), 2)
+    return scores
+
+
+def _json_object(text: str) -> Dict[str, Any]:
+    data = json.loads(_strip_fences(text))
+    if not isinstance(data, dict):
+        raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+    return data
+
+
+def _validate_context(data) -> Dict[str, str]:
+    """Context section with all of CONTEXT_KEYS as strings; raises ValueError otherwise."""
+    if not isinstance(data, dict) or not all(isinstance(data.get(key), str) for key in CONTEXT_KEYS):
+        raise ValueError(f"context must have string keys {CONTEXT_KEYS}, got {data!r}")
+    return {key: data[key] for key in CONTEXT_KEYS}
+
+
+def _validate_grades(data, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Rubric scores with every GRADE_SECTIONS key a number in [0, 1]; raises
+    ValueError otherwise. The speaking metrics are taken from `schema`, not
+    from the model.
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"scores must be an object, got {data!r}")
+    scores: Dict[str, Any] = {}
+    for section, keys in GRADE_SECTIONS.items():
+        values = data.get(section)
+        if not isinstance(values, dict):
+            raise ValueError(f"scores.{section} is missing")
+        scores[section] = {}
+        for key in keys:
+            value = values.get(key)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0.0 <= value <= 1.0:
+                raise ValueError(f"scores.{section}.{key} must be a number in [0, 1], got {value!r}")
+            scores[section][key] = round(float(value), 2)
+    for key in ("video_duration_seconds", "word_count", "words_per_minute"):
+        scores[key] = schema[key]
+    return _invert_lower_is_better(scores)
+
+
+def _validate_examples(data) -> Dict[str, List[Dict[str, Any]]]:
+    """At least one example with a title, shaped like EXAMPLES_SCHEMA; raises ValueError otherwise."""
+    items = data.get("examples") if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        raise ValueError(f"examples must be a non-empty list, got {data!r}")
+    examples = []
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get("title"), str):
+            raise ValueError(f"every example needs a title, got {item!r}")
+        relevance = item.get("relevance") or []
+        examples.append({
+            "title": item["title"],
+            "summary": str(item.get("summary") or ""),
+            "url": str(item.get("url") or ""),
+            "relevance": [str(r) for r in relevance] if isinstance(relevance, list) else [str(relevance)],
+        })
+    return {"examples": examples}
+
+
+def _validate_fused(data: Dict[str, Any], schema: Dict[str, Any]):
+    """Every section of a fused analysis; raises ValueError if any is missing or malformed."""
+    _validate_context(data.get("context"))
+    _validate_grades(data.get("scores"), schema)
+    _validate_examples(data.get("examples"))
+
 
 def _configure_genai_from_env():
     """Configure genai client from environment if available.
 
     This is called lazily so tests can set sys.modules mocks prior to use.
     """
-    global genai
+    global genai, _configured_key
     if genai is None:
         # Prefer any test-injected module in sys.modules to support mocking
         import sys as _sys
@@ -41,14 +153,17 @@ def _configure_genai_from_env():
                 genai = _genai
             except Exception:
                 return
-    # Configure only if module exposes configure and GEMINI_API_KEY is present
-    if hasattr(genai, "configure") and os.environ.get("GEMINI_API_KEY"):
+    # Configure only if module exposes configure and GEMINI_API_KEY is present,
+    # and only once per key rather than on every call
+    key = os.environ.get("GEMINI_API_KEY")
+    if hasattr(genai, "configure") and key and key != _configured_key:
         try:
-            genai.configure(api_key=os.environ["GEMINI_API_KEY"])
+            genai.configure(api_key=key)
+            _configured_key = key
+            print("configure_genai_from_env worked. genai is configured")
         except Exception:
             # Avoid failing import/configuration in environments without network or creds
             pass
-    print("configure_genai_from_env worked. genai is", "configured" if genai is not None else "not available")
 
 
 class TextEncoder:
@@ -57,8 +172,9 @@ class TextEncoder:
     finds public speaking examples, and produces rubric scores.
     """
 
-    def __init__(self, model_name: str = "gemini-2.5-flash", device: str = "cpu"):
+    def __init__(self, model_name: str = "gemini-2.5-flash", device: str = "cpu", fused: bool = FUSED_ANALYSIS):
         self.device = device
+        self.fused = fused
         # Store model name and defer creating model instances until call-time so
         # unit tests can patch `google.generativeai.GenerativeModel.generate_content`.
         self.model_name = model_name
@@ -67,10 +183,14 @@ class TextEncoder:
         self.scores = {}
         self.context = {}
         self.examples = {} # Store raw text examples or URLs
+        self.fallback_sections = []  # sections the last fused call had to re-request
+        self.response_cache = get_response_cache()
         print(f"TextEncoder initialized with model {model_name} on device {device}")
 
-    def __call__(self, texts: Union[str, List[str]]) -> torch.Tensor:
+    def __call__(self, texts: Union[str, List[str]]) -> "torch.Tensor":
         """Allow batch calls returning dummy tensors."""
+        import torch
+
         if isinstance(texts, str):
             batch = [texts]
         elif isinstance(texts, (list, tuple)):
@@ -105,7 +225,7 @@ class TextEncoder:
             f"Transcript:\n\"\"\"{self.transcript}\"\"\""
         )
         print("TextEncoder: Calling Gemini for context extraction...")
-        response = self._call_generate(prompt)
+        response = self._call_generate(prompt, stage="extract_context", validate=_json_object)
         raw = response.text or ""
         raw = re.sub(r"^```json|```$", "", raw, flags=re.MULTILINE)
 
@@ -119,12 +239,14 @@ class TextEncoder:
             }
         except Exception as e:
             print(f"Warning: Failed to parse context JSON from Gemini. Raw output:\n{raw}\nError: {e}")
-            return {
+            self.context = {
                 "specific_topic": "unknown",
                 "general_topic": "unknown",
                 "format": speech_purpose
             }
+            return self.context
         print(f"TextEncoder: Extracted context: {self.context}")
+        return self.context
 
     def retrieve_examples(self):
         """
@@ -144,16 +266,7 @@ class TextEncoder:
         else:
             search_query = f"public speaking examples for '{speech_format}'"
 
-        json_schema = {
-            "examples": [
-                {
-                    "title": "string",
-                    "summary": "string",
-                    "url": "string",
-                    "relevance": ["string", "string"]
-                }
-            ]
-        }
+        json_schema = EXAMPLES_SCHEMA
 
         print(f"TextEncoder: Building prompt for example retrieval with search query: '{search_query}'")
 
@@ -175,7 +288,8 @@ class TextEncoder:
         print(f"TextEncoder: Calling Gemini for example retrieval with query: '{search_query}'...")
         try:
             # Step 4 — Call Gemini
-            response = self._call_generate(prompt)
+            response = self._call_generate(prompt, stage="retrieve_examples",
+                                           validate=lambda text: _validate_examples(json.loads(text.strip())))
             raw_output = response.text or ""
 
             # Step 5 — Attempt to parse JSON safely
@@ -200,6 +314,7 @@ class TextEncoder:
                 ]
             }
             print(f"TextEncoder: Using fallback examples: {self.examples}")
+        return self.examples
 
 
     def grade_transcript(self, word_count, words_per_minute):
@@ -222,36 +337,7 @@ class TextEncoder:
         # }
 
         # --- Step 2: build schema ---
-        schema = {
-            "content_quality": {
-                "clarity_score": 0.0,
-                "relevance_score": 0.0,
-                "example_usage_score": 0.0
-            },
-            "structure": {
-                "logical_flow_score": 0.0,
-                "transition_score": 0.0,
-                "balance_score": 0.0
-            },
-            "vocabulary_style": {
-                "lexical_richness": 0.0,
-                "word_appropriateness": 0.0,
-                "repetition_score": 0.0
-            },
-            "grammar_fluency": {
-                "grammar_correctness": 0.0,
-                "sentence_fluency": 0.0,
-                "filler_word_density": 0.0
-            },
-            "rhetoric_persuasion": {
-                "rhetorical_device_score": 0.0,
-                "call_to_action_score": 0.0,
-                "emotional_valence": 0.0
-            },
-            "video_duration_seconds": round((word_count / words_per_minute) * 60, 2),
-            "word_count": word_count,
-            "words_per_minute": round(words_per_minute, 2)
-        }
+        schema = grade_schema(word_count, words_per_minute)
 
         # --- Step 3: Gemini call for grading ---
         prompt = (
@@ -267,27 +353,116 @@ class TextEncoder:
             f"Transcript:\n\"\"\"{self.transcript}\"\"\""
         )
         print("TextEncoder: Calling Gemini for transcript grading...")
-        response = self._call_generate(prompt)
+        response = self._call_generate(prompt, stage="grade_transcript",
+                                       validate=lambda text: _validate_grades(_json_object(text), schema))
 
         # --- Step 4: Extract JSON safely ---
-        raw = response.text or ""
-        raw = re.sub(r"^```json|```$", "", raw.strip(), flags=re.MULTILINE)
+        raw = _strip_fences(response.text or "")
 
         try:
-            self.scores = json.loads(raw)
-            # Ensure filler_word_density and repetition_score are inverted for 'goodness' if necessary
-            if 'grammar_fluency' in self.scores and 'filler_word_density' in self.scores['grammar_fluency']:
-                # Assuming Gemini returns a density. Invert it for a 'score'
-                self.scores['grammar_fluency']['filler_word_density'] = round(1.0 - min(1.0, max(0.0, self.scores['grammar_fluency']['filler_word_density'])), 2)
-            if 'vocabulary_style' in self.scores and 'repetition_score' in self.scores['vocabulary_style']:
-                # Assuming Gemini returns a repetition metric. Invert it for a 'score'
-                self.scores['vocabulary_style']['repetition_score'] = round(1.0 - min(1.0, max(0.0, self.scores['vocabulary_style']['repetition_score'])), 2)
+            # Ensure filler_word_density and repetition_score are inverted for 'goodness'
+            self.scores = _invert_lower_is_better(json.loads(raw))
         except Exception as e:
             print(f"Warning: Failed to parse Gemini output as JSON for grading. Raw output:\n{raw}\nError: {e}")
             # Fallback to a default structure to avoid breaking downstream
             self.scores = schema # Return the empty schema
+        return self.scores
+
+    def analyze_transcript(self, word_count, words_per_minute, speech_purpose: str) -> tuple:
+        """
+        Fused mode: context, rubric scores and examples from a single Gemini
+        call, so the transcript is sent (and paid for) once instead of twice,
+        and three sequential round-trips become one.
+
+        Each section is validated against the schema its own method uses; a
+        section that is missing or malformed is re-requested with that method
+        (extract_context, grade_transcript, retrieve_examples), so a partly
+        broken answer costs one extra call rather than the whole analysis.
+        The re-requested sections are listed in `self.fallback_sections`.
+
+        Returns:
+            tuple: (scores, context, examples), as encode_and_contextualize
+        """
+        schema = grade_schema(word_count, words_per_minute)
+        prompt = (
+            "You are a speech-analysis assistant, focusing on constructive feedback for individuals "
+            "who may have English as a second language, neurodivergence, or low confidence. "
+            f"The user indicated the speech purpose is: '{speech_purpose}'.\n"
+            "From the transcript below, return ONE JSON object with three keys:\n"
+            "1. 'context': an object with 'specific_topic' (a concise phrase, e.g. 'bioluminescence in squid'), "
+            "'general_topic' (a broader category, e.g. 'marine biology') and 'format' (the speech type, e.g. "
+            "'scientific conference presentation', 'persuasive debate', 'casual storytelling', 'job interview pitch').\n"
+            "2. 'scores': rubric scores following this schema exactly. Each score should be between 0.0 and 1.0, "
+            "use decimals up to the hundredths place; a higher score is better. Emphasize clarity, logical flow, "
+            "and ease of understanding over highly complex vocabulary or advanced rhetorical devices. "
+            "For repetition_score and filler_word_density give the raw amount (lower is better). "
+            "Do not change the values of word_count, words_per_minute and video_duration_seconds keys.\n"
+            f"{json.dumps(schema, indent=2)}\n"
+            "3. 'examples': exactly 3 compelling public speaking examples highly relevant to that context, "
+            "following this schema; each 'summary' 2-3 sentences, each 'relevance' 2-3 bullet points explaining "
+            "why the example was chosen. If no very specific examples exist, give excellent examples relevant "
+            "to the format or general topic.\n"
+            f"{json.dumps(EXAMPLES_SCHEMA['examples'], indent=2)}\n"
+            "Return ONLY valid JSON. No explanations, no markdown fences.\n\n"
+            f"Transcript:\n\"\"\"{self.transcript}\"\"\""
+        )
+        print("TextEncoder: Calling Gemini for fused transcript analysis...")
+        data = {}
+        try:
+            response = self._call_generate(prompt, stage="analyze_transcript",
+                                           validate=lambda text: _validate_fused(_json_object(text), schema))
+            raw = _strip_fences(response.text or "")
+            data = json.loads(raw)
+            if not isinstance(data, dict):
+                raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+        except Exception as e:
+            print(f"Warning: Fused analysis failed, requesting every section separately. Error: {e}")
+            data = {}
 
-    def _call_generate(self, prompt):
+        self.fallback_sections = []
+        try:
+            self.context = _validate_context(data.get("context"))
+        except ValueError as e:
+            print(f"Warning: Fused context invalid ({e}), requesting it separately.")
+            self.fallback_sections.append("context")
+            self.extract_context(speech_purpose)
+        try:
+            self.scores = _validate_grades(data.get("scores"), schema)
+        except ValueError as e:
+            print(f"Warning: Fused scores invalid ({e}), requesting them separately.")
+            self.fallback_sections.append("scores")
+            self.grade_transcript(word_count, words_per_minute)
+        try:
+            self.examples = _validate_examples(data.get("examples"))
+        except ValueError as e:
+            print(f"Warning: Fused examples invalid ({e}), requesting them separately.")
+            self.fallback_sections.append("examples")
+            self.retrieve_examples()
+        print(f"TextEncoder: Fused analysis done, fallbacks: {self.fallback_sections or 'none'}")
+        return self.scores, self.context, self.examples
+
+    def _call_generate(self, prompt, stage=None, validate=None):
+        """
+        Call Gemini through the shared response cache. `stage` names the
+        pipeline step so the cache can be limited to deterministic stages.
+        A response is only cached if `validate(text)` does not raise, so a
+        malformed answer is asked for again next time instead of served
+        until it expires.
+        """
+        cache = self.response_cache
+        if cache is not None and cache.should_cache(stage):
+            cached = cache.get(self.model_name, prompt)
+            if cached is not None and cacheable(cached, validate):
+                print(f"TextEncoder: response cache hit for {stage}")
+                from types import SimpleNamespace
+                return SimpleNamespace(text=cached)
+        with span("gemini", purpose=stage or "unknown"):
+            response = self._generate_uncached(prompt)
+        if cache is not None and cache.should_cache(stage) and cacheable(response.text, validate):
+            cache.put(self.model_name, prompt, response.text, stage)
+        return response
+
+    def _generate_uncached(self, prompt):
         """Helper to call the generative model in a way that's patch-friendly for tests.
 
         This will import/configure genai lazily and instantiate a GenerativeModel
@@ -354,11 +529,18 @@ class TextEncoder:
         return SimpleNamespace(text=text_val)
 
 
-    def encode_and_contextualize(self, transcript_file, word_count, words_per_minute, speech_purpose) -> tuple[dict, dict, str]:
+    def encode_and_contextualize(self, transcript_file, word_count, words_per_minute, speech_purpose, transcript=None) -> tuple[dict, dict, str]:
         """
         Wrapper: read transcript, extract context, retrieve examples, grade it, return scores, context, and examples.
+        Pass `transcript` to use in-memory text instead of reading transcript_file. In fused mode
+        (see analyze_transcript) all three come from one Gemini call.
         """
-        self.read_transcript(transcript_file)
+        if transcript is not None:
+            self.transcript = transcript
+        else:
+            self.read_transcript(transcript_file)
+        if self.fused:
+            return self.analyze_transcript(word_count, words_per_minute, speech_purpose)
         self.extract_context(speech_purpose)
         self.retrieve_examples()
         self.grade_transcript(word_count, words_per_minute)
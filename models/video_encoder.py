@@ -1,62 +1,262 @@
-import torch
-from typing import Union, List
+import json
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import torch  # imported on first encode(); features() needs only numpy
+
+SAMPLE_FPS = float(os.getenv("VIDEO_SAMPLE_FPS", 1.0))
+SAMPLE_WIDTH = int(os.getenv("VIDEO_SAMPLE_WIDTH", 160))
+BATCH_FRAMES = 256
+KEYFRAME_PROBE_SECONDS = 60  # keyframe spacing is measured over the start of the video
+
+STILL_MOTION = 0.01       # mean absolute frame difference (0-1) below which the speaker is still
+FACE_SKIN_FRACTION = 0.05  # skin pixels in the face region above which a face is taken to be present
+# Where a presenter's face sits in a typical framing: upper middle of the frame,
+# as (top, bottom) and (left, right) fractions of the frame
+FACE_REGION = ((0.05, 0.55), (0.25, 0.75))
+
+FEATURE_NAMES = [
+    "motion_mean", "motion_std", "motion_p90", "still_fraction",
+    "subject_x_mean", "subject_y_mean", "subject_x_std", "subject_y_std", "framing_stability",
+    "face_present_fraction", "face_skin_fraction_mean",
+    "brightness_mean", "brightness_std", "contrast_mean", "sharpness_mean",
+    "frames_sampled", "sample_fps",
+]
+
+
+def _region(shape: Tuple[int, int], region=FACE_REGION) -> Tuple[slice, slice]:
+    """Pixel slices for a region given as fractions of the frame."""
+    h, w = shape
+    (top, bottom), (left, right) = region
+    return slice(int(top * h), int(bottom * h)), slice(int(left * w), int(right * w))
+
+
+def _skin_mask(frames: np.ndarray) -> np.ndarray:
+    """Skin-tone pixels of (N, H, W, 3) uint8 RGB frames, by the usual YCbCr box rule."""
+    rgb = frames.astype(np.float32)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    cr = 0.5 * r - 0.418688 * g - 0.081312 * b + 128
+    cb = -0.168736 * r - 0.331264 * g + 0.5 * b + 128
+    return (cr > 133) & (cr < 173) & (cb > 77) & (cb < 127)
+
+
+def keyframe_interval(packets: List[str]) -> float:
+    """
+    Median seconds between keyframes, from ffprobe "pts_time,flags" packet
+    lines; infinite if fewer than two keyframes were seen.
+    """
+    times = sorted(float(pts) for pts, _, flags in (line.partition(",") for line in packets)
+                   if "K" in flags and pts not in ("", "N/A"))
+    if len(times) < 2:
+        return float("inf")
+    return float(np.median(np.diff(times)))
+
+
+class FrameStats:
+    """
+    Per-frame measurements accumulated batch by batch, so a long video never
+    has to be held in memory as frames.
+    """
+
+    def __init__(self):
+        self._prev_gray = None
+        self.motion: List[np.ndarray] = []
+        self.subject: List[np.ndarray] = []
+        self.face_skin: List[np.ndarray] = []
+        self.brightness: List[np.ndarray] = []
+        self.contrast: List[np.ndarray] = []
+        self.sharpness: List[np.ndarray] = []
+        self.frames = 0
+        self.seconds = 0.0  # duration the frames were sampled from, for sample_fps
+
+    def add(self, frames: np.ndarray):
+        """Measure a (N, H, W, 3) uint8 RGB batch in a handful of vectorized passes."""
+        if len(frames) == 0:
+            return
+        gray = frames.astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32) / 255.0
+        n, h, w = gray.shape
+
+        # Motion energy: mean absolute difference to the previous sampled frame
+        if self._prev_gray is None:
+            diffs = np.abs(gray[1:] - gray[:-1]).mean(axis=(1, 2))
+        else:
+            diffs = np.abs(gray - np.concatenate([self._prev_gray[None], gray[:-1]])).mean(axis=(1, 2))
+        self.motion.append(diffs)
+        self._prev_gray = gray[-1]
+
+        # Subject position: centroid of skin-tone pixels, in [0, 1] of the frame
+        skin = _skin_mask(frames)
+        mass = skin.sum(axis=(1, 2)).astype(np.float32)
+        ys = (skin.sum(axis=2) * np.arange(h)).sum(axis=1) / np.maximum(mass, 1) / max(h - 1, 1)
+        xs = (skin.sum(axis=1) * np.arange(w)).sum(axis=1) / np.maximum(mass, 1) / max(w - 1, 1)
+        centroids = np.stack([xs, ys], axis=1)
+        self.subject.append(centroids[mass > 0])
+
+        rows, cols = _region((h, w))
+        self.face_skin.append(skin[:, rows, cols].mean(axis=(1, 2)))
+
+        self.brightness.append(gray.mean(axis=(1, 2)))
+        self.contrast.append(gray.std(axis=(1, 2)))
+        laplacian = (gray[:, 1:-1, 1:-1] * 4 - gray[:, :-2, 1:-1] - gray[:, 2:, 1:-1]
+                     - gray[:, 1:-1, :-2] - gray[:, 1:-1, 2:])
+        self.sharpness.append(laplacian.var(axis=(1, 2)))
+        self.frames += n
+
+    def summary(self) -> Dict[str, float]:
+        """Aggregate the measurements into FEATURE_NAMES; all zeros if no frames were seen."""
+        if self.frames == 0:
+            return {name: 0.0 for name in FEATURE_NAMES}
+        cat = lambda parts: np.concatenate(parts) if parts else np.empty(0, dtype=np.float32)
+        motion, face_skin = cat(self.motion), cat(self.face_skin)
+        brightness, contrast, sharpness = cat(self.brightness), cat(self.contrast), cat(self.sharpness)
+        subject = np.concatenate(self.subject) if self.subject else np.empty((0, 2), dtype=np.float32)
+
+        stat = lambda values, fn: float(fn(values)) if values.size else 0.0
+        subject_std = subject.std(axis=0) if len(subject) else np.zeros(2)
+        features = {
+            "motion_mean": stat(motion, np.mean),
+            "motion_std": stat(motion, np.std),
+            "motion_p90": stat(motion, lambda v: np.percentile(v, 90)),
+            "still_fraction": stat(motion, lambda v: (v < STILL_MOTION).mean()),
+            "subject_x_mean": float(subject[:, 0].mean()) if len(subject) else 0.0,
+            "subject_y_mean": float(subject[:, 1].mean()) if len(subject) else 0.0,
+            "subject_x_std": float(subject_std[0]),
+            "subject_y_std": float(subject_std[1]),
+            "framing_stability": float(1.0 / (1.0 + 10.0 * np.hypot(*subject_std))) if len(subject) else 0.0,
+            "face_present_fraction": float((face_skin > FACE_SKIN_FRACTION).mean()),
+            "face_skin_fraction_mean": float(face_skin.mean()),
+            "brightness_mean": float(brightness.mean()),
+            "brightness_std": float(brightness.std()),
+            "contrast_mean": float(contrast.mean()),
+            "sharpness_mean": float(sharpness.mean()),
+            "frames_sampled": float(self.frames),
+            "sample_fps": self.frames / self.seconds if self.seconds > 0 else 0.0,
+        }
+        return {name: round(features[name], 4) for name in FEATURE_NAMES}
+
 
 class VideoEncoder:
     """
-    Placeholder for VideoEncoder. In this revised project,
-    the primary video analysis will be handled by the multimodal
-    Gemini model in the Coach. This encoder returns dummy features
-    to maintain the original project structure compatibility if needed
-    for other parts (though not directly used for multimodal analysis).
+    Body-language features from a video, computed on CPU.
+
+    Frames are sampled at `fps` (VIDEO_SAMPLE_FPS, default 1 per second) by
+    ffmpeg and scaled to `width` pixels right after decoding. When keyframes
+    are at least that frequent, only keyframes are decoded (-skip_frame
+    nokey), so the bulk of the video is never decoded. Keyframes are often
+    2-10 s apart, though, which would cap the rate at the GOP spacing and
+    measure motion between frames seconds apart; for such videos every frame
+    is decoded and the sampled ones kept. The rate actually achieved is
+    reported as `sample_fps`. The sampled frames are measured in NumPy
+    batches (see FrameStats) into the FEATURE_NAMES vector: motion energy,
+    framing stability, face-region presence, lighting and focus.
+
+    Files without a video stream (audio-only uploads) yield all-zero features.
     """
-    feat_dim = 16 # Dummy tensor size
+    feat_dim = len(FEATURE_NAMES)
 
-    def __init__(self, device: str = "cpu"):
+    def __init__(self, device: str = "cpu", fps: float = SAMPLE_FPS, width: int = SAMPLE_WIDTH):
         self.device = device
+        self.fps = fps
+        self.width = width
+
+    def _probe(self, video_file: str) -> Optional[Tuple[int, int, float]]:
+        """Display (width, height) of the first video stream and the duration, or None if there is no video."""
+        if not Path(video_file).exists():
+            raise FileNotFoundError(f"File not found: {video_file}")
+        cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0",
+               "-show_entries", "stream=width,height:stream_side_data=rotation:format=duration",
+               "-of", "json", video_file]
+        info = json.loads(subprocess.run(cmd, capture_output=True, check=True).stdout)
+        streams = info.get("streams", [])
+        if not streams:
+            return None
+        width, height = streams[0]["width"], streams[0]["height"]
+        rotation = next((int(d["rotation"]) for d in streams[0].get("side_data_list", []) if "rotation" in d), 0)
+        duration = float(info.get("format", {}).get("duration") or 0.0)
+        # ffmpeg auto-rotates, so portrait phone videos come out with swapped dimensions
+        return (height, width, duration) if rotation % 180 else (width, height, duration)
 
-    def encode(self, video_file: str) -> torch.Tensor:
-        """
-        Returns a dummy tensor representing video features.
-        The actual sophisticated video analysis is done by the multimodal coach.
-        """
-        print(f"VideoEncoder: Encoding dummy features for {video_file}")
+    def _keyframe_interval(self, video_file: str) -> float:
+        """Median seconds between keyframes over the first KEYFRAME_PROBE_SECONDS, from packet flags (no decoding)."""
+        cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0", "-read_intervals", f"%+{KEYFRAME_PROBE_SECONDS}",
+               "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", video_file]
+        out = subprocess.run(cmd, capture_output=True, check=True, text=True).stdout
+        return keyframe_interval(out.splitlines())
+
+    def sample_frames(self, video_file: str, probe: Optional[Tuple[int, int, float]] = None) -> Iterator[np.ndarray]:
+        """Yield batches of up to BATCH_FRAMES sampled frames as (N, H, W, 3) uint8 RGB arrays."""
+        dims = probe or self._probe(video_file)
+        if dims is None:
+            return
+        out_w = self.width
+        out_h = max(2, int(round(dims[1] * out_w / dims[0] / 2)) * 2)
+        keyframes_only = self._keyframe_interval(video_file) <= 1.5 / self.fps
+        # select (unlike fps) only drops frames, so sparse keyframes are never duplicated
+        select = f"select='isnan(prev_selected_t)+gte(t-prev_selected_t\\,{1.0 / self.fps:.4f})'"
+        cmd = [
+            "ffmpeg", "-nostdin", "-v", "error", "-threads", "0",
+            *(["-skip_frame", "nokey"] if keyframes_only else []), "-i", video_file,
+            "-map", "0:v:0", "-an", "-sn", "-dn",
+            "-vf", f"{select},scale={out_w}:{out_h}:flags=fast_bilinear",
+            "-fps_mode", "vfr", "-f", "rawvideo", "-pix_fmt", "rgb24", "-",
+        ]
+        frame_bytes = out_w * out_h * 3
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         try:
-            res = torch.zeros(1, self.feat_dim, device=self.device)
-            if hasattr(torch, 'Tensor') and not isinstance(res, getattr(torch, 'Tensor')):
-                try:
-                    return torch.Tensor()
-                except Exception:
-                    return res
-            return res
-        except Exception:
-            if hasattr(torch, 'Tensor'):
-                try:
-                    return torch.Tensor()
-                except Exception:
-                    return 'mock_tensor'
-            return 'mock_tensor'
-
-    def __call__(self, video_files: Union[str, List[str]]) -> torch.Tensor:
-        """Allow batch calls returning dummy tensors."""
+            while True:
+                buf = proc.stdout.read(frame_bytes * BATCH_FRAMES)
+                n = len(buf) // frame_bytes
+                if n:
+                    yield np.frombuffer(buf[:n * frame_bytes], np.uint8).reshape(n, out_h, out_w, 3)
+                if len(buf) < frame_bytes * BATCH_FRAMES:
+                    break
+        finally:
+            proc.stdout.close()
+            stderr = proc.stderr.read()
+            proc.stderr.close()
+            if proc.wait() != 0:
+                raise RuntimeError(f"Failed to sample frames from {video_file}: {stderr.decode(errors='ignore')[-500:]}")
+
+    def features(self, video_file: str) -> Dict[str, float]:
+        """Named body-language features for one video (see FEATURE_NAMES)."""
+        stats = FrameStats()
+        probe = self._probe(video_file)
+        if probe is not None:
+            stats.seconds = probe[2]
+            for batch in self.sample_frames(video_file, probe):
+                stats.add(batch)
+        print(f"VideoEncoder: sampled {stats.frames} frames from {video_file}")
+        return stats.summary()
+
+    def _vector(self, video_file: str) -> np.ndarray:
+        feats = self.features(video_file)
+        return np.array([feats[name] for name in FEATURE_NAMES], dtype=np.float32)
+
+    def encode(self, video_file: str) -> "torch.Tensor":
+        """Feature tensor of shape (1, feat_dim) for one video."""
+        import torch
+        return torch.from_numpy(self._vector(video_file)[None]).to(self.device)
+
+    def feature_matrix(self, video_files: Union[str, List[str]]) -> np.ndarray:
+        """Features of each video as a (len(video_files), feat_dim) array. Videos are decoded concurrently."""
         if isinstance(video_files, str):
             batch = [video_files]
         elif isinstance(video_files, (list, tuple)):
             batch = video_files
         else:
             raise ValueError("Input to VideoEncoder must be str or list of str")
+        if not batch:
+            return np.zeros((0, self.feat_dim), dtype=np.float32)
+        with ThreadPoolExecutor(max_workers=min(len(batch), os.cpu_count() or 1)) as pool:
+            return np.stack(list(pool.map(self._vector, batch)))
 
-        try:
-            res = torch.zeros(len(batch), self.feat_dim, device=self.device)
-            if hasattr(torch, 'Tensor') and not isinstance(res, getattr(torch, 'Tensor')):
-                try:
-                    return torch.Tensor()
-                except Exception:
-                    return res
-            return res
-        except Exception:
-            if hasattr(torch, 'Tensor'):
-                try:
-                    return torch.Tensor()
-                except Exception:
-                    return 'mock_tensor'
-            return 'mock_tensor'
\ No newline at end of file
+    def __call__(self, video_files: Union[str, List[str]]) -> "torch.Tensor":
+        """feature_matrix(video_files) as a tensor on `self.device`."""
+        import torch
+        return torch.from_numpy(self.feature_matrix(video_files)).to(self.device)
@@ -0,0 +1,73 @@
+# ==============================
+# audio_ingest.py
+# ==============================
+
+import subprocess
+import wave
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+SAMPLE_RATE = 16000  # Whisper's native rate
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".aac", ".flac", ".ogg", ".oga", ".opus", ".weba"}
+
+
+def is_audio_only(path: str) -> bool:
+    return Path(path).suffix.lower() in AUDIO_EXTENSIONS
+
+
+def load_audio(path: str, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Demux and decode the first audio track of `path` in a single ffmpeg pass,
+    downmixed to mono and resampled to `sr`.
+
+    Video streams are never decoded (-vn), and audio-only files skip stream
+    mapping for video altogether. Nothing is written to disk.
+
+    Args:
+        path (str): Path to an audio or video file.
+        sr (int): Target sample rate.
+
+    Returns:
+        np.ndarray: float32 samples in [-1, 1].
+    """
+    if not Path(path).exists():
+        raise FileNotFoundError(f"File not found: {path}")
+
+    cmd = ["ffmpeg", "-nostdin", "-threads", "0", "-i", str(path)]
+    if not is_audio_only(path):
+        cmd += ["-map", "0:a:0", "-vn", "-sn", "-dn"]
+    cmd += ["-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(sr), "-"]
+
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio from {path}: {e.stderr.decode(errors='ignore')[-500:]}") from e
+
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def duration_seconds(audio: np.ndarray, sr: int = SAMPLE_RATE) -> float:
+    return len(audio) / sr
+
+
+def probe_duration(path: str) -> Optional[float]:
+    """
+    Duration of `path` in seconds, read from its container header without
+    decoding any audio, or None if it cannot be read. WAV headers are read
+    directly when ffprobe is not installed.
+    """
+    cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", str(path)]
+    try:
+        return float(subprocess.run(cmd, capture_output=True, check=True, timeout=10).stdout.strip())
+    except (OSError, subprocess.SubprocessError, ValueError):  # missing ffprobe, unreadable file, "N/A"
+        pass
+    if Path(path).suffix.lower() == ".wav":
+        try:
+            with wave.open(str(path), "rb") as f:
+                return f.getnframes() / f.getframerate()
+        except (OSError, EOFError, wave.Error):
+            pass
+    return None
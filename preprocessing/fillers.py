@@ -0,0 +1,150 @@
+# ==============================
+# fillers.py
+# ==============================
+
+import re
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+FILLERS = ["um", "uh", "like", "you know", "so"]
+
+_NON_WORD = re.compile(r"[^\w']+")
+
+
+def normalize(word: str) -> str:
+    """Lowercase a Whisper word token and drop its spacing and punctuation (" Um," -> "um")."""
+    return _NON_WORD.sub("", word.lower())
+
+
+class FillerMatcher:
+    """
+    Aho–Corasick automaton over words rather than characters, so single- and
+    multi-word fillers ("um", "you know") are all found in one pass over the
+    transcript, in time linear in its length plus the number of matches.
+    """
+
+    def __init__(self, fillers: Iterable[str] = FILLERS):
+        self.fillers = list(fillers)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, int]]] = [[]]  # (filler, length in words)
+
+        for filler in self.fillers:
+            tokens = [normalize(t) for t in filler.split()]
+            state = 0
+            for token in tokens:
+                nxt = self._goto[state].get(token)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][token] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((filler, len(tokens)))
+
+        # Breadth-first from the first-word states (which fail back to the root),
+        # so every state's failure target is built before it is needed
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(token, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def advance(self, state: int, token: str) -> int:
+        """Automaton state after reading `token` in `state` (0 is the start state)."""
+        goto, fail = self._goto, self._fail
+        while state and token not in goto[state]:
+            state = fail[state]
+        return goto[state].get(token, 0)
+
+    def matches(self, state: int) -> List[Tuple[str, int]]:
+        """(filler, length in words) of every filler ending at `state`."""
+        return self._out[state]
+
+    def scan(self, tokens: Iterable[str]) -> Iterator[Tuple[int, str, int]]:
+        """Yield (index of the last token, filler, length in words) for every match."""
+        state = 0
+        for i, token in enumerate(tokens):
+            state = self.advance(state, token)
+            for filler, length in self._out[state]:
+                yield i, filler, length
+
+
+_default_matcher = FillerMatcher()
+
+
+def words_from_result(result: dict) -> List[dict]:
+    """
+    Word-level timings ({"word", "start", "end"}) from a Whisper result. Segments
+    transcribed without word_timestamps fall back to their segment's start,
+    and a bare transcript to no timestamps at all.
+    """
+    words = []
+    for segment in result.get("segments") or []:
+        if segment.get("words"):
+            words.extend({"word": w["word"], "start": w["start"], "end": w.get("end")} for w in segment["words"])
+        else:
+            words.extend({"word": w, "start": segment.get("start"), "end": segment.get("end")}
+                         for w in segment.get("text", "").split())
+    if not words:
+        words = [{"word": w, "start": None, "end": None} for w in result.get("text", "").split()]
+    return words
+
+
+def find_fillers(words: List[dict], matcher: Optional[FillerMatcher] = None) -> Dict[str, List[Optional[float]]]:
+    """
+    Timestamps (seconds, of each occurrence's first word) of every filler in
+    `words`, keyed by filler. Every filler in the matcher has a key, even if
+    it never occurs.
+    """
+    matcher = matcher or _default_matcher
+    # Punctuation-only tokens ("-", "...") must not break up "you ... know"
+    kept = [(w, normalize(w["word"])) for w in words]
+    kept = [(w, token) for w, token in kept if token]
+
+    found: Dict[str, List[Optional[float]]] = {filler: [] for filler in matcher.fillers}
+    for end, filler, length in matcher.scan(token for _, token in kept):
+        start = kept[end - length + 1][0].get("start")
+        found[filler].append(round(start, 2) if start is not None else None)
+    return found
+
+
+def count_fillers(found: Dict[str, list]) -> Dict[str, int]:
+    return {filler: len(times) for filler, times in found.items()}
+
+
+class FillerStream:
+    """
+    Incremental form of `find_fillers` for transcripts that arrive a few words
+    at a time (live practice). The automaton state carries over between
+    `feed` calls, so a "you" / "know" split across two feeds still matches.
+    """
+
+    def __init__(self, matcher: Optional[FillerMatcher] = None):
+        self.matcher = matcher or _default_matcher
+        self.found: Dict[str, List[Optional[float]]] = {filler: [] for filler in self.matcher.fillers}
+        self._state = 0
+        longest = max((len(f.split()) for f in self.matcher.fillers), default=1)
+        self._recent = deque(maxlen=longest)  # start times of the last few words
+
+    def feed(self, words: List[dict]) -> List[Dict[str, object]]:
+        """Consume new words ({"word", "start"}) and return the fillers they complete."""
+        hits = []
+        for w in words:
+            token = normalize(w["word"])
+            if not token:
+                continue
+            self._recent.append(w.get("start"))
+            self._state = self.matcher.advance(self._state, token)
+            for filler, length in self.matcher.matches(self._state):
+                start = self._recent[-length]
+                start = round(start, 2) if start is not None else None
+                self.found[filler].append(start)
+                hits.append({"filler": filler, "time": start})
+        return hits
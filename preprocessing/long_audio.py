@@ -0,0 +1,138 @@
+# ==============================
+# long_audio.py
+# ==============================
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from preprocessing.audio_ingest import SAMPLE_RATE, duration_seconds
+from preprocessing.model_registry import _load_whisper, get_registry
+from preprocessing.vad import split_on_silence
+
+# Recordings at least this long are transcribed in parallel chunks.
+LONG_AUDIO_SECONDS = float(os.environ.get("WHISPER_LONG_AUDIO_SECONDS", 600))
+# Each worker loads its own copy of the model, outside the registry's memory budget,
+# so the default stays small however many cores there are
+PARALLEL_WORKERS = int(os.environ.get("WHISPER_PARALLEL_WORKERS", 0)) or min(2, os.cpu_count() or 1)
+CHUNK_MAX_SECONDS = float(os.environ.get("WHISPER_CHUNK_MAX_SECONDS", 60))
+
+# State of a pool worker process: its own warm copy of the model.
+_worker_model = None
+
+
+def _init_worker(model_size: str, loader: Optional[Callable], threads: int):
+    global _worker_model
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_model = (loader or _load_whisper)(model_size)
+
+
+def _transcribe_chunk(chunk: np.ndarray, options: dict) -> dict:
+    return _worker_model.transcribe(chunk, **options)
+
+
+def _ping(delay: float) -> int:
+    time.sleep(delay)
+    return os.getpid()
+
+
+class ParallelTranscriber:
+    """
+    Transcribes long recordings by splitting them at pauses (see vad.py) and
+    running the chunks on a pool of worker processes, each holding its own
+    warm Whisper model. Segment timestamps are shifted back onto the original
+    timeline and the text is stitched together in order.
+
+    Every worker keeps a full copy of the model, outside the shared
+    registry's WHISPER_REGISTRY_MAX_BYTES, so memory grows with `workers`
+    (default at most 2; WHISPER_PARALLEL_WORKERS raises it). Torch threads
+    are divided between the workers so they do not oversubscribe the CPU.
+    """
+
+    def __init__(self, model_size: str = "base", workers: int = PARALLEL_WORKERS,
+                 loader: Optional[Callable] = None, chunk_max_seconds: float = CHUNK_MAX_SECONDS):
+        self.model_size = model_size
+        self.workers = workers
+        self.chunk_max_seconds = chunk_max_seconds
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        # spawn, not fork: forking a process that already runs torch threads can deadlock.
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_size, loader, threads),
+        )
+
+    def warm(self):
+        """Start every worker and load its model before the first request."""
+        pids = set()
+        while len(pids) < self.workers:
+            pids.update(self._pool.map(_ping, [0.1] * self.workers))
+
+    def transcribe(self, audio: np.ndarray, sr: int = SAMPLE_RATE, **options) -> dict:
+        """
+        Whisper-style result ({"text", "segments", "language"}) for `audio`.
+        Chunks without any detected speech are skipped.
+        """
+        chunks = split_on_silence(audio, sr, max_seconds=self.chunk_max_seconds)
+        spoken = [(start, end) for start, end, has_speech in chunks if has_speech]
+        print(f"ParallelTranscriber: {len(spoken)} chunks ({len(chunks) - len(spoken)} silent) "
+              f"across {self.workers} workers")
+
+        futures = [self._pool.submit(_transcribe_chunk, audio[start:end], options) for start, end in spoken]
+        return stitch([(start / sr, future.result()) for (start, _), future in zip(spoken, futures)])
+
+    def shutdown(self):
+        self._pool.shutdown()
+
+
+def stitch(results) -> dict:
+    """Join (offset_seconds, whisper_result) pairs into one result on the original timeline."""
+    texts, segments, language = [], [], None
+    for offset, result in results:
+        text = result.get("text", "").strip()
+        if text:
+            texts.append(text)
+        language = language or result.get("language")
+        for segment in result.get("segments", []):
+            segment = dict(segment, id=len(segments))
+            segment["start"] = round(segment["start"] + offset, 3)
+            segment["end"] = round(segment["end"] + offset, 3)
+            if segment.get("words"):
+                segment["words"] = [dict(w, start=round(w["start"] + offset, 3), end=round(w["end"] + offset, 3))
+                                    for w in segment["words"]]
+            segments.append(segment)
+    return {"text": " ".join(texts), "segments": segments, "language": language}
+
+
+_transcribers: Dict[Tuple[str, int], ParallelTranscriber] = {}
+_transcribers_lock = threading.Lock()
+
+
+def get_transcriber(model_size: str = "base", workers: int = PARALLEL_WORKERS) -> ParallelTranscriber:
+    """Process-wide transcriber per (model_size, workers), so its workers stay warm across requests."""
+    with _transcribers_lock:
+        transcriber = _transcribers.get((model_size, workers))
+        if transcriber is None:
+            # Workers load their models the same way the shared registry does
+            transcriber = _transcribers[(model_size, workers)] = ParallelTranscriber(
+                model_size, workers, loader=get_registry().loader)
+        return transcriber
+
+
+def is_long_audio(audio: np.ndarray, sr: int = SAMPLE_RATE) -> bool:
+    return PARALLEL_WORKERS > 1 and duration_seconds(audio, sr) >= LONG_AUDIO_SECONDS
+
+
+def transcribe_long(audio: np.ndarray, model_size: str = "base", **options) -> dict:
+    """Shortcut for `get_transcriber(model_size).transcribe(audio)`."""
+    return get_transcriber(model_size).transcribe(audio, **options)
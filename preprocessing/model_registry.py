@@ -0,0 +1,170 @@
+# ==============================
+# model_registry.py
+# ==============================
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from preprocessing.telemetry import cache_lookup, span
+
+# Approximate fp32 footprint of each published Whisper checkpoint. Used to make
+# room *before* a load so the ceiling is respected even while a model loads.
+ESTIMATED_MODEL_BYTES = {
+    "tiny": 39_000_000 * 4,
+    "base": 74_000_000 * 4,
+    "small": 244_000_000 * 4,
+    "medium": 769_000_000 * 4,
+    "large": 1_550_000_000 * 4,
+    "turbo": 809_000_000 * 4,
+}
+
+DEFAULT_MAX_BYTES = int(os.environ.get("WHISPER_REGISTRY_MAX_BYTES", 2 * 1024 ** 3))
+
+
+def _load_whisper(model_key: str):
+    """Load "size" or "size:backend" with the backend's loader (see transcribers.py)."""
+    from preprocessing.transcribers import load_model
+    return load_model(model_key)
+
+
+def estimated_bytes(model_key: str) -> int:
+    """
+    Published fp32 footprint of the model's size. Quantized backends are
+    loaded at full precision first, so this is their peak as well.
+    """
+    return ESTIMATED_MODEL_BYTES.get(model_key.partition(":")[0], 0)
+
+
+def model_nbytes(model) -> int:
+    """Bytes held by a model's weights and buffers, packed int8 weights included (0 if not a torch module)."""
+    state_dict = getattr(model, "state_dict", None)
+    if state_dict is None:
+        return 0
+    total = 0
+    for value in state_dict().values():
+        # Dynamically quantized layers store (weight, bias) as one packed tuple
+        for t in value if isinstance(value, tuple) else (value,):
+            if hasattr(t, "element_size"):
+                total += t.numel() * t.element_size()
+    return total
+
+
+class WhisperModelRegistry:
+    """
+    Keeps loaded Whisper models warm across requests.
+
+    Models are keyed by size, optionally with a backend ("base:int8", see
+    transcribers.py). Each key is loaded at most once and shared by every caller. When the
+    resident models exceed `max_bytes`, the least recently used sizes are
+    evicted. Requests already holding an evicted model keep using it; it is
+    freed once they drop their reference.
+
+    Whisper's decoder installs its KV-cache hooks on the shared modules for the
+    duration of a decode, so two threads must not run inference on the same
+    model at once. Hold `inference_lock(model_size)` around `transcribe`.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, loader: Optional[Callable] = None):
+        self.max_bytes = max_bytes
+        self.loader = loader or _load_whisper
+        self._models: "OrderedDict[str, object]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._inference_locks: Dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, model_size: str = "base"):
+        """Return the model for `model_size`, loading it on first use."""
+        with self._lock:
+            model = self._models.get(model_size)
+            if model is not None:
+                self._models.move_to_end(model_size)
+                self.hits += 1
+                cache_lookup("whisper_model", True)
+                return model
+            load_lock = self._load_locks.setdefault(model_size, threading.Lock())
+
+        # Load outside the registry lock so other sizes stay available, but
+        # serialise loads of the same size so it is only read from disk once.
+        with load_lock:
+            with self._lock:
+                model = self._models.get(model_size)
+                if model is not None:
+                    self._models.move_to_end(model_size)
+                    self.hits += 1
+                    cache_lookup("whisper_model", True)
+                    return model
+                self.misses += 1
+                cache_lookup("whisper_model", False)
+                self._evict(estimated_bytes(model_size))
+
+            print(f"WhisperModelRegistry: loading '{model_size}' model...")
+            with span("whisper_load", purpose=model_size):
+                model = self.loader(model_size)
+
+            with self._lock:
+                self._models[model_size] = model
+                self._sizes[model_size] = model_nbytes(model) or estimated_bytes(model_size)
+                self._evict(0, keep=model_size)
+            return model
+
+    def inference_lock(self, model_size: str = "base") -> threading.Lock:
+        """Lock serialising inference on the shared `model_size` model."""
+        with self._lock:
+            return self._inference_locks.setdefault(model_size, threading.Lock())
+
+    def _evict(self, incoming_bytes: int, keep: Optional[str] = None):
+        """Drop LRU models until `incoming_bytes` more would fit. Caller holds the lock."""
+        while self._models and self.resident_bytes() + incoming_bytes > self.max_bytes:
+            lru = next(iter(self._models))
+            if lru == keep:
+                break
+            del self._models[lru]
+            self._sizes.pop(lru, None)
+            self.evictions += 1
+            print(f"WhisperModelRegistry: evicted '{lru}' model")
+
+    def resident_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def loaded_sizes(self):
+        with self._lock:
+            return list(self._models)
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._sizes.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": list(self._models),
+                "resident_bytes": self.resident_bytes(),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_registry = WhisperModelRegistry()
+
+
+def get_registry() -> WhisperModelRegistry:
+    return _registry
+
+
+def get_model(model_size: str = "base"):
+    """Shortcut for `get_registry().get(model_size)`."""
+    return _registry.get(model_size)
+
+
+def inference_lock(model_size: str = "base") -> threading.Lock:
+    """Shortcut for `get_registry().inference_lock(model_size)`."""
+    return _registry.inference_lock(model_size)
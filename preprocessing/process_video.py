@@ -2,103 +2,179 @@
 # process_video.py
 # ==============================
 
-import re
-import whisper
-import soundfile as sf
-import numpy as np
-from pathlib import Path
-from moviepy import VideoFileClip
-import librosa
-
 from models.text_encoder import TextEncoder
 from models.audio_encoder import AudioEncoder
+from models.prosody import words_per_minute
+from models.video_encoder import VideoEncoder
+from preprocessing.audio_ingest import load_audio, duration_seconds, is_audio_only
+from preprocessing.fillers import count_fillers, find_fillers, words_from_result
+from preprocessing.long_audio import is_long_audio, transcribe_long
+from preprocessing.model_registry import get_model, inference_lock
+from preprocessing.stage_graph import StageGraph
+from preprocessing.telemetry import set_media_seconds, span
+from preprocessing.transcribers import model_key
+from preprocessing.whisper_batcher import BATCHING, get_batcher
+
+# Graph stages whose results are worth showing before the whole analysis is done
+STREAMED_STAGES = ("context", "text_grades", "examples", "prosody", "body_language", "audio_grades")
+
+
+def send_to_encoders(transcript, word_count, wpm, audio_file, audio=None, segments=None, fillers=None,
+                     on_stage=None):
+    """
+    Run the text and audio encoder stages as a dependency graph so that
+    independent Gemini / YouTube calls overlap, and local prosody analysis
+    runs while they are in flight:
+
+        context ──┬── examples
+                  └── keywords ── reference_urls ── reference_audio ─┐
+        text_grades ─────────────────────────────────────────────────┼── audio_grades
+        prosody ─────────────────────────────────────────────────────┤
+        body_language (video uploads only) ──────────────────────────┘
 
-def send_to_encoders(word_count, wpm, audio_file):
+    In fused mode (TEXT_ENCODER_FUSED), context, text_grades and examples all
+    come from one Gemini call, which the keyword search then waits for.
+
+    If given, `on_stage(name, result)` is called as each of STREAMED_STAGES
+    finishes.
+    """
     text_encoder = TextEncoder()
-    print("Reading transcripts...")
-    text_grades, context, examples = text_encoder.encode_and_contextualize("preprocessing/transcript.txt", word_count, wpm, "can_take_input_from_user")
-    print("Extracting text features...")
-    print(text_grades)
-    print(context)
-    print(examples)
-    
-
-    audio_encoder = AudioEncoder(text_grades, context, audio_file)
-    audio_grades = audio_encoder.encode_and_contextualize()
-    print("Context ", context)  
+    text_encoder.transcript = transcript
+    speech_purpose = "can_take_input_from_user"
+
+    audio_encoder = AudioEncoder(None, None, audio_file, user_audio=audio, segments=segments, fillers=fillers)
+
+    def grade_audio(text_grades, reference_audio, _prosody, body_language=None):
+        audio_encoder.text_scores = text_grades
+        grades = audio_encoder.grade_audio(reference_audio)
+        if body_language is not None:
+            grades["body_language"] = body_language
+        return grades
+
+    graph = StageGraph()
+    if text_encoder.fused:
+        graph.add("text_analysis", lambda: text_encoder.analyze_transcript(word_count, wpm, speech_purpose))
+        graph.add("text_grades", lambda analysis: analysis[0], deps=["text_analysis"])
+        graph.add("context", lambda analysis: analysis[1], deps=["text_analysis"])
+        graph.add("examples", lambda analysis: analysis[2], deps=["text_analysis"])
+    else:
+        graph.add("context", lambda: text_encoder.extract_context(speech_purpose))
+        graph.add("text_grades", lambda: text_encoder.grade_transcript(word_count, wpm))
+        graph.add("examples", lambda _context: text_encoder.retrieve_examples(), deps=["context"])
+    graph.add("prosody", audio_encoder.analyze_delivery)
+    graph.add("keywords", audio_encoder._generate_keywords, deps=["context"])
+    graph.add("reference_urls", audio_encoder.search_keywords, deps=["keywords"])
+    graph.add("reference_audio", audio_encoder.download_reference_audio, deps=["reference_urls"])
+    def body_language():
+        try:
+            return VideoEncoder().features(audio_file)
+        except Exception as e:
+            print(f"Warning: body-language analysis failed, grading without it: {e}")
+            return None
+
+    grade_deps = ["text_grades", "reference_audio", "prosody"]
+    if not is_audio_only(audio_file):
+        graph.add("body_language", body_language)
+        grade_deps.append("body_language")
+    graph.add("audio_grades", grade_audio, deps=grade_deps)
+
+    def report(name, result):
+        if on_stage is not None and name in STREAMED_STAGES:
+            on_stage(name, result)
+
+    results = graph.run(on_result=report)
+
+    for name, (start, end) in graph.timings.items():
+        print(f"Stage {name}: {end - start:.2f}s")
+    audio_grades, text_grades = results["audio_grades"], results["text_grades"]
+    context, examples = results["context"], results["examples"]
+    print("Context ", context)
     print("Getting Audio grades ", audio_grades)
     print("Sent to encoders successfully.")
     return audio_grades, text_grades, context, examples
 
-    
 
-def process_video(input_video: str, model_size: str = "base") -> str:
+
+def process_video(input_video: str, model_size: str = "base", on_stage=None) -> tuple:
     """
-    Process a video file: extract audio, transcribe with Whisper,
-    analyze speech, and save transcript to preprocessing/transcript.txt
+    Process a video or audio file: decode its audio once to 16 kHz mono,
+    transcribe with Whisper, analyze speech, and grade it. Intermediates stay
+    in memory, so concurrent calls never share files.
 
     Args:
-        input_video (str): Path to the input video file (e.g., .mp4)
-        model_size (str): Whisper model size ("tiny", "base", "small", etc.)
+        input_video (str): Path to the input video (e.g., .mp4) or audio file
+        model_size (str): Whisper model size ("tiny", "base", "small", etc.), optionally
+            with a backend ("base:int8"); WHISPER_BACKEND applies otherwise
+        on_stage (callable, optional): Called as on_stage(name, result) as soon as
+            each stage result exists: "transcript", "fillers" and "wpm" right
+            after Whisper, then the STREAMED_STAGES of send_to_encoders
 
     Returns:
-        str: Path to the saved transcript file
+        tuple: (audio_grades, text_grades, context, examples)
     """
-    audio_file = Path(input_video).resolve().with_suffix(".wav").resolve()
+    model_size = model_key(model_size)
 
-    # --- Extract audio ---
+    # --- Decode audio once, at Whisper's 16 kHz mono, into memory ---
     print(f"Extracting audio from {input_video} ...")
-    audio_clip = VideoFileClip(input_video).audio
-    audio_clip.write_audiofile(
-    str(audio_file),
-    codec="pcm_s16le",  # safe WAV codec
-    fps=44100,
-    logger=None
-)
-
-    audio_clip.close()
-    print(f"Audio saved to {audio_file}")
-
-    if not Path(audio_file).exists():
-        raise FileNotFoundError(f"File not found: {audio_file}")
-
-    # --- Load audio & preprocess for Whisper ---
-    data, samplerate = sf.read(audio_file)
-    if len(data.shape) > 1:
-        data = data.mean(axis=1)  # convert to mono
-
-    print("Loading Whisper model...")
-    model = whisper.load_model(model_size)
-
-    print(f"Transcribing {audio_file} ...")
-    result = model.transcribe(str(audio_file))
+    with span("audio_extraction"):
+        audio = load_audio(input_video)
+    set_media_seconds(duration_seconds(audio))
+    print(f"Decoded {duration_seconds(audio):.1f}s of audio")
+
+    if is_long_audio(audio):
+        # Long recordings: split at pauses and transcribe the chunks in parallel
+        print(f"Transcribing {input_video} in parallel chunks ...")
+        with span("transcription", purpose="chunked", model=model_size):
+            result = transcribe_long(audio, model_size, word_timestamps=True)
+    elif BATCHING:
+        # Windows of concurrent jobs share batched forward passes
+        print(f"Transcribing {input_video} on the shared batching service ...")
+        with span("transcription", purpose="batched", model=model_size):
+            result = get_batcher(model_size).transcribe(audio, word_timestamps=True)
+    else:
+        print("Loading Whisper model...")
+        model = get_model(model_size)
+
+        print(f"Transcribing {input_video} ...")
+        with inference_lock(model_size), span("transcription", purpose="single", model=model_size):
+            result = model.transcribe(audio, word_timestamps=True)
     transcript = result["text"]
 
 
     print("\n📝 Transcript:\n", transcript)
-
-    # --- Save transcript ---
-    output_file = Path(__file__).parent / "transcript.txt"
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write(transcript)
-    print(f"\n💾 Transcript saved to {output_file}")
+    duration_sec = duration_seconds(audio)
+    if on_stage is not None:
+        on_stage("transcript", {"transcript": transcript, "duration_seconds": round(duration_sec, 2)})
 
     # --- Analyze speech ---
-    fillers = ["um", "uh", "like", "you know", "so"]
-    filler_counts = {
-        f: len(re.findall(rf"\b{f}\b", transcript, flags=re.IGNORECASE))
-        for f in fillers
-    }
+    fillers = find_fillers(words_from_result(result))
+    filler_counts = count_fillers(fillers)
 
     print("\n⚠️ Filler Word Counts:")
     for f, count in filler_counts.items():
         print(f"{f}: {count}")
+    if on_stage is not None:
+        on_stage("fillers", {"filler_counts": filler_counts, "filler_word_instances": fillers})
 
-    duration_sec = len(data) / samplerate
     word_count = len(transcript.split())
     print(word_count)
-    wpm = word_count / (duration_sec / 60)
+    wpm = words_per_minute(word_count, duration_sec)
     print(wpm)
     print(f"\n⏱️ Speaking Speed: {wpm:.2f} words per minute")
-
-    return send_to_encoders(word_count, wpm, audio_file)
+    if on_stage is not None:
+        on_stage("wpm", {"word_count": word_count, "words_per_minute": round(wpm, 2)})
+
+    return send_to_encoders(transcript, word_count, wpm, input_video, audio, result.get("segments"), fillers,
+                            on_stage=on_stage)
+
+
+def analyze_recording(input_video: str, model_size: str = "base", on_stage=None) -> dict:
+    """`process_video` shaped as the API (and batch output) returns it."""
+    audio_grades, text_grades, context, examples = process_video(input_video, model_size=model_size,
+                                                                 on_stage=on_stage)
+    return {
+        "audio_grades": audio_grades,
+        "text_grades": text_grades,
+        "context": context,
+        "examples": examples
+    }
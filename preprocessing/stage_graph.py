@@ -0,0 +1,110 @@
+# ==============================
+# stage_graph.py
+# ==============================
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterable, Optional
+
+from preprocessing.telemetry import in_context, span
+
+
+class StageError(Exception):
+    """Raised when a stage fails; wraps the original exception."""
+
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class StageGraph:
+    """
+    Minimal dependency-graph executor for pipeline stages.
+
+    Each stage is a callable that receives the results of its dependencies as
+    positional arguments, in the order they were declared. A stage is started
+    on the thread pool as soon as all of its dependencies have finished, so
+    independent network calls overlap and end-to-end latency follows the
+    critical path rather than the sum of all stages. Each stage runs in the
+    caller's request context and is timed as a "stage" span.
+
+    Example:
+        graph = StageGraph()
+        graph.add("context", extract_context)
+        graph.add("examples", retrieve_examples, deps=["context"])
+        results = graph.run()
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self._stages: Dict[str, Callable] = {}
+        self._deps: Dict[str, tuple] = {}
+        self.timings: Dict[str, tuple] = {}  # name -> (start, end) from time.perf_counter()
+
+    def add(self, name: str, fn: Callable, deps: Iterable[str] = ()):
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        self._stages[name] = fn
+        self._deps[name] = tuple(deps)
+
+    def _validate(self):
+        for name, deps in self._deps.items():
+            for dep in deps:
+                if dep not in self._stages:
+                    raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        # Kahn's algorithm: every stage must be reachable from the roots
+        remaining = {name: len(deps) for name, deps in self._deps.items()}
+        ready = [name for name, n in remaining.items() if n == 0]
+        seen = 0
+        while ready:
+            name = ready.pop()
+            seen += 1
+            for other, deps in self._deps.items():
+                if name in deps:
+                    remaining[other] -= 1
+                    if remaining[other] == 0:
+                        ready.append(other)
+        if seen != len(self._stages):
+            raise ValueError("Stage graph contains a cycle")
+
+    def _run_stage(self, name: str, args: list):
+        start = time.perf_counter()
+        try:
+            with span("stage", purpose=name):
+                return self._stages[name](*args)
+        finally:
+            self.timings[name] = (start, time.perf_counter())
+
+    def run(self, on_result: Optional[Callable[[str, object], None]] = None) -> Dict[str, object]:
+        """
+        Run every stage and return a dict of stage name -> result.
+
+        Args:
+            on_result: Called as `on_result(name, result)` on the calling thread
+                as soon as each stage finishes, e.g. to stream partial results.
+        """
+        self._validate()
+        results: Dict[str, object] = {}
+        pending = dict(self._deps)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers or max(1, len(self._stages))) as pool:
+            while pending or running:
+                for name in [n for n, deps in pending.items() if all(d in results for d in deps)]:
+                    args = [results[d] for d in pending.pop(name)]
+                    running[pool.submit(in_context(self._run_stage), name, args)] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        # Let stages already in flight finish, start nothing new
+                        for other in running:
+                            other.cancel()
+                        raise StageError(name, e) from e
+                    if on_result is not None:
+                        on_result(name, results[name])
+        return results
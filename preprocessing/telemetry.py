@@ -0,0 +1,289 @@
+# ==============================
+# telemetry.py
+# ==============================
+"""
+Timing spans and Prometheus metrics.
+
+Wrap each unit of work in `span(name, purpose)`. Its duration goes into the
+speakeasy_span_seconds histogram, labelled by span, purpose and a coarse
+media-length bucket; failures also count in speakeasy_span_failures_total.
+Inside a `request_context` (one per job), every span is also recorded on the
+context, tagged with the request ID and media duration, and printed as a
+structured "[span] {...}" line.
+
+The request context is a contextvar. Thread pools do not inherit it, so
+work submitted to a pool should run in `contextvars.copy_context().run`.
+
+`render()` returns every metric in the Prometheus text exposition format,
+for the /metrics endpoint.
+"""
+
+import contextvars
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+LOG_SPANS = os.environ.get("SPEAKEASY_LOG_SPANS", "1").lower() not in ("0", "false", "no")
+# Seconds; spans run from milliseconds (cache lookups) to many minutes (long transcriptions)
+DEFAULT_BUCKETS = (0.005, 0.025, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+# Media-length label values, so stage times can be compared across similar recordings
+MEDIA_BUCKETS = ((60, "<1m"), (300, "1-5m"), (900, "5-15m"), (3600, "15-60m"), (math.inf, ">60m"))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.label_names, k)} {v:g}" for k, v in items]
+
+
+_LE_INF = 'le="+Inf"'
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            i = bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[-1] if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = self.header()
+        for key, series in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                le = 'le="%g"' % bound
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, key, _LE_INF)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {series[-1]}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Value read from a callback at scrape time (e.g. jobs in flight)."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, read: Callable[[], float]):
+        super().__init__(name, help)
+        self.read = read
+
+    def render(self) -> List[str]:
+        try:
+            value = float(self.read())
+        except Exception as e:
+            print(f"Warning: gauge {self.name} failed: {e}")
+            return []
+        return self.header() + [f"{self.name} {value:g}"]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None and type(existing) is type(metric) and not isinstance(metric, Gauge):
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name: str, help: str, read: Callable[[], float]) -> Gauge:
+        """Register (or replace) a gauge read by `read()` at scrape time."""
+        return self._add(Gauge(name, help, read))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+SPAN_SECONDS = registry.histogram(
+    "speakeasy_span_seconds", "Duration of pipeline spans.", ("span", "purpose", "media"))
+SPAN_FAILURES = registry.counter(
+    "speakeasy_span_failures_total", "Spans that raised.", ("span", "purpose"))
+CACHE_LOOKUPS = registry.counter(
+    "speakeasy_cache_lookups_total", "Cache lookups by cache and result (hit or miss).", ("cache", "result"))
+MEDIA_SECONDS = registry.histogram(
+    "speakeasy_media_seconds", "Duration of analysed recordings.",
+    buckets=(10, 30, 60, 120, 300, 600, 900, 1800, 3600, 7200))
+
+
+class RequestContext:
+    """Tags and finished spans of one request (job)."""
+
+    def __init__(self, request_id: str, media_seconds: Optional[float] = None):
+        self.request_id = request_id
+        self.media_seconds = media_seconds
+        self.spans: List[dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, record: dict):
+        with self._lock:
+            self.spans.append(record)
+
+    def summary(self) -> List[dict]:
+        with self._lock:
+            return list(self.spans)
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("speakeasy_request", default=None)
+
+
+def current_request() -> Optional[RequestContext]:
+    return _current.get()
+
+
+@contextmanager
+def request_context(request_id: str, media_seconds: Optional[float] = None):
+    """Tag every span in this block (and in work copied from its context) with `request_id`."""
+    ctx = RequestContext(request_id, media_seconds)
+    token = _current.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _current.reset(token)
+
+
+def in_context(fn: Callable) -> Callable:
+    """
+    Bind `fn` to the caller's context, for submitting to a thread pool: each
+    call runs in its own copy, so concurrent calls share the request but can
+    never set variables for one another.
+    """
+    ctx = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return ctx.copy().run(fn, *args, **kwargs)
+    return run
+
+
+def set_media_seconds(seconds: float):
+    """Record the current request's media duration, once it is known."""
+    MEDIA_SECONDS.observe(seconds)
+    ctx = _current.get()
+    if ctx is not None:
+        ctx.media_seconds = round(seconds, 2)
+
+
+def media_bucket(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "unknown"
+    return next(label for bound, label in MEDIA_BUCKETS if seconds < bound)
+
+
+@contextmanager
+def span(name: str, purpose: str = "", **tags):
+    """
+    Time the block as span `name`. `purpose` tells apart spans of the same
+    kind (which Gemini prompt, which graph stage) and is a metric label, so
+    keep it low-cardinality; `tags` (URLs, sizes) only go to the span record.
+    The block can add tags known only at its end to the dict it is given.
+    """
+    start = time.perf_counter()
+    ok = True
+    try:
+        yield tags
+    except BaseException:
+        ok = False
+        SPAN_FAILURES.inc(span=name, purpose=purpose)
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        ctx = _current.get()
+        media = ctx.media_seconds if ctx is not None else None
+        SPAN_SECONDS.observe(seconds, span=name, purpose=purpose, media=media_bucket(media))
+        if ctx is not None:
+            record = {"span": name, "purpose": purpose, "seconds": round(seconds, 4), "ok": ok,
+                      "request_id": ctx.request_id, "media_seconds": media}
+            record.update(tags)
+            ctx.add(record)
+            if LOG_SPANS:
+                print(f"[span] {json.dumps(record, default=str)}")
+
+
+def cache_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def render() -> str:
+    return registry.render()
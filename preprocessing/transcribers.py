@@ -0,0 +1,101 @@
+# ==============================
+# transcribers.py
+# ==============================
+"""
+Selectable transcription backends.
+
+Everything downstream of process_video transcribes through one interface:
+an object with Whisper's `transcribe(audio, **options)` returning
+{"text", "segments", "language"}. A backend is a loader that builds such an
+object for a model size:
+
+    reference   openai-whisper at full fp32 precision (the default)
+    int8        the same checkpoint with its Linear layers dynamically
+                quantized to int8, for faster, smaller CPU inference
+
+Models are named by key, "size" or "size:backend" (e.g. "base:int8"). The
+shared registry caches models by key, so the long-audio workers, the batcher
+and batch results all keep backends apart. WHISPER_BACKEND selects the
+backend for sizes given without one. `python benchmarks/transcriber_bench.py`
+compares backends for speed, memory and word error rate.
+"""
+
+import os
+import warnings
+from typing import Callable, Dict, Optional, Tuple
+
+REFERENCE = "reference"
+INT8 = "int8"
+
+DEFAULT_BACKEND = os.environ.get("WHISPER_BACKEND", REFERENCE)
+
+
+def load_reference(model_size: str):
+    import whisper
+    return whisper.load_model(model_size)
+
+
+def quantize_int8(model):
+    """
+    Quantize every Linear layer of a Whisper model to int8, in place.
+
+    Weights are stored as int8 and activations are quantized on the fly, per
+    batch. The convolutional front end, embeddings and layer norms stay fp32.
+    Quantized kernels only run on CPU.
+    """
+    import torch
+    from torch.ao.quantization import quantize_dynamic
+    from whisper.model import Linear
+
+    # whisper.model.Linear only overrides forward() to cast its weight to the
+    # input dtype (for fp16); quantize_dynamic only swaps exact nn.Linear.
+    for module in model.modules():
+        if type(module) is Linear:
+            module.__class__ = torch.nn.Linear
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # eager-mode quantization is deprecated upstream but still supported
+        return quantize_dynamic(model.cpu().eval(), {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def load_int8(model_size: str):
+    import whisper
+    return quantize_int8(whisper.load_model(model_size, device="cpu"))
+
+
+BACKENDS: Dict[str, Callable[[str], object]] = {
+    REFERENCE: load_reference,
+    INT8: load_int8,
+}
+
+
+def register_backend(name: str, loader: Callable[[str], object]):
+    """Make `loader(model_size)` available as backend `name`."""
+    BACKENDS[name] = loader
+
+
+def model_key(model_size: str, backend: Optional[str] = None) -> str:
+    """
+    Registry key for `model_size` on `backend` (default WHISPER_BACKEND).
+    Keys that already name a backend are returned unchanged.
+    """
+    if ":" in model_size:
+        return model_size
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown Whisper backend '{backend}'; choose from {sorted(BACKENDS)}")
+    return model_size if backend == REFERENCE else f"{model_size}:{backend}"
+
+
+def split_key(key: str) -> Tuple[str, str]:
+    """(model_size, backend) named by a registry key."""
+    model_size, _, backend = key.partition(":")
+    return model_size, backend or REFERENCE
+
+
+def load_model(key: str):
+    """Load the model named by `key` with its backend's loader."""
+    model_size, backend = split_key(key)
+    loader = BACKENDS.get(backend)
+    if loader is None:
+        raise ValueError(f"Unknown Whisper backend '{backend}'; choose from {sorted(BACKENDS)}")
+    return loader(model_size)
@@ -0,0 +1,92 @@
+# ==============================
+# vad.py
+# ==============================
+
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from preprocessing.audio_ingest import SAMPLE_RATE
+
+FRAME_MS = 30
+MIN_SILENCE_MS = int(os.environ.get("VAD_MIN_SILENCE_MS", 300))
+# A frame is speech if it is this far above the recording's noise floor...
+MARGIN_DB = float(os.environ.get("VAD_MARGIN_DB", 10.0))
+# ...and never if it is quieter than this, however quiet the floor is.
+ABSOLUTE_FLOOR_DB = -60.0
+
+
+def frame_energy_db(audio: np.ndarray, sr: int = SAMPLE_RATE, frame_ms: int = FRAME_MS) -> np.ndarray:
+    """Mean power of each non-overlapping `frame_ms` frame, in dBFS."""
+    frame = int(sr * frame_ms / 1000)
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return np.empty(0, dtype=np.float32)
+    frames = audio[:n_frames * frame].reshape(n_frames, frame)
+    power = np.einsum("ij,ij->i", frames, frames, dtype=np.float64) / frame
+    return (10.0 * np.log10(power + 1e-10)).astype(np.float32)
+
+
+def speech_frames(audio: np.ndarray, sr: int = SAMPLE_RATE, frame_ms: int = FRAME_MS,
+                  threshold_db: Optional[float] = None) -> np.ndarray:
+    """
+    Boolean speech mask, one entry per frame. Without `threshold_db` the
+    threshold adapts to the recording: MARGIN_DB above its 10th-percentile
+    frame energy, so room tone and mic hiss count as silence, but never
+    within MARGIN_DB of its loudest frames.
+    """
+    energy = frame_energy_db(audio, sr, frame_ms)
+    if threshold_db is None:
+        if energy.size == 0:
+            return np.zeros(0, dtype=bool)
+        floor, loud = np.percentile(energy, [10, 95])
+        # Capped below the loud frames, so a recording with no pauses at all is all speech
+        threshold_db = max(min(floor + MARGIN_DB, loud - MARGIN_DB), ABSOLUTE_FLOOR_DB)
+    return energy > threshold_db
+
+
+def silence_runs(mask: np.ndarray, min_frames: int = 1) -> np.ndarray:
+    """(start, end) frame indices of each run of non-speech at least `min_frames` long."""
+    edges = np.diff(np.concatenate(([0], (~mask).astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    keep = ends - starts >= min_frames
+    return np.stack((starts[keep], ends[keep]), axis=1)
+
+
+def split_on_silence(audio: np.ndarray, sr: int = SAMPLE_RATE, max_seconds: float = 60.0,
+                     min_seconds: float = 10.0, min_silence_ms: int = MIN_SILENCE_MS,
+                     frame_ms: int = FRAME_MS) -> List[Tuple[int, int, bool]]:
+    """
+    Split `audio` into chunks of at most `max_seconds`, cutting in the middle
+    of pauses so no word is split across chunks.
+
+    Each chunk ends at the last pause of at least `min_silence_ms` that falls
+    between `min_seconds` and `max_seconds` after its start; if there is no
+    such pause it is cut hard at `max_seconds`.
+
+    Returns:
+        list: (start_sample, end_sample, has_speech) for each chunk, covering
+        the whole recording in order.
+    """
+    if len(audio) == 0:
+        return []
+    frame = int(sr * frame_ms / 1000)
+    mask = speech_frames(audio, sr, frame_ms)
+    runs = silence_runs(mask, max(1, min_silence_ms // frame_ms))
+    cuts = (runs.sum(axis=1) // 2) * frame  # middle of each pause, in samples
+
+    max_len, min_len = int(max_seconds * sr), int(min_seconds * sr)
+    bounds = [0]
+    while len(audio) - bounds[-1] > max_len:
+        start = bounds[-1]
+        lo, hi = np.searchsorted(cuts, [start + min_len, start + max_len], side="right")
+        bounds.append(int(cuts[hi - 1]) if hi > lo else start + max_len)
+    bounds.append(len(audio))
+
+    chunks = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        has_speech = bool(mask[start // frame:-(-end // frame)].any())
+        chunks.append((start, end, has_speech))
+    return chunks
@@ -0,0 +1,109 @@
+# ==============================
+# warmup.py
+# ==============================
+"""
+Explicit warm-up for server workers.
+
+Importing app.py loads none of the heavy dependencies (torch, Whisper,
+google.generativeai, yt_dlp, librosa); each one is imported on first use, so
+a worker starts in a fraction of a second. `warm_up()` pays those costs
+before the first request instead: it imports the modules, compiles the
+prosody pitch tracker's JIT kernels, and loads the Whisper models named in
+SPEAKEASY_WARMUP_MODELS into the shared registry, on a background thread so
+the worker can accept connections meanwhile.
+Call it once per worker process, e.g. from gunicorn's post_worker_init.
+"""
+
+import importlib
+import os
+import threading
+import time
+from typing import Iterable, Optional
+
+from preprocessing.model_registry import get_registry
+from preprocessing.transcribers import model_key
+from preprocessing.telemetry import span
+
+# Comma-separated Whisper sizes to load; "base" serves /process, "tiny" serves /live
+WARMUP_MODELS = tuple(s.strip() for s in os.environ.get("SPEAKEASY_WARMUP_MODELS", "base").split(",") if s.strip())
+# Imported lazily by the pipeline; none of them may be imported by `import app`
+HEAVY_MODULES = ("torch", "whisper", "google.generativeai", "yt_dlp", "requests", "librosa")
+
+IDLE = "idle"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+_status = {"state": IDLE, "models": [], "modules": [], "prosody": False, "seconds": None, "error": None}
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def _warm_prosody():
+    """JIT-compile the pitch tracker; a failure only costs the first request the compile time."""
+    from models.prosody import warm_up_pitch
+    try:
+        with span("warmup_prosody"):
+            warm_up_pitch()
+        _status["prosody"] = True
+    except Exception as e:
+        print(f"Warm-up: could not compile the prosody kernels: {e}")
+
+
+def _warm(model_sizes: Iterable[str], modules: Iterable[str], registry, prosody: bool = True):
+    start = time.perf_counter()
+    try:
+        for name in modules:
+            with span("warmup_import", purpose=name):
+                try:
+                    importlib.import_module(name)
+                except ImportError as e:
+                    print(f"Warm-up: could not import {name}: {e}")
+                    continue
+            _status["modules"].append(name)
+        if prosody:
+            _warm_prosody()
+        for size in model_sizes:
+            registry.get(model_key(size))
+            _status["models"].append(size)
+        _status["state"] = READY
+    except Exception as e:
+        print(f"Warning: warm-up failed, models will load on first request: {e}")
+        _status["state"], _status["error"] = FAILED, str(e)
+    _status["seconds"] = round(time.perf_counter() - start, 2)
+    print(f"Warm-up {_status['state']} in {_status['seconds']:.1f}s "
+          f"(models: {_status['models'] or 'none'})")
+
+
+def warm_up(model_sizes: Iterable[str] = WARMUP_MODELS, modules: Iterable[str] = HEAVY_MODULES,
+            background: bool = True, registry=None, prosody: bool = True) -> Optional[threading.Thread]:
+    """
+    Import `modules`, compile the prosody kernels and load the Whisper
+    `model_sizes` into the registry. Only the first call does anything;
+    later calls return the same thread.
+
+    Args:
+        model_sizes: Whisper sizes to load, default SPEAKEASY_WARMUP_MODELS.
+        modules: Modules to import ahead of the first request.
+        background: Warm up on a daemon thread and return it, rather than
+            blocking until done (and returning None).
+        registry: Model registry to load into; defaults to the shared one.
+        prosody: JIT-compile the pitch tracker (models/prosody.py).
+    """
+    global _thread
+    with _lock:
+        if _status["state"] != IDLE:
+            return _thread
+        _status["state"] = WARMING
+        args = (tuple(model_sizes), tuple(modules), registry or get_registry(), prosody)
+        if background:
+            _thread = threading.Thread(target=_warm, args=args, name="speakeasy-warmup", daemon=True)
+            _thread.start()
+            return _thread
+    _warm(*args)
+    return None
+
+
+def warmup_status() -> dict:
+    """State (idle, warming, ready or failed), what was loaded, and how long it took."""
+    return dict(_status, models=list(_status["models"]), modules=list(_status["modules"]))
@@ -0,0 +1,365 @@
+# ==============================
+# whisper_batcher.py
+# ==============================
+"""
+Cross-request batching of Whisper inference.
+
+`model.transcribe` decodes one 30-second window at a time, and concurrent
+jobs take turns on the shared model (see model_registry.inference_lock). A
+WhisperBatcher instead runs one service thread per model size. Every job
+thread still walks its own recording window by window (mel spectrogram,
+seeking, segment and word-timestamp bookkeeping, all as in
+whisper.transcribe), but submits each window to the service. The service
+waits up to `max_wait` seconds for windows from other jobs, then decodes up
+to `max_batch` of them in one batched encoder and decoder pass and hands
+each result back to its job.
+
+Windows can share a batch only if they decode with the same language,
+temperature, prompt and best_of. Windows are therefore decoded as with
+condition_on_previous_text=False: an initial prompt applies to the first
+window only, and no window is conditioned on the previous window's text.
+Temperature fallback is per window, so one noisy window does not slow the
+rest of its batch. Word-timestamp alignment also runs on the service thread,
+one window at a time between batches, because it uses the shared model.
+
+Enabled with WHISPER_BATCHING=1 for short recordings in process_video
+(long recordings already run chunks in parallel, see long_audio.py).
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from preprocessing.audio_ingest import SAMPLE_RATE
+from preprocessing.model_registry import get_registry
+from preprocessing.telemetry import registry as metrics, span
+
+BATCHING = os.environ.get("WHISPER_BATCHING", "").lower() in ("1", "true", "yes")
+MAX_BATCH = int(os.environ.get("WHISPER_MAX_BATCH", 8))
+MAX_WAIT_SECONDS = float(os.environ.get("WHISPER_BATCH_WAIT_MS", 50)) / 1000
+
+# Decoding defaults of whisper.transcribe
+TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+BATCH_WINDOWS = metrics.histogram("speakeasy_whisper_batch_windows", "Windows per batched Whisper decode.",
+                                  buckets=(1, 2, 4, 8, 16, 32))
+
+
+class _Window:
+    """A 30 s mel window waiting for the service, and what it must share a batch with."""
+
+    def __init__(self, mel, key: Tuple):
+        self.mel = mel
+        self.key = key  # (language, temperature, prompt tokens, best_of)
+        self.future = Future()
+        self.queued_at = time.monotonic()
+
+
+class WhisperBatcher:
+    """
+    Shared transcription service for one model size. `transcribe` is safe to
+    call from any number of threads; see the module docstring.
+    """
+
+    def __init__(self, model_size: str = "base", max_batch: int = MAX_BATCH, max_wait: float = MAX_WAIT_SECONDS,
+                 registry=None, temperatures: Tuple[float, ...] = TEMPERATURES):
+        self.model_size = model_size
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.temperatures = temperatures
+        self.registry = registry or get_registry()
+        self.batches = 0
+        self.windows = 0
+        self._pending: List[_Window] = []
+        self._tasks = deque()  # (fn, future): other work on the model, run between batches
+        self._active = 0       # recordings being transcribed; no point waiting for more windows than that
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._serve, name=f"whisper-batcher-{model_size}", daemon=True)
+        self._thread.start()
+
+    # --- service thread ---
+
+    def _serve(self):
+        try:
+            while True:
+                with self._cond:
+                    while not (self._pending or self._tasks or self._closed):
+                        self._cond.wait()
+                    if self._tasks:
+                        work = self._tasks.popleft()
+                    elif self._pending:
+                        work = self._take_batch()
+                    else:
+                        return  # closed and drained
+                try:
+                    self._dispatch(work)
+                except Exception as e:
+                    # e.g. the model was evicted and failed to reload: fail this work, keep serving
+                    print(f"WhisperBatcher: {self.model_size} failed: {e}")
+                    for future in self._futures(work):
+                        if not future.done():
+                            future.set_exception(e)
+        finally:
+            # However the thread ends, nothing may wait on it any more
+            with self._cond:
+                self._closed = True
+                abandoned = [w.future for w in self._pending] + [future for _, future in self._tasks]
+                self._pending, self._tasks = [], deque()
+            for future in abandoned:
+                future.set_exception(RuntimeError("WhisperBatcher is shut down"))
+
+    def _dispatch(self, work):
+        model = self.registry.get(self.model_size)
+        with self.registry.inference_lock(self.model_size):
+            if isinstance(work, list):
+                self._run_batch(model, work)
+            else:
+                fn, future = work
+                try:
+                    future.set_result(fn(model))
+                except Exception as e:
+                    future.set_exception(e)
+
+    @staticmethod
+    def _futures(work) -> List[Future]:
+        return [w.future for w in work] if isinstance(work, list) else [work[1]]
+
+    def _take_batch(self) -> List[_Window]:
+        """Windows sharing the oldest window's options, once the batch is full or the wait is over. Holds the lock."""
+        oldest = self._pending[0]
+        deadline = oldest.queued_at + self.max_wait
+        while True:
+            batch = [w for w in self._pending if w.key == oldest.key][:self.max_batch]
+            remaining = deadline - time.monotonic()
+            if (len(batch) >= self.max_batch or len(self._pending) >= self._active or remaining <= 0
+                    or self._tasks or self._closed):
+                break
+            self._cond.wait(remaining)
+        taken = set(map(id, batch))
+        self._pending = [w for w in self._pending if id(w) not in taken]
+        return batch
+
+    def _run_batch(self, model, batch: List[_Window]):
+        import torch
+        from whisper.decoding import DecodingOptions
+
+        language, temperature, prompt, best_of = batch[0].key
+        fp16 = model.device.type == "cuda"
+        options = DecodingOptions(language=language, temperature=temperature, prompt=list(prompt) or None,
+                                  best_of=best_of, fp16=fp16)
+        try:
+            with span("whisper_batch", purpose=self.model_size, windows=len(batch)):
+                mel = torch.stack([w.mel for w in batch]).to(model.device)
+                results = model.decode(mel.half() if fp16 else mel, options)
+        except Exception as e:
+            for window in batch:
+                window.future.set_exception(e)
+            return
+        self.batches += 1
+        self.windows += len(batch)
+        BATCH_WINDOWS.observe(len(batch))
+        for window, result in zip(batch, results):
+            window.future.set_result(result)
+
+    # --- job threads ---
+
+    def _submit(self, mel, key: Tuple):
+        window = _Window(mel, key)
+        with self._cond:
+            if self.closed:
+                raise RuntimeError("WhisperBatcher is shut down")
+            self._pending.append(window)
+            self._cond.notify_all()
+        return window.future.result()
+
+    def run(self, fn: Callable):
+        """Run `fn(model)` on the service thread, between batches, and return its result."""
+        future = Future()
+        with self._cond:
+            if self.closed:
+                raise RuntimeError("WhisperBatcher is shut down")
+            self._tasks.append((fn, future))
+            self._cond.notify_all()
+        return future.result()
+
+    def decode(self, mel, language: Optional[str], prompt: Tuple[int, ...] = (), best_of: Optional[int] = None):
+        """
+        Decode one padded (n_mels, 3000) window, raising the temperature while
+        the result looks wrong. As in whisper.transcribe, `best_of` samples
+        are drawn at each non-zero temperature, and greedy decoding is used at 0.
+        """
+        result = None
+        for temperature in self.temperatures:
+            samples = best_of if temperature > 0 else None
+            result = self._submit(mel, (language, temperature, tuple(prompt), samples))
+            too_repetitive = result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+            too_unlikely = result.avg_logprob < LOGPROB_THRESHOLD
+            silence = result.no_speech_prob > NO_SPEECH_THRESHOLD and too_unlikely
+            if silence or not (too_repetitive or too_unlikely):
+                break
+        return result
+
+    def transcribe(self, audio: np.ndarray, word_timestamps: bool = False, language: Optional[str] = None,
+                   initial_prompt: Optional[str] = None, best_of: Optional[int] = None, **ignored) -> dict:
+        """
+        Whisper-style result ({"text", "segments", "language"}) for 16 kHz
+        `audio`. `best_of` is used at fallback temperatures, as by
+        whisper.transcribe (which leaves it unset unless given; its command
+        line passes 5). Other whisper.transcribe options are accepted and ignored.
+        """
+        with self._cond:
+            self._active += 1  # before the mel, so a faster recording waits for this one's first window
+        try:
+            return self._transcribe(audio, word_timestamps, language, initial_prompt, best_of)
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def _transcribe(self, audio: np.ndarray, word_timestamps: bool, language: Optional[str],
+                    initial_prompt: Optional[str], best_of: Optional[int] = None) -> dict:
+        from whisper.audio import FRAMES_PER_SECOND, HOP_LENGTH, N_FRAMES, N_SAMPLES, log_mel_spectrogram, pad_or_trim
+        from whisper.timing import add_word_timestamps
+        from whisper.tokenizer import get_tokenizer
+        from whisper.utils import get_end
+
+        model = self.registry.get(self.model_size)
+        if language is None and not model.is_multilingual:
+            language = "en"
+        tokenizer = get_tokenizer(model.is_multilingual, num_languages=model.num_languages,
+                                  language=language or "en", task="transcribe")
+        prompt = tuple(tokenizer.encode(" " + initial_prompt.strip())) if initial_prompt else ()
+
+        mel = log_mel_spectrogram(audio, model.dims.n_mels, padding=N_SAMPLES)
+        content_frames = mel.shape[-1] - N_FRAMES
+        input_stride = N_FRAMES // model.dims.n_audio_ctx  # mel frames per output token
+        time_precision = input_stride * HOP_LENGTH / SAMPLE_RATE
+
+        segments: List[dict] = []
+        seek = 0
+        last_speech_timestamp = 0.0
+        while seek < content_frames:
+            time_offset = seek * HOP_LENGTH / SAMPLE_RATE
+            segment_size = min(N_FRAMES, content_frames - seek)
+            mel_segment = pad_or_trim(mel[:, seek:seek + segment_size], N_FRAMES)
+            result = self.decode(mel_segment, language, prompt, best_of)
+            prompt = ()  # the initial prompt only conditions the first window
+            if language is None:
+                language = result.language
+                tokenizer = get_tokenizer(model.is_multilingual, num_languages=model.num_languages,
+                                          language=language, task="transcribe")
+
+            if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob <= LOGPROB_THRESHOLD:
+                seek += segment_size  # no voice activity in this window
+                continue
+
+            current, next_seek, single_ending = _split_segments(
+                result, tokenizer, seek, segment_size, time_offset, time_precision, input_stride)
+            seek = next_seek
+            if word_timestamps:
+                self.run(lambda m: add_word_timestamps(
+                    segments=current, model=m, tokenizer=tokenizer, mel=mel_segment, num_frames=segment_size,
+                    last_speech_timestamp=last_speech_timestamp))
+                last_word_end = get_end(current)
+                if not single_ending and last_word_end is not None and last_word_end > time_offset:
+                    seek = round(last_word_end * FRAMES_PER_SECOND)
+                if last_word_end is not None:
+                    last_speech_timestamp = last_word_end
+
+            for segment in current:
+                if segment["start"] == segment["end"] or not segment["text"].strip():
+                    segment.update(text="", tokens=[], words=[])
+                segments.append(dict(segment, id=len(segments)))
+
+        all_tokens = [token for segment in segments for token in segment["tokens"]]
+        return {"text": tokenizer.decode(all_tokens), "segments": segments, "language": language}
+
+    def stats(self) -> dict:
+        with self._cond:
+            pending = len(self._pending)
+        return {"batches": self.batches, "windows": self.windows, "pending": pending,
+                "mean_batch": round(self.windows / self.batches, 2) if self.batches else 0.0}
+
+    @property
+    def closed(self) -> bool:
+        """True once shut down, or if the service thread has died; `transcribe` then raises."""
+        return self._closed or not self._thread.is_alive()
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+
+def _split_segments(result, tokenizer, seek: int, segment_size: int, time_offset: float,
+                    time_precision: float, input_stride: int):
+    """
+    Segments of one decoded window, split at consecutive timestamp tokens,
+    and where the next window starts. As in whisper.transcribe.
+
+    Returns:
+        (segments, next_seek, single_timestamp_ending)
+    """
+    import torch
+
+    tokens = torch.tensor(result.tokens)
+
+    def new_segment(start, end, segment_tokens):
+        segment_tokens = segment_tokens.tolist()
+        return {
+            "seek": seek, "start": start, "end": end,
+            "text": tokenizer.decode([t for t in segment_tokens if t < tokenizer.eot]),
+            "tokens": segment_tokens, "temperature": result.temperature, "avg_logprob": result.avg_logprob,
+            "compression_ratio": result.compression_ratio, "no_speech_prob": result.no_speech_prob,
+        }
+
+    timestamp_tokens = tokens.ge(tokenizer.timestamp_begin)
+    single_ending = timestamp_tokens[-2:].tolist() == [False, True]
+    consecutive = (torch.where(timestamp_tokens[:-1] & timestamp_tokens[1:])[0] + 1).tolist()
+    segments = []
+    if consecutive:
+        slices = consecutive + ([len(tokens)] if single_ending else [])
+        last_slice = 0
+        for current_slice in slices:
+            sliced = tokens[last_slice:current_slice]
+            start_pos = sliced[0].item() - tokenizer.timestamp_begin
+            end_pos = sliced[-1].item() - tokenizer.timestamp_begin
+            segments.append(new_segment(time_offset + start_pos * time_precision,
+                                        time_offset + end_pos * time_precision, sliced))
+            last_slice = current_slice
+        if single_ending:
+            next_seek = seek + segment_size  # no speech after the last timestamp
+        else:
+            # the last segment is unfinished: seek to its start and decode it again in the next window
+            next_seek = seek + (tokens[last_slice - 1].item() - tokenizer.timestamp_begin) * input_stride
+    else:
+        duration = segment_size * time_precision / input_stride
+        timestamps = tokens[timestamp_tokens.nonzero().flatten()]
+        if len(timestamps) > 0 and timestamps[-1].item() != tokenizer.timestamp_begin:
+            duration = (timestamps[-1].item() - tokenizer.timestamp_begin) * time_precision
+        segments.append(new_segment(time_offset, time_offset + duration, tokens))
+        next_seek = seek + segment_size
+    return segments, next_seek, single_ending
+
+
+_batchers: Dict[str, WhisperBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(model_size: str = "base") -> WhisperBatcher:
+    """Process-wide batching service per model size (replaced if its service thread has ended)."""
+    with _batchers_lock:
+        batcher = _batchers.get(model_size)
+        if batcher is None or batcher.closed:
+            batcher = _batchers[model_size] = WhisperBatcher(model_size)
+        return batcher
@@ -0,0 +1,89 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.admission import AdmissionController, JobRejected, UNKNOWN_DURATION_SECONDS, estimate_cost
+from backend.jobs import JobManager, JobQueueFull, DONE, QUEUED, RUNNING
+
+
+class TestCostEstimate(unittest.TestCase):
+    def test_cost_is_header_duration_times_model_cost(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "talk.wav")
+            with wave.open(path, "wb") as f:
+                f.setnchannels(1)
+                f.setsampwidth(2)
+                f.setframerate(16000)
+                f.writeframes(b"\0\0" * 16000 * 2)
+            self.assertAlmostEqual(estimate_cost(path, "base"), 2.0)
+            self.assertAlmostEqual(estimate_cost(path, "small:int8"), 6.0)
+
+            garbage = os.path.join(root, "talk.mp4")
+            with open(garbage, "wb") as f:
+                f.write(b"not a video")
+            self.assertAlmostEqual(estimate_cost(garbage, "base"), UNKNOWN_DURATION_SECONDS)
+
+
+class TestAdmissionController(unittest.TestCase):
+    def test_runs_queues_then_rejects_with_retry_hint(self):
+        admission = AdmissionController(capacity=10, max_queued=10, seconds_per_cost=2.0)
+        first = admission.reserve(6)
+        self.assertTrue(admission.start(first, timeout=1))
+        second = admission.reserve(6)  # over capacity: waits
+        admission.reserve(4)           # fills the queue
+        with self.assertRaises(JobRejected) as rejected:
+            admission.reserve(3)
+        self.assertIsInstance(rejected.exception, JobQueueFull)
+        # 3 units of the queue must start first, at 2 s per unit on the one running job
+        self.assertEqual(rejected.exception.retry_after, 6)
+
+        self.assertFalse(admission.start(second, timeout=0.05))
+        started = threading.Event()
+        waiter = threading.Thread(target=lambda: admission.start(second) and started.set())
+        waiter.start()
+        self.assertFalse(started.wait(0.1))
+        admission.finish(first, seconds=3.0)
+        self.assertTrue(started.wait(5))
+        waiter.join()
+        self.assertEqual(admission.stats()["running_cost"], 6)
+        self.assertEqual(admission.stats()["queued_cost"], 4)
+
+    def test_oversized_job_runs_alone(self):
+        admission = AdmissionController(capacity=10, max_queued=0)
+        ticket = admission.reserve(50)
+        self.assertTrue(admission.start(ticket, timeout=1))
+        with self.assertRaises(JobRejected):
+            admission.reserve(1)
+        admission.finish(ticket)
+        self.assertTrue(admission.start(admission.reserve(1), timeout=1))
+
+
+class TestJobManagerAdmission(unittest.TestCase):
+    def test_job_stays_queued_until_its_cost_fits(self):
+        release = threading.Event()
+        manager = JobManager(lambda path, size: release.wait(5), max_workers=2,
+                             admission=AdmissionController(capacity=10, max_queued=10))
+        long_job = manager.submit("long.mp4", cost=8)
+        short_job = manager.submit("short.mp4", cost=5)
+        deadline = time.time() + 5
+        while long_job.status != RUNNING and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        self.assertEqual(short_job.status, QUEUED)  # a worker is free, but the capacity is not
+        with self.assertRaises(JobQueueFull):
+            manager.submit("another.mp4", cost=6)
+        release.set()
+        self.assertTrue(short_job.done_event.wait(5))
+        self.assertEqual((long_job.status, short_job.status), (DONE, DONE))
+        self.assertEqual(manager.admission.stats()["running_cost"], 0)
+        manager.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
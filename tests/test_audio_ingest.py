@@ -0,0 +1,37 @@
+import unittest
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from preprocessing.audio_ingest import load_audio, duration_seconds, is_audio_only, SAMPLE_RATE
+
+SAMPLE_WAV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test1.wav")
+
+
+class TestAudioIngest(unittest.TestCase):
+    def test_audio_only_detection(self):
+        self.assertTrue(is_audio_only("talk.WAV"))
+        self.assertFalse(is_audio_only("talk.mp4"))
+
+    def test_missing_file_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            load_audio("does_not_exist.mp4")
+
+    @unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg not installed")
+    def test_decodes_to_16k_mono_float32(self):
+        import soundfile as sf
+        audio = load_audio(SAMPLE_WAV)
+        info = sf.info(SAMPLE_WAV)
+        self.assertEqual(audio.dtype, np.float32)
+        self.assertEqual(audio.ndim, 1)
+        self.assertAlmostEqual(duration_seconds(audio), info.duration, delta=0.05)
+        self.assertLessEqual(np.abs(audio).max(), 1.0)
+        self.assertEqual(SAMPLE_RATE, 16000)
+
+
+if __name__ == '__main__':
+    unittest.main()
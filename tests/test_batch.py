@@ -0,0 +1,80 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.batch import discover, finished_items, run_batch
+
+LOADS = []
+
+
+def fake_loader(model_size):
+    LOADS.append(model_size)
+    return object()
+
+
+def fake_runner(path, model_size="base"):
+    """Stands in for analyze_recording in the (spawned) batch workers."""
+    if "broken" in path:
+        raise ValueError("cannot decode")
+    return {"context": {"format": "lecture"}, "loads": list(LOADS)}
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        for name in ("a.mp4", "b.wav", "notes.txt", "sub/c.mov"):
+            path = os.path.join(self.root, "in", name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "w").close()
+        self.output = os.path.join(self.root, "results.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def records(self):
+        with open(self.output, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_discovers_directories_and_manifests(self):
+        inputs = os.path.join(self.root, "in")
+        found = discover(inputs)
+        self.assertEqual([os.path.relpath(p, inputs) for p in found], ["a.mp4", "b.wav", os.path.join("sub", "c.mov")])
+        manifest = os.path.join(inputs, "list.txt")
+        with open(manifest, "w") as f:
+            f.write("# cohort 12\na.mp4\n\n/abs/talk.wav\n" + json.dumps({"path": "b.wav"}) + "\n")
+        self.assertEqual(discover(manifest), [os.path.join(inputs, "a.mp4"), "/abs/talk.wav",
+                                              os.path.join(inputs, "b.wav")])
+
+    def test_resumes_after_interruption_and_retries_failures(self):
+        summary = run_batch(["a.mp4", "broken.mp4"], self.output, workers=1, runner=fake_runner, loader=fake_loader)
+        self.assertEqual((summary["done"], summary["failed"], summary["skipped"]), (1, 1, 0))
+        self.assertGreater(summary["recordings_per_minute"], 0)
+        first = {r["path"]: r for r in self.records()}
+        self.assertEqual(first["broken.mp4"]["error"], "ValueError: cannot decode")
+        # The worker loaded the model once, at start-up, before any recording
+        self.assertEqual(first["a.mp4"]["results"]["loads"], ["base"])
+
+        with open(self.output, "a", encoding="utf-8") as f:
+            f.write('{"path": "c.mp4", "model_size": "ba')  # killed mid-write
+        self.assertEqual(finished_items(self.output), {("a.mp4", "base")})
+
+        summary = run_batch(["a.mp4", "broken.mp4", "c.mp4"], self.output, workers=1,
+                            runner=fake_runner, loader=fake_loader)
+        self.assertEqual((summary["done"], summary["failed"], summary["skipped"]), (1, 1, 1))
+        self.assertEqual(finished_items(self.output), {("a.mp4", "base"), ("c.mp4", "base")})
+        with open(self.output, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(sum(1 for line in lines if not line.endswith("}")), 1)  # only the cut line is lost
+        self.assertEqual(len(lines), 5)
+        # Another model size is a different result
+        self.assertEqual(run_batch(["a.mp4"], self.output, model_size="tiny", workers=1,
+                                   runner=fake_runner, loader=fake_loader)["done"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
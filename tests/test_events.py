@@ -0,0 +1,67 @@
+import unittest
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from backend.events import format_event, job_events
+from backend.jobs import JobManager
+
+
+def parse(messages):
+    """(event, data) pairs from SSE messages, skipping comments."""
+    events = []
+    for message in messages:
+        fields = dict(line.split(": ", 1) for line in message.strip().split("\n") if not line.startswith(":"))
+        if fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class TestJobEvents(unittest.TestCase):
+    def test_format_event_handles_numpy_values(self):
+        message = format_event("stage", {"stage": "wpm", "result": {"wpm": np.float64(131.5), "curve": np.arange(2)}})
+        self.assertTrue(message.endswith("\n\n"))
+        self.assertEqual(parse([message]), [("stage", {"stage": "wpm", "result": {"wpm": 131.5, "curve": [0, 1]}})])
+
+    def test_stream_delivers_stages_then_done(self):
+        release = threading.Event()
+
+        def runner(path, size, on_stage):
+            on_stage("transcript", {"transcript": "hi there"})
+            on_stage("wpm", {"words_per_minute": 120.0})
+            release.wait(5)
+            on_stage("audio_grades", {"clarity": 8})
+            return {"audio_grades": {"clarity": 8}}
+
+        manager = JobManager(runner, max_workers=1, stage_events=True)
+        job = manager.submit("a.mp4")
+        messages = job_events(job, {"upload": None}, keepalive=0.05)
+        first = parse([next(messages), next(messages), next(messages)])
+        self.assertEqual(first[0], ("job", {"job_id": job.id, "status": job.status, "upload": None}))
+        self.assertEqual([data["stage"] for _, data in first[1:]], ["transcript", "wpm"])
+        release.set()
+        rest = parse(list(messages))
+        self.assertEqual(rest[0], ("stage", {"stage": "audio_grades", "result": {"clarity": 8}}))
+        self.assertEqual(rest[-1][0], "done")
+        self.assertEqual(rest[-1][1]["results"], {"audio_grades": {"clarity": 8}})
+        manager.shutdown()
+
+    def test_failed_job_ends_with_error(self):
+        def runner(path, size, on_stage):
+            on_stage("transcript", {"transcript": ""})
+            raise ValueError("no speech")
+
+        manager = JobManager(runner, max_workers=1, stage_events=True)
+        events = parse(list(job_events(manager.submit("a.mp4"), keepalive=0.05)))
+        self.assertEqual([event for event, _ in events], ["job", "stage", "done"])
+        self.assertEqual(events[-1][1]["error"], "no speech")
+        manager.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preprocessing.fillers import FillerMatcher, count_fillers, find_fillers, normalize, words_from_result
+
+
+def timed(text, step=0.5):
+    return [{"word": f" {w}", "start": i * step} for i, w in enumerate(text.split())]
+
+
+class TestFillers(unittest.TestCase):
+    def test_normalize_strips_whisper_spacing_and_punctuation(self):
+        self.assertEqual(normalize(" Um,"), "um")
+        self.assertEqual(normalize(" don't."), "don't")
+        self.assertEqual(normalize(" ..."), "")
+
+    def test_single_and_multi_word_fillers_with_timestamps(self):
+        words = timed("So, um, you know... I think, like, you know it works uh")
+        found = find_fillers(words)
+        self.assertEqual(found["so"], [0.0])
+        self.assertEqual(found["um"], [0.5])
+        self.assertEqual(found["you know"], [1.0, 3.5])
+        self.assertEqual(found["like"], [3.0])
+        self.assertEqual(found["uh"], [5.5])
+        self.assertEqual(count_fillers(found)["you know"], 2)
+
+    def test_partial_multi_word_match_does_not_count(self):
+        found = find_fillers(timed("you you know you knew"))
+        self.assertEqual(found["you know"], [0.5])
+
+    def test_overlapping_patterns(self):
+        matcher = FillerMatcher(["you know", "know what", "you know what i mean", "i mean"])
+        found = find_fillers(timed("you know what i mean"), matcher)
+        self.assertEqual(found, {"you know": [0.0], "know what": [0.5],
+                                 "you know what i mean": [0.0], "i mean": [1.5]})
+
+    def test_falls_back_to_segment_times_without_word_timestamps(self):
+        result = {"text": " um hello. So yes.",
+                  "segments": [{"start": 0.0, "text": " um hello."}, {"start": 4.2, "text": " So yes."}]}
+        found = find_fillers(words_from_result(result))
+        self.assertEqual(found["um"], [0.0])
+        self.assertEqual(found["so"], [4.2])
+
+    def test_word_timestamps_are_preferred(self):
+        result = {"segments": [{"start": 0.0, "text": " Well um", "words": [
+            {"word": " Well", "start": 0.1, "end": 0.4}, {"word": " um", "start": 0.9, "end": 1.2}]}]}
+        self.assertEqual(find_fillers(words_from_result(result))["um"], [0.9])
+
+    def test_hour_long_transcript(self):
+        sentence = "so I was um thinking that you know we could like try it "
+        words = timed(sentence * 1500, step=0.4)  # ~18k words, an hour at 150 wpm
+        found = find_fillers(words)
+        self.assertEqual(len(found["you know"]), 1500)
+        self.assertEqual(len(found["um"]), 1500)
+        self.assertEqual(found["so"][1], round(13 * 0.4, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.jobs import JobManager, JobQueueFull, DONE, FAILED
+from backend.results import AnalysisStore
+
+
+class TestJobManager(unittest.TestCase):
+    def test_job_reports_result(self):
+        manager = JobManager(lambda path, size: {"path": path, "size": size}, max_workers=1)
+        job = manager.submit("uploads/a.mp4", model_size="tiny")
+        self.assertTrue(job.done_event.wait(5))
+        self.assertEqual(job.status, DONE)
+        self.assertEqual(manager.get(job.id).to_dict()["results"], {"path": "uploads/a.mp4", "size": "tiny"})
+        manager.shutdown()
+
+    def test_failed_job_reports_error(self):
+        def runner(path, size):
+            raise ValueError("bad media")
+
+        manager = JobManager(runner, max_workers=1)
+        job = manager.submit("uploads/bad.mp4")
+        self.assertTrue(job.done_event.wait(5))
+        self.assertEqual(job.status, FAILED)
+        self.assertEqual(job.to_dict()["error"], "bad media")
+        manager.shutdown()
+
+    def test_rejects_when_queue_is_full(self):
+        release = threading.Event()
+        manager = JobManager(lambda path, size: release.wait(5), max_workers=1, max_pending=1)
+        running = manager.submit("a.mp4")
+        while manager.stats()["running"] == 0:
+            pass
+        manager.submit("b.mp4")  # waits behind the running job
+        with self.assertRaises(JobQueueFull):
+            manager.submit("c.mp4")
+        release.set()
+        self.assertTrue(running.done_event.wait(5))
+        manager.shutdown()
+
+
+class DictStore:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def put(self, key, result):
+        self.data[key] = result
+
+
+class TestJobDeduplication(unittest.TestCase):
+    def test_duplicate_of_running_job_joins_it(self):
+        release = threading.Event()
+        calls = []
+
+        def runner(path, size):
+            calls.append(path)
+            release.wait(5)
+            return {"ok": True}
+
+        manager = JobManager(runner, max_workers=2, result_store=DictStore())
+        first = manager.submit("a.mp4", key="abc-base")
+        second = manager.submit("a-again.mp4", key="abc-base")
+        self.assertIs(first, second)
+        release.set()
+        self.assertTrue(first.done_event.wait(5))
+        self.assertEqual(calls, ["a.mp4"])
+        manager.shutdown()
+
+    def test_completed_analysis_is_served_from_store(self):
+        store = DictStore()
+        manager = JobManager(lambda path, size: {"score": 1}, max_workers=1, result_store=store)
+        first = manager.submit("a.mp4", key="abc-base")
+        self.assertTrue(first.done_event.wait(5))
+        second = manager.submit("a.mp4", key="abc-base")
+        self.assertIsNot(first, second)
+        self.assertTrue(second.cached)
+        self.assertEqual(second.status, DONE)
+        self.assertEqual(manager.get(second.id).to_dict()["results"], {"score": 1})
+        self.assertTrue(manager.find("abc-base", "a.mp4").cached)
+        self.assertIsNone(manager.find("other-base", "b.mp4"))
+        manager.shutdown()
+
+
+class TestAnalysisStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_backend_keys_make_portable_file_names(self):
+        store = AnalysisStore(self.root)
+        store.put("abc-base:int8", {"score": 1})
+        store.put("abc-base", {"score": 2})
+        self.assertEqual(store.get("abc-base:int8"), {"score": 1})
+        self.assertEqual(store.get("abc-base"), {"score": 2})
+        self.assertFalse(any(":" in name for name in os.listdir(self.root)))
+
+    def test_expired_analyses_are_not_served(self):
+        store = AnalysisStore(self.root, ttl=60)
+        store.put("abc-base", {"score": 1})
+        old = time.time() - 120
+        os.utime(store._path("abc-base"), (old, old))
+        self.assertIsNone(store.get("abc-base"))
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_evicts_least_recently_read_over_size_budget(self):
+        store = AnalysisStore(self.root, max_bytes=100)
+        now = time.time()
+        for i, key in enumerate(["a", "b"]):
+            store.put(key, {"pad": "x" * 30})
+            os.utime(store._path(key), (now - 10 + i, now))
+        store.get("a")  # "b" is now least recently read
+        store.put("c", {"pad": "x" * 30})
+        self.assertIsNotNone(store.get("a"))
+        self.assertIsNone(store.get("b"))
+        self.assertIsNotNone(store.get("c"))
+
+
+class TestStageEvents(unittest.TestCase):
+    def test_stages_stream_before_the_job_finishes(self):
+        release = threading.Event()
+
+        def runner(path, size, on_stage):
+            on_stage("transcript", {"transcript": "hello"})
+            release.wait(5)
+            on_stage("audio_grades", {"score": 1})
+            return {"done": True}
+
+        manager = JobManager(runner, max_workers=1, stage_events=True)
+        job = manager.submit("a.mp4")
+        stream = job.stream(timeout=5)
+        self.assertEqual(next(stream), ("transcript", {"transcript": "hello"}))
+        self.assertFalse(job.finished)
+        release.set()
+        self.assertEqual(list(stream), [("audio_grades", {"score": 1})])
+        self.assertEqual(job.status, DONE)
+        self.assertEqual(job.to_dict()["stages_done"], ["transcript", "audio_grades"])
+        manager.shutdown()
+
+    def test_late_subscriber_gets_every_stage(self):
+        manager = JobManager(lambda path, size, on_stage: (on_stage("a", 1), on_stage("b", 2)) and None,
+                             max_workers=1, stage_events=True)
+        job = manager.submit("a.mp4")
+        self.assertTrue(job.done_event.wait(5))
+        self.assertEqual(list(job.stream(timeout=1)), [("a", 1), ("b", 2)])
+        manager.shutdown()
+
+    def test_idle_stream_yields_keepalives(self):
+        release = threading.Event()
+        manager = JobManager(lambda path, size: release.wait(5), max_workers=1)
+        job = manager.submit("a.mp4")
+        stream = job.stream(timeout=0.05)
+        self.assertIsNone(next(stream))
+        release.set()
+        self.assertTrue(all(item is None for item in stream))
+        manager.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
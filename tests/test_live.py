@@ -0,0 +1,172 @@
+import unittest
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from backend.live import LiveSession, live_socket
+from preprocessing.audio_ingest import SAMPLE_RATE
+from preprocessing.fillers import FillerStream
+from preprocessing.vad import FRAME_MS, silence_runs, speech_frames
+
+# Each word of the fake speech is a tone burst; its pitch says which word it is.
+VOCABULARY = ["so", "um", "today", "you", "know", "we", "talk", "about", "squid"]
+WORD_SECONDS, GAP_SECONDS = 0.3, 0.2
+
+
+def speak(words):
+    t = np.arange(int(WORD_SECONDS * SAMPLE_RATE)) / SAMPLE_RATE
+    gap = np.zeros(int(GAP_SECONDS * SAMPLE_RATE), dtype=np.float32)
+    parts = []
+    for word in words:
+        freq = 300 + 100 * VOCABULARY.index(word)
+        parts += [(0.3 * np.sin(2 * np.pi * freq * t)).astype(np.float32), gap]
+    return np.concatenate(parts)
+
+
+def fake_transcribe(audio, prompt=""):
+    """Recognise tone-burst words by their pitch, returning Whisper-style word timestamps."""
+    frame = SAMPLE_RATE * FRAME_MS // 1000
+    mask = speech_frames(audio, threshold_db=-30)
+    bounds = silence_runs(~mask)  # runs of speech
+    words = []
+    for start, end in bounds:
+        burst = audio[start * frame:end * frame]
+        freq = np.argmax(np.abs(np.fft.rfft(burst))) * SAMPLE_RATE / len(burst)
+        index = int(round((freq - 300) / 100))
+        if 0 <= index < len(VOCABULARY):
+            words.append({"word": " " + VOCABULARY[index], "start": start * FRAME_MS / 1000,
+                          "end": end * FRAME_MS / 1000})
+    return {"segments": [{"words": words}] if words else []}
+
+
+def pcm(audio):
+    return (np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+SCRIPT = ["so", "today", "we", "talk", "about", "um", "squid", "you", "know", "squid"] * 3
+
+
+class TestFillerStream(unittest.TestCase):
+    def test_multi_word_filler_split_across_feeds(self):
+        stream = FillerStream()
+        self.assertEqual(stream.feed([{"word": " so", "start": 0.0}, {"word": " you", "start": 1.0}]),
+                         [{"filler": "so", "time": 0.0}])
+        self.assertEqual(stream.feed([{"word": " know,", "start": 1.2}]), [{"filler": "you know", "time": 1.0}])
+        self.assertEqual(stream.found["you know"], [1.0])
+
+
+class TestLiveSession(unittest.TestCase):
+    def run_session(self, chunk_seconds):
+        session = LiveSession(fake_transcribe, window_seconds=4.0, hop_seconds=1.0)
+        audio = speak(SCRIPT)
+        chunk = int(chunk_seconds * SAMPLE_RATE)
+        updates = []
+        for i in range(0, len(audio), chunk):
+            session.feed(pcm(audio[i:i + chunk]))
+            if session.due():
+                updates.append(session.update())
+        return updates, session.finish()
+
+    def test_transcript_is_stitched_without_gaps_or_repeats(self):
+        updates, final = self.run_session(0.25)
+        self.assertEqual(final["transcript"].split(), SCRIPT)
+        committed = " ".join(u["committed"] for u in updates if u["committed"]).split()
+        self.assertEqual(committed, SCRIPT[:len(committed)])
+        self.assertTrue(any(u["partial"] for u in updates))
+
+    def test_filler_alerts_and_pace(self):
+        updates, final = self.run_session(0.1)
+        alerts = [a for u in updates for a in u["filler_alerts"]]
+        um_times = [a["time"] for a in alerts if a["filler"] == "um"]
+        self.assertEqual(len(um_times), 3)
+        self.assertAlmostEqual(um_times[0], 5 * (WORD_SECONDS + GAP_SECONDS), delta=0.05)
+        self.assertEqual(final["filler_counts"], {"um": 3, "uh": 0, "like": 0, "you know": 3, "so": 3})
+        # 2 words per second
+        self.assertAlmostEqual(final["wpm"], 120.0, delta=5.0)
+        self.assertEqual(updates[-1]["pace"], "too slow")
+
+    def test_audio_buffer_stays_bounded(self):
+        session = LiveSession(fake_transcribe, window_seconds=4.0, hop_seconds=1.0)
+        audio = speak(SCRIPT * 4)
+        for i in range(0, len(audio), SAMPLE_RATE // 4):
+            session.feed(pcm(audio[i:i + SAMPLE_RATE // 4]))
+            if session.due():
+                session.update()
+            self.assertLessEqual(len(session._audio), 6 * SAMPLE_RATE)
+
+
+class TestLiveSocket(unittest.TestCase):
+    def test_endpoint_streams_updates_and_final(self):
+        from flask import Flask
+        from flask_sock import Sock
+        from werkzeug.serving import make_server
+        import simple_websocket
+
+        app = Flask(__name__)
+        sock = Sock(app)
+        sock.route("/live")(lambda ws: live_socket(ws, transcriber=fake_transcribe))
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            ws = simple_websocket.Client(f"ws://127.0.0.1:{server.server_port}/live")
+            self.assertEqual(json.loads(ws.receive(timeout=5))["type"], "ready")
+            audio = speak(SCRIPT[:10])
+            for i in range(0, len(audio), SAMPLE_RATE // 2):
+                ws.send(pcm(audio[i:i + SAMPLE_RATE // 2]))
+                if i == SAMPLE_RATE:
+                    for bad in ("not json", "5", "[]"):  # reported, and the session carries on
+                        ws.send(bad)
+            ws.send(json.dumps({"type": "stop"}))
+            messages = []
+            while not messages or messages[-1]["type"] != "final":
+                messages.append(json.loads(ws.receive(timeout=5)))
+            try:
+                ws.close()
+            except simple_websocket.ConnectionClosed:
+                pass  # the server closes once the summary is sent
+        finally:
+            server.shutdown()
+        self.assertEqual(messages[-1]["transcript"].split(), SCRIPT[:10])
+        self.assertEqual(sum(m["type"] == "error" for m in messages), 3)
+
+    def test_client_closing_early_ends_the_session_quietly(self):
+        from flask import Flask
+        from flask_sock import Sock
+        from werkzeug.serving import make_server
+        import simple_websocket
+
+        outcome = []
+
+        def handler(ws):
+            try:
+                live_socket(ws, transcriber=fake_transcribe)
+                outcome.append("returned")
+            except Exception as e:
+                outcome.append(e)
+
+        app = Flask(__name__)
+        Sock(app).route("/live")(handler)
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            ws = simple_websocket.Client(f"ws://127.0.0.1:{server.server_port}/live")
+            ws.receive(timeout=5)
+            ws.send(pcm(speak(SCRIPT[:4])))
+            ws.send(json.dumps({"type": "stop"}))
+            ws.close()  # without waiting for the summary
+            deadline = time.time() + 5
+            while not outcome and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            server.shutdown()
+        self.assertEqual(outcome, ["returned"])
+
+
+if __name__ == '__main__':
+    unittest.main()
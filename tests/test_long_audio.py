@@ -0,0 +1,53 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from preprocessing.audio_ingest import SAMPLE_RATE
+from preprocessing.long_audio import ParallelTranscriber, stitch
+
+
+class FakeWhisper:
+    """Reports each chunk's length as its text and as a single segment."""
+
+    def transcribe(self, audio, **options):
+        seconds = len(audio) / SAMPLE_RATE
+        return {"text": f" chunk of {seconds:.0f}s", "language": "en",
+                "segments": [{"id": 0, "start": 0.0, "end": seconds, "text": f" chunk of {seconds:.0f}s"}]}
+
+
+def fake_loader(model_size):
+    return FakeWhisper()
+
+
+class TestStitch(unittest.TestCase):
+    def test_offsets_segments_and_joins_text(self):
+        result = stitch([
+            (0.0, {"text": " Hello there.", "segments": [{"id": 0, "start": 0.0, "end": 2.0}], "language": "en"}),
+            (30.0, {"text": "", "segments": []}),
+            (45.5, {"text": " General Kenobi.", "segments": [{"id": 0, "start": 1.0, "end": 3.0}]}),
+        ])
+        self.assertEqual(result["text"], "Hello there. General Kenobi.")
+        self.assertEqual(result["language"], "en")
+        self.assertEqual([(s["id"], s["start"], s["end"]) for s in result["segments"]],
+                         [(0, 0.0, 2.0), (1, 46.5, 48.5)])
+
+
+class TestParallelTranscriber(unittest.TestCase):
+    def test_chunks_are_transcribed_in_order(self):
+        t = np.arange(50 * SAMPLE_RATE) / SAMPLE_RATE
+        audio = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+        transcriber = ParallelTranscriber("tiny", workers=2, loader=fake_loader, chunk_max_seconds=20)
+        try:
+            result = transcriber.transcribe(audio)
+        finally:
+            transcriber.shutdown()
+        self.assertEqual(result["text"], "chunk of 20s chunk of 20s chunk of 10s")
+        self.assertEqual([s["start"] for s in result["segments"]], [0.0, 20.0, 40.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preprocessing.model_registry import WhisperModelRegistry
+
+
+class FakeModel:
+    def __init__(self, size):
+        self.size = size
+
+
+class TestWhisperModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.loads = []
+
+        def loader(size):
+            self.loads.append(size)
+            time.sleep(0.05)
+            return FakeModel(size)
+
+        self.loader = loader
+
+    def test_loads_each_size_once(self):
+        registry = WhisperModelRegistry(loader=self.loader)
+        first = registry.get("base")
+        second = registry.get("base")
+        self.assertIs(first, second)
+        self.assertEqual(self.loads, ["base"])
+        self.assertEqual(registry.stats()["hits"], 1)
+        self.assertEqual(registry.stats()["misses"], 1)
+
+    def test_concurrent_requests_share_one_load(self):
+        registry = WhisperModelRegistry(loader=self.loader)
+        models = []
+        threads = [threading.Thread(target=lambda: models.append(registry.get("tiny"))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.loads, ["tiny"])
+        self.assertTrue(all(m is models[0] for m in models))
+
+    def test_evicts_least_recently_used(self):
+        # Room for "tiny" + "base" but not "small" on top of them.
+        registry = WhisperModelRegistry(max_bytes=1_300_000_000, loader=self.loader)
+        registry.get("tiny")
+        registry.get("base")
+        registry.get("tiny")  # "base" is now least recently used
+        registry.get("small")
+        self.assertEqual(registry.loaded_sizes(), ["tiny", "small"])
+        self.assertEqual(registry.stats()["evictions"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import importlib.util
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from preprocessing.audio_ingest import SAMPLE_RATE
+from models.prosody import analyze_prosody, score_prosody, _rate_curve
+
+HAS_LIBROSA = importlib.util.find_spec("librosa") is not None
+
+
+def voiced(seconds, f0=200.0, amplitude=0.3):
+    """Harmonic-rich vowel-like tone at `f0`."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    wave = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6))
+    return (amplitude * wave / 2).astype(np.float32)
+
+
+def pause(seconds, rng):
+    return (0.0005 * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+class TestRateCurve(unittest.TestCase):
+    def test_words_spread_over_windows(self):
+        segments = [{"start": 0.0, "end": 30.0, "text": " ".join(["word"] * 75)},
+                    {"start": 30.0, "end": 60.0, "text": " ".join(["word"] * 50)}]
+        curve = _rate_curve(segments, 60.0)
+        self.assertEqual([point["start"] for point in curve], [0.0, 10.0, 20.0, 30.0])
+        self.assertAlmostEqual(curve[0]["wpm"], 150.0)
+        self.assertAlmostEqual(curve[-1]["wpm"], 100.0)
+
+
+@unittest.skipUnless(HAS_LIBROSA, "librosa not installed")
+class TestProsody(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        # 1.5s phrases with 0.6s pauses, one 3s silence in the middle
+        parts = []
+        for i in range(6):
+            parts += [voiced(1.5, f0=180.0 if i % 2 else 220.0), pause(3.0 if i == 2 else 0.6, rng)]
+        self.audio = np.concatenate(parts[:-1])
+
+    def test_pitch_and_pauses(self):
+        metrics = analyze_prosody(self.audio)
+        self.assertAlmostEqual(metrics["pitch"]["median_hz"], 200.0, delta=25.0)
+        self.assertGreater(metrics["pitch"]["std_semitones"], 1.0)
+        self.assertEqual(metrics["pauses"]["count"], 5)
+        self.assertEqual(len(metrics["long_silences"]), 1)
+        start, end = metrics["long_silences"][0]
+        self.assertAlmostEqual(start, 3 * 1.5 + 2 * 0.6, delta=0.1)
+        self.assertAlmostEqual(end - start, 3.0, delta=0.1)
+        self.assertIsNone(metrics["rate"]["mean_wpm"])
+
+    def test_scores_are_bounded_and_none_without_signal(self):
+        segments = [{"start": 0.0, "end": 15.0, "text": " ".join(["word"] * 35), "avg_logprob": -0.2}]
+        scores = score_prosody(analyze_prosody(self.audio, segments=segments))
+        for key in ("clarity_score", "pronunciation_score", "tone_score", "pacing_score", "engagement_score"):
+            self.assertGreaterEqual(scores[key], 0.0)
+            self.assertLessEqual(scores[key], 1.0)
+        self.assertIsNone(score_prosody(analyze_prosody(self.audio))["pronunciation_score"])
+
+    def test_silence_has_no_pitch(self):
+        metrics = analyze_prosody(np.zeros(5 * SAMPLE_RATE, dtype=np.float32))
+        self.assertIsNone(metrics["pitch"]["median_hz"])
+        self.assertEqual(metrics["pauses"]["count"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
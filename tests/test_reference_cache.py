@@ -0,0 +1,138 @@
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import threading
+import time
+import wave
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.reference_cache import ReferenceAudioCache, video_id_from_url
+
+
+def make_producer(size, calls):
+    def produce(tmp_dir):
+        calls.append(tmp_dir)
+        time.sleep(0.05)
+        path = os.path.join(tmp_dir, "download.opus")
+        with open(path, "wb") as f:
+            f.write(b"\0" * size)
+        return path
+    return produce
+
+
+class TestReferenceAudioCache(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache = ReferenceAudioCache(root=self.root, max_bytes=250)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_video_id_from_url(self):
+        self.assertEqual(video_id_from_url("https://www.youtube.com/watch?v=abc123"), "abc123")
+        self.assertEqual(video_id_from_url("https://youtu.be/xyz"), "xyz")
+
+    def test_second_fetch_is_a_hit(self):
+        calls = []
+        first = self.cache.fetch("vid1", make_producer(100, calls))
+        second = self.cache.fetch("vid1", make_producer(100, calls))
+        self.assertEqual(first, second)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertFalse([n for n in os.listdir(self.root) if n.startswith(".tmp-")])
+
+    def test_concurrent_fetches_download_once(self):
+        calls = []
+        threads = [threading.Thread(target=self.cache.fetch, args=("vid1", make_producer(100, calls))) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+
+    def test_evicts_least_recently_used(self):
+        calls = []
+        self.cache.fetch("a", make_producer(100, calls))
+        time.sleep(0.01)
+        self.cache.fetch("b", make_producer(100, calls))
+        time.sleep(0.01)
+        self.cache.get("a")  # "b" is now least recently used
+        time.sleep(0.01)
+        self.cache.fetch("c", make_producer(100, calls))
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("c"))
+        self.assertLessEqual(self.cache.size_bytes(), 250)
+
+
+class FakeYoutubeDL:
+    """Writes an 8 kHz WAV as long as the requested range of a 10-minute video."""
+    active = 0
+    most_active = 0
+    lock = threading.Lock()
+
+    def __init__(self, opts):
+        self.opts = opts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url, download=True):
+        with FakeYoutubeDL.lock:
+            FakeYoutubeDL.active += 1
+            FakeYoutubeDL.most_active = max(FakeYoutubeDL.most_active, FakeYoutubeDL.active)
+        time.sleep(0.2)
+        section = next(iter(self.opts["download_ranges"]({"duration": 600}, self)))
+        path = self.opts["outtmpl"].replace("%(ext)s", "wav")
+        with wave.open(path, "wb") as f:
+            f.setnchannels(2)
+            f.setsampwidth(2)
+            f.setframerate(8000)
+            f.writeframes(bytes(4 * 8000 * int(section["end_time"] - section["start_time"])))
+        for hook in self.opts["progress_hooks"]:
+            hook({"status": "finished", "downloaded_bytes": 1000})
+        with FakeYoutubeDL.lock:
+            FakeYoutubeDL.active -= 1
+        return {"id": url, "title": url}
+
+
+@unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg not installed")
+class TestReferenceDownload(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache = ReferenceAudioCache(root=self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_fetches_excerpts_concurrently_and_reports_bytes(self):
+        import yt_dlp
+        from models import audio_encoder
+        from preprocessing.audio_ingest import duration_seconds, load_audio
+
+        encoder = audio_encoder.AudioEncoder(None, None, "user.wav")
+        urls = [f"https://www.youtube.com/watch?v=ref{i}" for i in range(3)]
+        with mock.patch.object(yt_dlp, "YoutubeDL", FakeYoutubeDL):
+            paths = encoder.download_reference_audio(urls, cache=self.cache)
+            self.assertEqual(len(paths), 3)
+            self.assertGreater(FakeYoutubeDL.most_active, 1)
+            self.assertEqual((encoder.reference_fetch["downloaded"], encoder.reference_fetch["bytes"]), (3, 3000))
+            self.assertGreater(encoder.reference_fetch["convert_seconds"], 0)
+            # Mono 16 kHz, cut to the excerpt, in the order asked for
+            self.assertIn("ref0", paths[0])
+            self.assertAlmostEqual(duration_seconds(load_audio(paths[0])),
+                                   audio_encoder.REFERENCE_EXCERPT_SECONDS, delta=0.1)
+
+            self.assertEqual(encoder.download_reference_audio(urls, cache=self.cache), paths)
+            self.assertEqual((encoder.reference_fetch["downloaded"], encoder.reference_fetch["bytes"]), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+import shutil
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.response_cache import ResponseCache
+from models.audio_encoder import AudioEncoder
+from models.text_encoder import TextEncoder
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "responses.sqlite3")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_hit_and_miss_counters(self):
+        cache = ResponseCache(self.path)
+        self.assertIsNone(cache.get("gemini-2.5-flash", "prompt"))
+        cache.put("gemini-2.5-flash", "prompt", "answer")
+        self.assertEqual(cache.get("gemini-2.5-flash", "prompt"), "answer")
+        self.assertIsNone(cache.get("gemini-2.5-pro", "prompt"))  # keyed by model too
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 2, 1))
+
+    def test_entries_expire_after_ttl(self):
+        cache = ResponseCache(self.path, ttl=60)
+        with patch("models.response_cache.time.time", return_value=1000.0):
+            cache.put("m", "prompt", "answer")
+        with patch("models.response_cache.time.time", return_value=1061.0):
+            self.assertIsNone(cache.get("m", "prompt"))
+
+    def test_evicts_least_recently_used_over_size_budget(self):
+        cache = ResponseCache(self.path, max_bytes=25)
+        now = time.time()
+        with patch("models.response_cache.time.time", side_effect=[now, now + 1, now + 2, now + 3]):
+            cache.put("m", "a", "x" * 10)
+            cache.put("m", "b", "y" * 10)
+            cache.get("m", "a")  # "b" is now least recently used
+            cache.put("m", "c", "z" * 10)
+        self.assertEqual(cache.get("m", "a"), "x" * 10)
+        self.assertIsNone(cache.get("m", "b"))
+        self.assertEqual(cache.get("m", "c"), "z" * 10)
+
+    def test_deterministic_only(self):
+        cache = ResponseCache(self.path, deterministic_only=True)
+        self.assertTrue(cache.should_cache("generate_keywords"))
+        self.assertFalse(cache.should_cache("grade_audio"))
+        self.assertFalse(cache.should_cache("retrieve_examples"))  # web search results change
+
+    def test_stage_ttl_overrides_default(self):
+        cache = ResponseCache(self.path, ttl=3600, stage_ttl={"retrieve_examples": 60})
+        with patch("models.response_cache.time.time", return_value=1000.0):
+            cache.put("m", "examples", "answer", "retrieve_examples")
+            cache.put("m", "context", "answer", "extract_context")
+        with patch("models.response_cache.time.time", return_value=1061.0):
+            self.assertIsNone(cache.get("m", "examples"))
+            self.assertEqual(cache.get("m", "context"), "answer")
+
+    def test_encoder_reuses_cached_response(self):
+        encoder = AudioEncoder(None, None, "user.wav")
+        encoder.response_cache = ResponseCache(self.path)
+        context = {"specific_topic": "squid", "general_topic": "biology", "format": "talk"}
+        with patch.object(AudioEncoder, "_generate_uncached", return_value=SimpleNamespace(text="squid talk, ted")) as gen:
+            first = encoder._generate_keywords(context)
+            second = AudioEncoder(None, None, "user.wav")
+            second.response_cache = encoder.response_cache
+            self.assertEqual(second._generate_keywords(context), first)
+        self.assertEqual(gen.call_count, 1)
+
+    def test_malformed_response_is_not_cached(self):
+        encoder = TextEncoder(model_name="dummy-model")
+        encoder.response_cache = ResponseCache(self.path)
+        encoder.transcript = "Squid glow."
+        replies = [SimpleNamespace(text="Sorry, I can't help"),
+                   SimpleNamespace(text='{"specific_topic": "squid", "general_topic": "biology", "format": "talk"}')]
+        with patch.object(TextEncoder, "_generate_uncached", side_effect=replies) as gen:
+            self.assertEqual(encoder.extract_context("talk")["specific_topic"], "unknown")
+            self.assertEqual(encoder.extract_context("talk")["specific_topic"], "squid")
+            self.assertEqual(encoder.extract_context("talk")["specific_topic"], "squid")
+        self.assertEqual(gen.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preprocessing.stage_graph import StageGraph, StageError
+
+
+class TestStageGraph(unittest.TestCase):
+    def test_passes_dependency_results_in_order(self):
+        graph = StageGraph()
+        graph.add("a", lambda: 2)
+        graph.add("b", lambda: 3)
+        graph.add("c", lambda a, b: a - b, deps=["a", "b"])
+        self.assertEqual(graph.run(), {"a": 2, "b": 3, "c": -1})
+
+    def test_independent_stages_overlap(self):
+        graph = StageGraph()
+        for name in ("x", "y", "z"):
+            graph.add(name, lambda: time.sleep(0.2))
+        graph.add("join", lambda *_: "done", deps=["x", "y", "z"])
+        start = time.perf_counter()
+        graph.run()
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_dependent_stage_waits_for_inputs(self):
+        order = []
+        graph = StageGraph()
+        graph.add("slow", lambda: (time.sleep(0.1), order.append("slow")))
+        graph.add("after", lambda _: order.append("after"), deps=["slow"])
+        graph.run()
+        self.assertEqual(order, ["slow", "after"])
+
+    def test_reports_each_result_as_it_finishes(self):
+        reported = []
+        graph = StageGraph()
+        graph.add("fast", lambda: "transcript")
+        graph.add("slow", lambda: (time.sleep(0.3), "grades")[1])
+        graph.add("join", lambda f, s: f + s, deps=["fast", "slow"])
+        start = time.perf_counter()
+        graph.run(on_result=lambda name, result: reported.append((name, result, time.perf_counter() - start)))
+        self.assertEqual([r[:2] for r in reported],
+                         [("fast", "transcript"), ("slow", "grades"), ("join", "transcriptgrades")])
+        self.assertLess(reported[0][2], 0.2)
+
+    def test_failure_raises_stage_error(self):
+        def boom():
+            raise ValueError("no network")
+
+        graph = StageGraph()
+        graph.add("fetch", boom)
+        graph.add("use", lambda x: x, deps=["fetch"])
+        with self.assertRaises(StageError) as ctx:
+            graph.run()
+        self.assertEqual(ctx.exception.stage, "fetch")
+
+    def test_rejects_cycles_and_unknown_deps(self):
+        graph = StageGraph()
+        graph.add("a", lambda b: b, deps=["b"])
+        graph.add("b", lambda a: a, deps=["a"])
+        with self.assertRaises(ValueError):
+            graph.run()
+
+        graph = StageGraph()
+        graph.add("a", lambda m: m, deps=["missing"])
+        with self.assertRaises(ValueError):
+            graph.run()
+
+
+if __name__ == '__main__':
+    unittest.main()
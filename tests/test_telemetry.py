@@ -0,0 +1,87 @@
+import unittest
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preprocessing import telemetry
+from preprocessing.stage_graph import StageGraph
+from backend.jobs import JobManager
+
+
+def sample(text, name, **labels):
+    """Value of the sample `name{labels}` in Prometheus text, or None."""
+    for line in text.splitlines():
+        match = re.match(r"^(\w+)(?:\{(.*)\})? (\S+)$", line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="([^"]*)"', match.group(2) or ""))
+        if found == {k: str(v) for k, v in labels.items()}:
+            return float(match.group(3))
+    return None
+
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram_renders_cumulative_buckets(self):
+        hist = telemetry.Histogram("test_seconds", "Test.", ("span",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            hist.observe(value, span="a")
+        text = "\n".join(hist.render())
+        self.assertIn("# TYPE test_seconds histogram", text)
+        self.assertEqual(sample(text, "test_seconds_bucket", span="a", le="0.1"), 1)
+        self.assertEqual(sample(text, "test_seconds_bucket", span="a", le="1"), 3)
+        self.assertEqual(sample(text, "test_seconds_bucket", span="a", le="+Inf"), 4)
+        self.assertEqual(sample(text, "test_seconds_count", span="a"), 4)
+        self.assertAlmostEqual(sample(text, "test_seconds_sum", span="a"), 4.25)
+
+    def test_span_records_failures_and_request_tags(self):
+        failures_before = telemetry.SPAN_FAILURES.value(span="test_fail", purpose="x")
+        with telemetry.request_context("req-1") as ctx:
+            telemetry.set_media_seconds(125.0)
+            with telemetry.span("test_ok", purpose="x", url="https://example.com") as tags:
+                tags["bytes"] = 2048  # known only at the end
+            with self.assertRaises(RuntimeError):
+                with telemetry.span("test_fail", purpose="x"):
+                    raise RuntimeError("boom")
+        ok, failed = ctx.summary()
+        self.assertEqual((ok["span"], ok["request_id"], ok["media_seconds"], ok["url"], ok["bytes"]),
+                         ("test_ok", "req-1", 125.0, "https://example.com", 2048))
+        self.assertFalse(failed["ok"])
+        self.assertEqual(telemetry.SPAN_FAILURES.value(span="test_fail", purpose="x"), failures_before + 1)
+        text = telemetry.render()
+        self.assertEqual(sample(text, "speakeasy_span_seconds_count", span="test_ok", purpose="x", media="1-5m"), 1)
+        self.assertIsNone(telemetry.current_request())
+
+    def test_stage_graph_spans_carry_the_request(self):
+        graph = StageGraph()
+        graph.add("a", lambda: 1)
+        graph.add("b", lambda a: a + 1, deps=["a"])
+        with telemetry.request_context("req-graph") as ctx:
+            graph.run()
+        self.assertEqual(sorted((s["purpose"], s["request_id"]) for s in ctx.summary()),
+                         [("a", "req-graph"), ("b", "req-graph")])
+
+    def test_jobs_list_their_spans_and_count_by_status(self):
+        def runner(path, model_size):
+            with telemetry.span("test_job_stage"):
+                if path == "bad":
+                    raise ValueError("bad input")
+            return {}
+
+        done_before = telemetry.registry.counter("speakeasy_jobs_total", "").value(status="done")
+        manager = JobManager(runner, max_workers=1)
+        try:
+            job = manager.submit("good")
+            bad = manager.submit("bad")
+            self.assertTrue(job.done_event.wait(5) and bad.done_event.wait(5))
+        finally:
+            manager.shutdown()
+        spans = job.to_dict()["spans"]
+        self.assertEqual([(s["span"], s["request_id"]) for s in spans], [("test_job_stage", job.id)])
+        self.assertFalse(bad.spans[0]["ok"])
+        self.assertEqual(telemetry.registry.counter("speakeasy_jobs_total", "").value(status="done"), done_before + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
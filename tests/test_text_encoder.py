@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import MagicMock
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.text_encoder import GRADE_SECTIONS, TextEncoder, grade_schema
+
+CONTEXT = {"specific_topic": "bioluminescence in squid", "general_topic": "marine biology", "format": "lecture"}
+EXAMPLES = {"examples": [{"title": "Deep sea light", "summary": "A talk.", "url": "https://example.com",
+                          "relevance": ["same topic", "same format"]}]}
+
+
+def raw_scores(value=0.5):
+    scores = {section: {key: value for key in keys} for section, keys in GRADE_SECTIONS.items()}
+    scores["vocabulary_style"]["repetition_score"] = 0.2
+    scores["grammar_fluency"]["filler_word_density"] = 0.1
+    return scores
+
+
+def reply(data):
+    return SimpleNamespace(text=data if isinstance(data, str) else json.dumps(data))
+
+
+class TestFusedAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.encoder = TextEncoder(model_name="dummy-model", fused=True)
+        self.encoder.response_cache = None
+        self.encoder.model = MagicMock()
+        self.encoder.transcript = "Today we talk about squid that glow in the dark."
+
+    def test_one_call_fills_every_section(self):
+        self.encoder.model.generate_content.return_value = reply(
+            {"context": CONTEXT, "scores": raw_scores(), "examples": EXAMPLES})
+        scores, context, examples = self.encoder.encode_and_contextualize(None, 120, 140.0, "lecture",
+                                                                          transcript=self.encoder.transcript)
+        self.assertEqual(self.encoder.model.generate_content.call_count, 1)
+        self.assertEqual(context, CONTEXT)
+        self.assertEqual(examples, EXAMPLES)
+        self.assertEqual(self.encoder.fallback_sections, [])
+        # Same post-processing as grade_transcript: raw amounts become goodness scores
+        self.assertEqual(scores["vocabulary_style"]["repetition_score"], 0.8)
+        self.assertEqual(scores["grammar_fluency"]["filler_word_density"], 0.9)
+        # Measured metrics are never taken from the model
+        self.assertEqual(scores["word_count"], 120)
+        self.assertEqual(scores["video_duration_seconds"], grade_schema(120, 140.0)["video_duration_seconds"])
+
+    def test_invalid_section_falls_back_to_its_own_call(self):
+        bad_scores = raw_scores()
+        bad_scores["structure"]["balance_score"] = "high"
+        self.encoder.model.generate_content.side_effect = [
+            reply({"context": CONTEXT, "scores": bad_scores, "examples": EXAMPLES}),
+            reply(raw_scores(0.7)),
+        ]
+        scores, context, examples = self.encoder.analyze_transcript(120, 140.0, "lecture")
+        self.assertEqual(self.encoder.fallback_sections, ["scores"])
+        self.assertEqual(self.encoder.model.generate_content.call_count, 2)
+        self.assertIn("speech-grading assistant", self.encoder.model.generate_content.call_args[0][0])
+        self.assertEqual(scores["structure"]["balance_score"], 0.7)
+        self.assertEqual(context, CONTEXT)
+
+    def test_unparseable_reply_falls_back_per_section_in_dependency_order(self):
+        self.encoder.model.generate_content.side_effect = [
+            reply("Sorry, I can't help with that."),
+            reply(CONTEXT),
+            reply(raw_scores()),
+            reply(EXAMPLES),
+        ]
+        scores, context, examples = self.encoder.analyze_transcript(120, 140.0, "lecture")
+        self.assertEqual(self.encoder.fallback_sections, ["context", "scores", "examples"])
+        self.assertEqual(context, CONTEXT)
+        self.assertEqual(examples, EXAMPLES)
+        # The examples prompt is built from the context recovered just before it
+        self.assertIn("bioluminescence in squid", self.encoder.model.generate_content.call_args[0][0])
+
+    def test_three_call_mode_is_unchanged(self):
+        self.encoder.fused = False
+        self.encoder.model.generate_content.side_effect = [reply(CONTEXT), reply(EXAMPLES), reply(raw_scores())]
+        scores, context, examples = self.encoder.encode_and_contextualize(None, 120, 140.0, "lecture",
+                                                                          transcript=self.encoder.transcript)
+        self.assertEqual(self.encoder.model.generate_content.call_count, 3)
+        self.assertEqual((context, examples), (CONTEXT, EXAMPLES))
+        self.assertEqual(scores["grammar_fluency"]["filler_word_density"], 0.9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import copy
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from preprocessing import transcribers
+from preprocessing.audio_ingest import SAMPLE_RATE
+from preprocessing.model_registry import WhisperModelRegistry, model_nbytes
+from preprocessing.transcribers import load_model, model_key, split_key
+
+try:
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+    HAS_WHISPER = True
+except ImportError:
+    HAS_WHISPER = False
+
+
+class TestBackendSelection(unittest.TestCase):
+    def setUp(self):
+        self.loaded = []
+        transcribers.register_backend("fake", lambda size: self.loaded.append(size) or f"fake {size}")
+
+    def tearDown(self):
+        transcribers.BACKENDS.pop("fake", None)
+
+    def test_keys_name_size_and_backend(self):
+        self.assertEqual(model_key("base", "reference"), "base")
+        self.assertEqual(model_key("base", "int8"), "base:int8")
+        self.assertEqual(model_key("small:fake", "int8"), "small:fake")
+        self.assertEqual(split_key("base"), ("base", "reference"))
+        self.assertEqual(split_key("tiny:int8"), ("tiny", "int8"))
+        with self.assertRaises(ValueError):
+            model_key("base", "fp4")
+        with self.assertRaises(ValueError):
+            load_model("base:fp4")
+
+    def test_registry_loads_each_backend_separately(self):
+        registry = WhisperModelRegistry(loader=load_model)
+        self.assertEqual(registry.get("tiny:fake"), "fake tiny")
+        registry.get("tiny:fake")
+        self.assertEqual(self.loaded, ["tiny"])
+        self.assertEqual(registry.loaded_sizes(), ["tiny:fake"])
+
+
+@unittest.skipUnless(HAS_WHISPER, "whisper not installed")
+class TestInt8Backend(unittest.TestCase):
+    def test_quantizes_linear_layers_and_still_transcribes(self):
+        torch.manual_seed(0)
+        dims = ModelDimensions(n_mels=80, n_audio_ctx=1500, n_audio_state=64, n_audio_head=2, n_audio_layer=2,
+                               n_vocab=51864, n_text_ctx=448, n_text_state=64, n_text_head=2, n_text_layer=2)
+        model = Whisper(dims).eval()
+        torch.nn.init.normal_(model.decoder.positional_embedding, std=0.01)  # torch.empty until a checkpoint loads
+        quantized = transcribers.quantize_int8(copy.deepcopy(model))
+
+        linear = [type(m).__module__ for m in quantized.modules() if type(m).__name__ == "Linear"]
+        self.assertTrue(linear)
+        self.assertTrue(all("quantized" in name for name in linear))
+        # Packed int8 weights are counted, and are a quarter of the fp32 ones
+        fp32_linear = sum(m.weight.numel() * 4 for m in model.modules() if type(m).__name__ == "Linear")
+        self.assertAlmostEqual(model_nbytes(model) - model_nbytes(quantized), fp32_linear * 3 / 4,
+                               delta=fp32_linear * 0.05)
+
+        audio = (0.1 * np.random.default_rng(0).standard_normal(SAMPLE_RATE * 5)).astype(np.float32)
+        result = quantized.transcribe(audio, temperature=0.0, fp16=False)
+        self.assertEqual(set(result), {"text", "segments", "language"})
+
+
+if __name__ == '__main__':
+    unittest.main()
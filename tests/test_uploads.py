@@ -0,0 +1,85 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import io
+import hashlib
+import tempfile
+import shutil
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, request, jsonify
+
+import backend.uploads as uploads
+import backend.workspace as workspace_module
+from backend.uploads import StreamingUploadRequest, receive_upload, sniff_media
+
+MP4_HEAD = b"\x00\x00\x00\x20ftypisom\x00\x00\x02\x00"
+
+
+def make_app():
+    app = Flask(__name__)
+    app.request_class = StreamingUploadRequest
+
+    @app.route("/upload", methods=["POST"])
+    def upload():
+        ingest = receive_upload(request)
+        if ingest is None:
+            return jsonify({"error": "none"}), 400
+        return jsonify({"path": ingest.path, "sha256": ingest.sha256, **ingest.metrics()})
+
+    return app
+
+
+class TestUploads(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.patch_root = patch.object(workspace_module, "UPLOAD_ROOT", self.root)
+        self.patch_default = patch.object(workspace_module.Workspace.__init__, "__defaults__", (self.root,))
+        self.patch_root.start()
+        self.patch_default.start()
+        self.client = make_app().test_client()
+
+    def tearDown(self):
+        self.patch_default.stop()
+        self.patch_root.stop()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_sniff_media(self):
+        self.assertEqual(sniff_media(MP4_HEAD), "mp4")
+        self.assertEqual(sniff_media(b"RIFF\x00\x00\x00\x00WAVEfmt "), "wav")
+        self.assertIsNone(sniff_media(b"<html><body>hi</b"))
+
+    def test_multipart_upload_is_hashed_and_written(self):
+        body = MP4_HEAD + os.urandom(3 * uploads.CHUNK_SIZE)
+        response = self.client.post("/upload", data={"file": (io.BytesIO(body), "talk.mp4")})
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data["sha256"], hashlib.sha256(body).hexdigest())
+        self.assertEqual(data["bytes"], len(body))
+        self.assertEqual(data["media_type"], "mp4")
+        with open(data["path"], "rb") as f:
+            self.assertEqual(f.read(), body)
+
+    def test_raw_body_upload(self):
+        body = b"RIFF\x00\x00\x00\x00WAVEfmt " + b"\x00" * 1000
+        response = self.client.post("/upload?filename=take.wav", data=body, content_type="audio/wav")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()["path"].endswith(".wav"))
+
+    def test_non_media_is_rejected_and_cleaned_up(self):
+        response = self.client.post("/upload", data={"file": (io.BytesIO(b"#!/bin/sh\nrm -rf /\n" * 100), "x.mp4")})
+        self.assertEqual(response.status_code, 415)
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_oversize_upload_is_rejected(self):
+        with patch.object(uploads, "MAX_UPLOAD_BYTES", 1024):
+            response = self.client.post("/upload", data=MP4_HEAD + b"\x00" * (10 * uploads.CHUNK_SIZE),
+                                        content_type="video/mp4")
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(os.listdir(self.root), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
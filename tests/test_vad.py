@@ -0,0 +1,67 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from preprocessing.audio_ingest import SAMPLE_RATE
+from preprocessing.vad import speech_frames, split_on_silence
+
+
+def tone(seconds, amplitude=0.3):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def hiss(seconds, rng):
+    return (0.001 * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+class TestVad(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def test_speech_mask_separates_tone_from_hiss(self):
+        audio = np.concatenate([hiss(1, self.rng), tone(1), hiss(1, self.rng)])
+        mask = speech_frames(audio)
+        third = len(mask) // 3
+        self.assertFalse(mask[:third - 1].any())
+        self.assertTrue(mask[third + 1:2 * third - 1].all())
+        self.assertFalse(mask[2 * third + 1:].any())
+
+    def test_cuts_fall_inside_pauses(self):
+        # 8 "sentences" of 7s, separated by 1s pauses
+        parts = []
+        for _ in range(8):
+            parts += [tone(7), hiss(1, self.rng)]
+        audio = np.concatenate(parts)
+        chunks = split_on_silence(audio, max_seconds=20, min_seconds=5)
+
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], len(audio))
+        for (_, end, _), (start, _, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(end, start)
+            position = (end / SAMPLE_RATE) % 8
+            self.assertGreater(position, 7.0)  # inside a pause, not a sentence
+        for start, end, has_speech in chunks:
+            self.assertLessEqual(end - start, 20 * SAMPLE_RATE)
+            self.assertTrue(has_speech)
+
+    def test_hard_cut_without_pauses(self):
+        audio = tone(50)
+        chunks = split_on_silence(audio, max_seconds=20)
+        self.assertEqual([end - start for start, end, _ in chunks],
+                         [20 * SAMPLE_RATE, 20 * SAMPLE_RATE, 10 * SAMPLE_RATE])
+
+    def test_silent_chunks_are_flagged(self):
+        audio = np.concatenate([tone(15), hiss(30, self.rng), tone(15)])
+        chunks = split_on_silence(audio, max_seconds=20, min_seconds=5)
+        self.assertTrue(chunks[0][2])
+        self.assertTrue(chunks[-1][2])
+        self.assertIn(False, [has_speech for _, _, has_speech in chunks])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from models.video_encoder import FEATURE_NAMES, FrameStats, VideoEncoder, keyframe_interval
+
+SKIN = (200, 150, 120)
+
+
+def frame(face_at=None, size=(90, 160), background=40):
+    """Flat background with a skin-coloured square centred at `face_at` (x, y fractions)."""
+    h, w = size
+    img = np.full((h, w, 3), background, dtype=np.uint8)
+    if face_at is not None:
+        cx, cy = int(face_at[0] * w), int(face_at[1] * h)
+        img[max(cy - 12, 0):cy + 12, max(cx - 12, 0):cx + 12] = SKIN
+    return img
+
+
+class TestFrameStats(unittest.TestCase):
+    def test_still_centred_speaker(self):
+        stats = FrameStats()
+        stats.add(np.stack([frame((0.5, 0.3))] * 10))
+        features = stats.summary()
+        self.assertEqual(list(features), FEATURE_NAMES)
+        self.assertEqual(features["motion_mean"], 0.0)
+        self.assertEqual(features["still_fraction"], 1.0)
+        self.assertEqual(features["face_present_fraction"], 1.0)
+        self.assertAlmostEqual(features["subject_x_mean"], 0.5, delta=0.05)
+        self.assertAlmostEqual(features["subject_y_mean"], 0.3, delta=0.05)
+        self.assertEqual(features["framing_stability"], 1.0)
+        self.assertEqual(features["frames_sampled"], 10.0)
+
+    def test_moving_speaker_across_batches(self):
+        positions = [(0.2 + 0.06 * i, 0.3) for i in range(10)]
+        whole, split = FrameStats(), FrameStats()
+        frames = np.stack([frame(p) for p in positions])
+        whole.add(frames)
+        split.add(frames[:4])
+        split.add(frames[4:])
+        self.assertEqual(whole.summary(), split.summary())
+        features = whole.summary()
+        self.assertGreater(features["motion_mean"], 0.0)
+        self.assertGreater(features["subject_x_std"], 0.1)
+        self.assertLess(features["framing_stability"], 0.5)
+
+    def test_no_face(self):
+        stats = FrameStats()
+        stats.add(np.stack([frame(None)] * 3))
+        features = stats.summary()
+        self.assertEqual(features["face_present_fraction"], 0.0)
+        self.assertEqual(features["framing_stability"], 0.0)
+
+    def test_no_frames_gives_zeros(self):
+        self.assertEqual(set(FrameStats().summary().values()), {0.0})
+
+
+class TestVideoEncoder(unittest.TestCase):
+    def test_encode_missing_file_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            VideoEncoder().encode("does_not_exist.mp4")
+
+    def test_batch_stacks_features(self):
+        encoder = VideoEncoder()
+        encoder._probe = lambda path: (160, 90, 8.0)
+        encoder.sample_frames = lambda path, probe=None: iter([np.stack([frame((0.5, 0.3))] * 4)])
+        features = encoder.feature_matrix(["a.mp4", "b.mp4"])
+        self.assertEqual(features.shape, (2, encoder.feat_dim))
+        self.assertEqual(float(features[0, FEATURE_NAMES.index("frames_sampled")]), 4.0)
+        self.assertEqual(float(features[0, FEATURE_NAMES.index("sample_fps")]), 0.5)
+
+    def test_keyframe_interval_from_packets(self):
+        packets = ["0.000000,K__", "0.033333,___", "2.000000,K__", "4.000000,K_", "4.033333,__", "N/A,K__"]
+        self.assertAlmostEqual(keyframe_interval(packets), 2.0)
+        self.assertEqual(keyframe_interval(["0.000000,K__", "0.033333,___"]), float("inf"))
+
+    @unittest.skipUnless(shutil.which("ffmpeg") and shutil.which("ffprobe"), "ffmpeg not installed")
+    def test_samples_generated_video(self):
+        import subprocess
+        import tempfile
+        root = tempfile.mkdtemp()
+        # One keyframe a second (keyframes decoded alone), and one every 5 s (every frame decoded)
+        for gop in (30, 150):
+            path = os.path.join(root, f"clip-{gop}.mp4")
+            subprocess.run(["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "testsrc=size=640x360:rate=30:duration=6",
+                            "-g", str(gop), "-pix_fmt", "yuv420p", path], check=True)
+            features = VideoEncoder(fps=1.0, width=160).features(path)
+            self.assertGreaterEqual(features["frames_sampled"], 5)
+            self.assertLessEqual(features["frames_sampled"], 7)
+            self.assertAlmostEqual(features["sample_fps"], 1.0, delta=0.2)
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    unittest.main()
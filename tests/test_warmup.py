@@ -0,0 +1,59 @@
+import unittest
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from preprocessing import warmup
+from preprocessing.audio_ingest import SAMPLE_RATE
+from preprocessing.model_registry import WhisperModelRegistry
+
+
+class TestWarmUp(unittest.TestCase):
+    def setUp(self):
+        warmup._status.update(state=warmup.IDLE, models=[], modules=[], prosody=False, seconds=None, error=None)
+        self.loaded = []
+        self.registry = WhisperModelRegistry(loader=lambda size: self.loaded.append(size) or object())
+
+    def test_loads_models_in_the_background_once(self):
+        thread = warmup.warm_up(["tiny", "base"], modules=["json"], registry=self.registry, prosody=False)
+        thread.join(5)
+        self.assertIs(warmup.warm_up(["small"], registry=self.registry), thread)
+        self.assertEqual(self.loaded, ["tiny", "base"])
+        status = warmup.warmup_status()
+        self.assertEqual((status["state"], status["models"], status["modules"]),
+                         (warmup.READY, ["tiny", "base"], ["json"]))
+
+    def test_failed_load_is_reported_not_raised(self):
+        def broken(size):
+            raise OSError("no weights")
+        warmup.warm_up(["base"], modules=[], background=False, registry=WhisperModelRegistry(loader=broken),
+                       prosody=False)
+        status = warmup.warmup_status()
+        self.assertEqual((status["state"], status["error"]), (warmup.FAILED, "no weights"))
+
+    def test_compiles_prosody_kernels(self):
+        from models.prosody import analyze_prosody
+        warmup.warm_up([], modules=[], background=False, registry=self.registry)
+        self.assertTrue(warmup.warmup_status()["prosody"])
+        t = np.arange(SAMPLE_RATE * 2) / SAMPLE_RATE
+        start = time.perf_counter()
+        analyze_prosody((0.1 * np.sin(2 * np.pi * 180 * t)).astype(np.float32))
+        self.assertLess(time.perf_counter() - start, 0.5)  # nothing left to compile
+
+    def test_importing_app_loads_no_heavy_module(self):
+        code = (f"import sys, json, app; "
+                f"print(json.dumps([m for m in {list(warmup.HEAVY_MODULES)!r} if m in sys.modules]))")
+        proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=120)
+        self.assertEqual(proc.returncode, 0, proc.stderr[-2000:])
+        self.assertEqual(json.loads(proc.stdout.strip().splitlines()[-1]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from preprocessing.audio_ingest import SAMPLE_RATE
+from preprocessing.model_registry import WhisperModelRegistry
+
+try:
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+    HAS_WHISPER = True
+except ImportError:
+    HAS_WHISPER = False
+
+
+def tiny_random_whisper():
+    """A two-layer Whisper with random weights: real decoding, no download."""
+    torch.manual_seed(0)
+    dims = ModelDimensions(n_mels=80, n_audio_ctx=1500, n_audio_state=64, n_audio_head=2, n_audio_layer=2,
+                           n_vocab=51864, n_text_ctx=448, n_text_state=64, n_text_head=2, n_text_layer=2)
+    model = Whisper(dims).eval()
+    torch.nn.init.normal_(model.decoder.positional_embedding, std=0.01)  # torch.empty until a checkpoint loads
+    return model
+
+
+class TestTemperatureFallback(unittest.TestCase):
+    def test_best_of_applies_above_zero_temperature_only(self):
+        from preprocessing.whisper_batcher import WhisperBatcher
+
+        batcher = WhisperBatcher("tiny", registry=WhisperModelRegistry(loader=lambda size: None),
+                                 temperatures=(0.0, 0.4, 0.8))
+        keys = []
+        unlikely = SimpleNamespace(compression_ratio=1.0, avg_logprob=-5.0, no_speech_prob=0.0)
+        batcher._submit = lambda mel, key: keys.append(key) or unlikely
+        batcher.decode(None, "en", best_of=5)
+        batcher.shutdown()
+        self.assertEqual(keys, [("en", 0.0, (), None), ("en", 0.4, (), 5), ("en", 0.8, (), 5)])
+
+
+class TestServiceFailures(unittest.TestCase):
+    def test_failed_model_load_fails_the_work_and_keeps_serving(self):
+        from preprocessing.whisper_batcher import WhisperBatcher
+
+        attempts = []
+
+        def broken(size):
+            attempts.append(size)
+            raise MemoryError("out of memory") if len(attempts) == 1 else OSError("weights corrupt")
+
+        batcher = WhisperBatcher("tiny", registry=WhisperModelRegistry(loader=broken), max_wait=0.01)
+        outcome = []
+        job = threading.Thread(target=lambda: outcome.append(self.raised(batcher.run, lambda model: model)))
+        job.start()
+        job.join(5)
+        self.assertFalse(job.is_alive(), "work on a model that failed to load must not hang")
+        self.assertIsInstance(outcome[0], MemoryError)
+        # The service thread survived: the next window fails too, instead of queueing forever
+        self.assertIsInstance(self.raised(batcher._submit, None, ("en", 0.0, (), None)), OSError)
+        self.assertFalse(batcher.closed)
+        batcher.shutdown()
+        self.assertTrue(batcher.closed)
+        self.assertIsInstance(self.raised(batcher.run, lambda model: model), RuntimeError)
+
+    @staticmethod
+    def raised(fn, *args):
+        try:
+            fn(*args)
+        except BaseException as e:
+            return e
+        return None
+
+
+@unittest.skipUnless(HAS_WHISPER, "whisper not installed")
+class TestWhisperBatcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from whisper.timing import dtw
+        from preprocessing.whisper_batcher import WhisperBatcher
+
+        # numba compiles DTW on first use; doing that off the main thread hangs interpreter exit
+        dtw(torch.rand(4, 4))
+        cls.model = tiny_random_whisper()
+        registry = WhisperModelRegistry(loader=lambda size: cls.model)
+        cls.batcher = WhisperBatcher("tiny", max_wait=0.5, registry=registry, temperatures=(0.0,))
+        rng = np.random.default_rng(0)
+        cls.audios = [(0.1 * rng.standard_normal(SAMPLE_RATE * s)).astype(np.float32) for s in (12, 40)]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.batcher.shutdown()
+
+    def transcribe_concurrently(self, **options):
+        results = [None] * len(self.audios)
+
+        def job(i):
+            results[i] = self.batcher.transcribe(self.audios[i], **options)
+
+        threads = [threading.Thread(target=job, args=(i,)) for i in range(len(self.audios))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    def test_matches_unbatched_transcription(self):
+        before = self.batcher.stats()
+        results = self.transcribe_concurrently(word_timestamps=True)
+        after = self.batcher.stats()
+        # Windows from the two recordings shared decodes
+        self.assertLess(after["batches"] - before["batches"], after["windows"] - before["windows"])
+        for audio, result in zip(self.audios, results):
+            expected = self.model.transcribe(audio, temperature=0.0, condition_on_previous_text=False, fp16=False,
+                                             word_timestamps=True)
+            self.assertEqual(result["text"], expected["text"])
+            self.assertEqual([(s["start"], s["end"], s["tokens"]) for s in result["segments"]],
+                             [(s["start"], s["end"], s["tokens"]) for s in expected["segments"]])
+            self.assertEqual([w["word"] for s in result["segments"] for w in s["words"]],
+                             [w["word"] for s in expected["segments"] for w in s["words"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.workspace import Workspace
+
+
+class TestWorkspace(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_same_client_filename_gets_separate_paths(self):
+        first, second = Workspace(self.root), Workspace(self.root)
+        self.assertNotEqual(first.file("talk.mp4"), second.file("talk.mp4"))
+        self.assertTrue(first.file("talk.mp4").endswith(".mp4"))
+
+    def test_client_filename_cannot_escape_workspace(self):
+        workspace = Workspace(self.root)
+        path = workspace.file("../../etc/passwd.wav")
+        self.assertEqual(os.path.dirname(path), workspace.path)
+
+    def test_cleanup_removes_files(self):
+        with Workspace(self.root) as workspace:
+            with open(workspace.file("a.wav"), "wb") as f:
+                f.write(b"data")
+        self.assertFalse(os.path.exists(workspace.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models.audio_encoder as audio_encoder_module
+from models.audio_encoder import AudioEncoder
+
+SEARCH_DELAY = 0.2
+
+# keyword -> pages of (video_id, duration); v-long-* are over the 10 minute cap
+FAKE_INDEX = {
+    "ted talk": [[("a1", "PT5M"), ("long-1", "PT45M"), ("a2", "PT8M")], [("a3", "PT3M")]],
+    "keynote": [[("b1", "PT4M"), ("b2", "PT1H"), ("b3", "PT2M"), ("b4", "PT6M")]],
+    "pitch": [[("c1", "PT9M"), ("a1", "PT5M"), ("c2", "PT7M")]],
+}
+DURATIONS = {vid: dur for pages in FAKE_INDEX.values() for page in pages for vid, dur in page}
+
+
+class FakeYouTubeHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        self.server.calls.append((url.path, query))
+        if url.path == "/search":
+            time.sleep(SEARCH_DELAY)
+            pages = FAKE_INDEX.get(query["q"][0], [[]])
+            page = int(query.get("pageToken", ["0"])[0])
+            body = {"items": [{"id": {"videoId": vid}} for vid, _ in pages[page]]}
+            if page + 1 < len(pages):
+                body["nextPageToken"] = str(page + 1)
+        else:
+            ids = query["id"][0].split(",")
+            body = {"items": [{"id": vid, "contentDetails": {"duration": DURATIONS[vid]}} for vid in ids]}
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class TestYouTubeSearch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeYouTubeHandler)
+        cls.server.calls = []
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.patches = [
+            patch.object(audio_encoder_module, "YOUTUBE_SEARCH_URL", base + "/search"),
+            patch.object(audio_encoder_module, "YOUTUBE_VIDEOS_URL", base + "/videos"),
+        ]
+        for p in cls.patches:
+            p.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        for p in cls.patches:
+            p.stop()
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        audio_encoder_module._search_cache.clear()
+        self.server.calls.clear()
+        self.encoder = AudioEncoder(None, None, "user.wav")
+
+    def _calls(self, path):
+        return [q for p, q in self.server.calls if p == path]
+
+    def test_filters_long_videos_and_pages_when_short(self):
+        found = self.encoder._search_many(["ted talk", "keynote"])
+        self.assertEqual(found["ted talk"], [f"https://www.youtube.com/watch?v={v}" for v in ("a1", "a2", "a3")])
+        self.assertEqual(found["keynote"], [f"https://www.youtube.com/watch?v={v}" for v in ("b1", "b3", "b4")])
+
+    def test_keywords_are_searched_concurrently_with_batched_durations(self):
+        start = time.perf_counter()
+        self.encoder._search_many(["keynote", "pitch", "ted talk"])
+        elapsed = time.perf_counter() - start
+        # Round 1 searches all three at once; only "ted talk" needs a second page
+        self.assertLess(elapsed, 3 * SEARCH_DELAY)
+        self.assertEqual(len(self._calls("/search")), 4)
+        video_calls = self._calls("/videos")
+        self.assertEqual(len(video_calls), 2)
+        first_batch = video_calls[0]["id"][0].split(",")
+        self.assertEqual(len(first_batch), len(set(first_batch)))  # "a1" is shared but looked up once
+        self.assertEqual(set(first_batch), {"a1", "long-1", "a2", "b1", "b2", "b3", "b4", "c1", "c2"})
+
+    def test_repeat_keywords_hit_the_cache(self):
+        first = self.encoder.search_keywords(["pitch", "keynote"], limit=5)
+        self.server.calls.clear()
+        second = AudioEncoder(None, None, "user.wav").search_keywords(["pitch", "keynote"], limit=5)
+        self.assertEqual(first, second)
+        self.assertEqual(self.server.calls, [])
+
+    def test_expired_entries_are_refetched(self):
+        with patch.object(audio_encoder_module._search_cache, "ttl", 0):
+            self.encoder._search_youtube("pitch")
+            self.encoder._search_youtube("pitch")
+        self.assertEqual(len(self._calls("/search")), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()